@@ -1,45 +1,59 @@
 import heapq
-import time
-from collections import deque
-import random
 import math
-import tracemalloc
-import csv
-import os
 
-from game.flow_free import FlowFreeBoard, Connection
+from game.board import FlowFreeBoard, Connection
 from algorithms.metrics import Metrics
+from algorithms.results import ResultSink
+from algorithms.paths import occupied_cells
+from algorithms.memory import DeadEndMemory
+
+# Tablas por nivel compartidas por todos los AStarPlayer del proceso (solo
+# dependen del nivel), para reutilizarlas entre tableros y ejecuciones. Se
+# guardan las de los últimos LEVEL_TABLES_LIMIT niveles.
+_LEVEL_TABLES = {}
+LEVEL_TABLES_LIMIT = 64
 
 class AStarPlayer(Metrics):
-    def __init__(self, heuristics: list = ["manhattan", "penalty_enclosure", "euclidean", "exploration_bonus"]):
-        super().__init__(name="AStar")
+    def __init__(self, heuristics: list = ["manhattan", "penalty_enclosure", "euclidean", "exploration_bonus"],
+                 sink: ResultSink = None, batched: bool = True, seed: int = None, memory_bytes: int = 32 * 2**20,
+                 commit_alternatives: int = 0):
+        super().__init__(name="AStar", sink=sink, seed=seed, commit_alternatives=commit_alternatives)
         self.current_path_connections = {}
         # Para aprender de los estados que no llevan a una solución del 100%
-        self.failed_states = set()
+        self.failed_states = DeadEndMemory(memory_bytes)
         self.heuristics = heuristics
+        # Con 'batched' se usa la variante con tablas precalculadas (mismo orden de expansión)
+        self.batched = batched
+        self._level_tables = _LEVEL_TABLES
         
     # ESTRATEGIA PRINCIPAL: REINICIO ALEATORIO CON MEMORIA
     def play(self, board: FlowFreeBoard, level_name: str = "unknown_level") -> tuple | None:
-        if self.start_time is None:
-            self.start_time = time.monotonic()
-            tracemalloc.start()
+        self._begin(board)
 
-        all_completed = all(conn.is_completed for conn in board.connections)
+        profiler = self.profiler
+        all_completed = board.all_completed()
 
         # CASO 1: CALLEJÓN SIN SALIDA (COMPLETO PERO NO LLENO)
-        if all_completed and board.percentage_filled() < 100:
-            board_state_tuple = tuple("".join(map(str, row)) for row in board.get_state())
+        if all_completed and not board.is_full():
+            profiler.count("dead_ends")
+            self.tracer.dead_end()
+            with profiler.timer("get_state"):
+                board_state_tuple = self._state_key(board)
             if board_state_tuple not in self.failed_states:
-                print(f"AI Player: Nuevo callejón sin salida detectado. Memorizando...")
                 self.failed_states.add(board_state_tuple)
+            else:
+                profiler.count("failed_state_hits")
             
-            print(f"Tamaño de la memoria de fallos: {len(self.failed_states)}")
-            for conn in board.connections:
-                conn.clean_road()
+            self.total_restarts += 1
+            profiler.count("restarts")
+            self.tracer.restart()
+            with profiler.timer("restart"):
+                for conn in board.connections:
+                    conn.clean_road()
             all_completed = False
 
         # CASO 2: SOLUCIÓN ENCONTRADA
-        if all_completed and board.percentage_filled() == 100:
+        if all_completed and board.is_full():
             print("A* Player: ¡Solución encontrada!")
             self._generate_reports(board, level_name)
             return None
@@ -49,10 +63,15 @@ class AStarPlayer(Metrics):
         if not incomplete_connections:
             return None
 
-        target_connection = random.choice(incomplete_connections)
+        target_connection = self.rng.choice(incomplete_connections)
         
         # Llama a la herramienta A* para encontrar un camino
-        path, nodes_expanded, max_depth = self._astar_search(board, target_connection)
+        search = self._astar_search_batched if self.batched else self._astar_search
+        with profiler.timer("search"):
+            path, nodes_expanded, max_depth = search(board, target_connection)
+        # Antes de aplicar: descarta caminos que sellan regiones o repiten un callejón conocido
+        with profiler.timer("commit_check"):
+            path = self._choose_path(board, target_connection, path)
         
         self.total_nodes_expanded += nodes_expanded
         self.max_search_depth_overall = max(self.max_search_depth_overall, max_depth)
@@ -63,17 +82,25 @@ class AStarPlayer(Metrics):
             for p in path:
                 target_connection.add_to_road(p)
             target_connection.check_completion()
+            self.tracer.commit(target_connection.key, path)
             return path[-1]
         else:
             # CASO 3: ATASCO (A* NO ENCUENTRA CAMINO)
-            print(f"AI atascado en '{target_connection.name}'.")
-            board_state_tuple = tuple("".join(map(str, row)) for row in board.get_state())
+            profiler.count("stuck")
+            self.tracer.stuck(target_connection.key)
+            with profiler.timer("get_state"):
+                board_state_tuple = self._state_key(board)
             if board_state_tuple not in self.failed_states:
                  self.failed_states.add(board_state_tuple)
+            else:
+                profiler.count("failed_state_hits")
             
-            print(f"Tamaño de la memoria de fallos: {len(self.failed_states)}")
-            for conn in board.connections:
-                conn.clean_road()
+            self.total_restarts += 1
+            profiler.count("restarts")
+            self.tracer.restart()
+            with profiler.timer("restart"):
+                for conn in board.connections:
+                    conn.clean_road()
             return board.connections[0].points[0]
         
     @staticmethod
@@ -161,14 +188,21 @@ class AStarPlayer(Metrics):
 
         g_score = {start_point: 0}
         visited_states = set()
+        # Contadores locales del perfilador (se suman una vez al final)
+        evaluations, pushes, occupancy_checks = 1, 1, 0
+        result = None
+        trace = self.tracer if self.tracer.enabled else None
 
         while open_set:
             _, current_point, path = heapq.heappop(open_set)
             nodes_expanded += 1
+            if trace is not None:
+                trace.expand_point(current_point)
             max_depth = max(max_depth, len(path))
 
             if current_point == end_point:
-                return path, nodes_expanded, max_depth
+                result = path
+                break
 
             state_tuple = (current_point, tuple(path))
             if state_tuple in visited_states:
@@ -184,6 +218,7 @@ class AStarPlayer(Metrics):
                 if neighbor_point in path:
                     continue
 
+                occupancy_checks += 1
                 is_blocked = any(
                     conn != target_connection and (neighbor_point in conn.road or neighbor_point in conn.points)
                     for conn in initial_board.connections
@@ -197,60 +232,154 @@ class AStarPlayer(Metrics):
                     f_score = tentative_g_score + self._calculate_combined_heuristic(neighbor_point, end_point, initial_board)
                     new_path = path + [neighbor_point]
                     heapq.heappush(open_set, (f_score, neighbor_point, new_path))
+                    evaluations += 1
+                    pushes += 1
 
-        return None, nodes_expanded, max_depth
+        if self.profiler.enabled:
+            self.profiler.count("heuristic_evals", evaluations)
+            self.profiler.count("heap_pushes", pushes)
+            self.profiler.count("path_copies", pushes - 1)
+            self.profiler.count("occupancy_checks", occupancy_checks)
+        return result, nodes_expanded, max_depth
     
-    def _generate_reports(self, final_board: FlowFreeBoard, level_name: str):
-        """Crea los archivos de salida .txt y .csv con las métricas de rendimiento."""
-        running_time = time.monotonic() - self.start_time
-        _, max_ram_usage = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        max_ram_usage /= 1024**2  # Convertir a MB
-
-        cost_of_path = sum(len(conn.road) - 1 for conn in final_board.connections)
-        search_depth = cost_of_path  # La profundidad de la solución es el total de celdas del camino
-
-        path_to_goal_matrix = [['' for _ in range(final_board.columns)] for _ in range(final_board.rows)]
-        for conn in final_board.connections:
-            # Encuentra la letra inicial del color
-            char = next((key for key, value in Connection.NAMES.items() if value == conn.name), '?')
-            for (px, py) in conn.road:
-                path_to_goal_matrix[py][px] = char
-
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # A TXT
-        file_base_name = f"{level_name.replace('.txt', '')}"
-        txt_filename = os.path.join(output_dir, f"{file_base_name}.txt")
-        with open(txt_filename, 'w') as f:
-            f.write(f"path_to_goal: {path_to_goal_matrix}\n")
-            f.write(f"cost_of_path: {cost_of_path}\n")
-            f.write(f"nodes_expanded: {self.total_nodes_expanded}\n")
-            f.write(f"search_depth: {search_depth}\n")
-            f.write(f"max_search_depth: {self.max_search_depth_overall}\n")
-            f.write(f"running_time: {running_time:.8f}\n")
-            f.write(f"max_ram_usage: {max_ram_usage:.8f}\n")
-            f.write(f"Heuristic: {', '.join(self.heuristics)}.\n")
-        print(f"\nReporte .txt guardado en: {txt_filename}")
-        
-        csv_filename = os.path.join(output_dir, "benchmark.csv")
-        file_exists = os.path.isfile(csv_filename)
-        
-        with open(csv_filename, 'a', newline='') as f:
-            writer = csv.writer(f)
-            headers = ["Algorithm-Level", "cost_of_path", "nodes_expanded", "search_depth", "max_search_depth", "running_time", "max_ram_usage"]
-            if not file_exists:
-                writer.writerow(headers)
-            
-            row_data = [
-                f"{level_name.replace('.txt', '')}: {' - '.join(self.heuristics)}.",
-                cost_of_path,
-                self.total_nodes_expanded,
-                search_depth,
-                self.max_search_depth_overall,
-                f"{running_time:.8f}",
-                f"{max_ram_usage:.8f}"
-            ]
-            writer.writerow(row_data)
-        print(f"Resultados añadidos a: {csv_filename}")
\ No newline at end of file
+    # TABLAS PRECALCULADAS PARA LA VARIANTE POR LOTES
+    def _tables_for_level(self, board: FlowFreeBoard) -> dict:
+        """
+        Tablas que solo dependen del nivel (paredes y tamaño): puntos por id de
+        celda, vecinos válidos en el mismo orden que la búsqueda escalar (las
+        tablas del tablero) y el término de exploración. Se guardan por nivel y
+        se reutilizan entre reinicios.
+        """
+        key = tuple(board.board)
+        tables = self._level_tables.get(key)
+        if tables is None:
+            points, neighbors = board.cell_points, board.neighbors
+            valid = [board._validate_cell(x, y) for x, y in points]
+            exploration = [self._exploration_bonus(p, board) for p in points]
+            edges = [4 - len(neighbors[cell]) if valid[cell] else 0 for cell in range(len(points))]
+            tables = {"points": points, "neighbors": neighbors, "edges": edges,
+                      "exploration": exploration, "goals": {}}
+            if len(self._level_tables) >= LEVEL_TABLES_LIMIT:
+                del self._level_tables[next(iter(self._level_tables))]
+            self._level_tables[key] = tables
+        return tables
+
+    def _heuristic_table(self, board: FlowFreeBoard, target_connection: Connection, end_point: tuple) -> list:
+        """
+        Calcula la heurística combinada de todas las celdas para una búsqueda.
+        Durante una búsqueda de un solo color los caminos de los demás colores no
+        cambian, así que cada término es fijo por celda. Se usan las mismas
+        fórmulas y el mismo orden de operaciones que _calculate_combined_heuristic,
+        por lo que los valores son idénticos bit a bit.
+        """
+        tables = self._tables_for_level(board)
+        points, neighbors = tables["points"], tables["neighbors"]
+
+        w1 = 0.2 if "manhattan" in self.heuristics else 0
+        w2 = 0.2 if "penalty_enclosure" in self.heuristics else 0
+        w3 = 0.1 if "euclidean" in self.heuristics else 0
+        w4 = 0.5 if "exploration_bonus" in self.heuristics else 0
+
+        # Manhattan y euclidiana solo dependen del destino: se guardan por nivel
+        goal_terms = tables["goals"].get(end_point)
+        if goal_terms is None:
+            goal_terms = ([self._manhattan(p, end_point, board) for p in points],
+                          [self._euclidean(p, end_point, board) for p in points])
+            tables["goals"][end_point] = goal_terms
+        manhattan, euclidean = goal_terms
+        exploration = tables["exploration"]
+
+        # Penalización por encierro: vecinos fuera del tablero o paredes (fijo por
+        # nivel) + vecinos en caminos ajenos, sumados desde cada celda de esos caminos
+        columns = board.columns
+        occupied_neighbors = list(tables["edges"])
+        for conn in board.connections:
+            if conn is not target_connection:
+                for x, y in conn.road:
+                    for n in neighbors[y * columns + x]:
+                        occupied_neighbors[n] += 1
+
+        return [
+            (w1 * h1) + (w2 * (h2 / 4.0)) + (w3 * h3) - (w4 * h4)
+            for h1, h2, h3, h4 in zip(manhattan, occupied_neighbors, euclidean, exploration)
+        ]
+
+    # ALGORITMO DE BÚSQUEDA A* POR LOTES
+    def _astar_search_batched(self, initial_board: FlowFreeBoard, target_connection: Connection):
+        """
+        A* con el mismo orden de expansión que _astar_search, pero cada nodo
+        expandido reúne todos sus sucesores válidos y los puntúa juntos con
+        búsquedas en tablas precalculadas, en lugar de una llamada a la heurística
+        combinada por vecino.
+
+        Trabaja con ids de celda: cada nodo guarda su celda, un enlace a su
+        padre y las celdas de su camino como máscara de bits, así ampliar el
+        camino y preguntar si una celda ya está en él cuestan O(1) en lugar de
+        copiar y recorrer una lista de tuplas. El camino se arma una sola vez,
+        al llegar al destino.
+        """
+        nodes_expanded = 0
+        max_depth = 0
+        start_point, end_point = target_connection.points
+        profiler = self.profiler
+        tables = self._tables_for_level(initial_board)
+        points, neighbors = tables["points"], tables["neighbors"]
+        with profiler.timer("heuristic"):
+            heuristic = self._heuristic_table(initial_board, target_connection, end_point)
+        with profiler.timer("occupancy"):
+            blocked = occupied_cells(initial_board, target_connection)
+
+        start, goal = target_connection.cells
+        # Nodo: (celda, largo del camino, máscara de sus celdas, nodo padre). En
+        # la cola va detrás de (f, punto): dos entradas con el mismo f y el mismo
+        # punto no se dan (g_score solo deja volver a una celda con g menor), así
+        # que el orden es el de la búsqueda escalar y los nodos no se comparan.
+        open_set = [(heuristic[start], start_point, (start, 1, 1 << start, None))]
+        g_score = {start: 0}
+        heappush, heappop = heapq.heappush, heapq.heappop
+        pushes = 1
+        result = None
+        trace = self.tracer if self.tracer.enabled else None
+
+        while open_set:
+            _, _, node = heappop(open_set)
+            current, length, mask, _ = node
+            nodes_expanded += 1
+            if length > max_depth:
+                max_depth = length
+
+            if trace is not None:
+                trace.expand(current)
+            if current == goal:
+                result = []
+                while node is not None:
+                    result.append(points[node[0]])
+                    node = node[3]
+                result.reverse()
+                break
+
+            # Cada camino se inserta una sola vez en la cola, así que aquí no hay
+            # estados repetidos que descartar.
+            tentative_g_score = g_score.get(current, float('inf')) + 1
+            successors = [n for n in neighbors[current]
+                          if n not in blocked and not mask >> n & 1
+                          and tentative_g_score < g_score.get(n, float('inf'))]
+            if not successors:
+                continue
+
+            f_scores = [tentative_g_score + heuristic[n] for n in successors]
+            for n, f_score in zip(successors, f_scores):
+                g_score[n] = tentative_g_score
+                heappush(open_set, (f_score, points[n], (n, length + 1, mask | (1 << n), node)))
+            pushes += len(successors)
+
+        if profiler.enabled:
+            profiler.count("heuristic_evals", len(heuristic))
+            profiler.count("heap_pushes", pushes)
+        return result, nodes_expanded, max_depth
+
+    def _build_record(self, final_board: FlowFreeBoard, level_name: str, running_time: float, max_ram_usage: float) -> dict:
+        record = super()._build_record(final_board, level_name, running_time, max_ram_usage)
+        record["Algorithm-Level"] = f"{level_name.replace('.txt', '')}: {' - '.join(self.heuristics)}."
+        record["heuristics"] = list(self.heuristics)
+        return record
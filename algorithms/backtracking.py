@@ -0,0 +1,364 @@
+import multiprocessing
+import os
+import queue
+import time
+from collections import deque
+from itertools import chain, islice
+
+from game.board import FlowFreeBoard
+from algorithms.metrics import Metrics
+from algorithms.results import ResultSink
+from algorithms.paths import enumerate_paths, count_paths
+
+# Un estado compacto es una tupla de (índice de conexión, camino como tupla de
+# ids de celda) con los colores ya fijados. Solo contiene enteros, así que se
+# envía entre procesos sin coste de serialización de objetos del tablero.
+
+# Expansiones por celda que se permite cada conteo de caminos al ordenar los
+# colores de un nodo. El conteo solo decide el orden, así que cortarlo no
+# pierde soluciones: un color con el conteo cortado cuenta como 'branch_limit'.
+COUNT_EXPANSIONS_PER_CELL = 2
+
+
+def apply_state(board: FlowFreeBoard, state: tuple) -> None:
+    """Deja en el tablero exactamente los caminos del estado compacto."""
+    columns = board.columns
+    for conn in board.connections:
+        conn.clean_road()
+    for index, path in state:
+        board.connections[index].set_road((cell % columns, cell // columns) for cell in path)
+
+
+def _stranded_region(board: FlowFreeBoard, committed: set) -> bool:
+    """
+    True si alguna región de celdas libres no tiene ninguna conexión pendiente
+    con sus dos extremos junto a ella (esa región ya no se puede llenar), o si
+    alguna conexión pendiente no tiene sus extremos juntos ni junto a una misma
+    región (ya no se puede unir).
+    """
+    columns, neighbors = board.columns, board.neighbors
+    pending = [conn for i, conn in enumerate(board.connections) if i not in committed]
+    taken = {y * columns + x for conn in board.connections for x, y in conn.road}
+    taken.update(cell for conn in board.connections for cell in conn.cells)
+    regions = {}  # celda ocupada -> regiones libres que toca
+    seen = set()
+    for cell, (x, y) in enumerate(board.cell_points):
+        if cell in seen or cell in taken or not board._validate_cell(x, y):
+            continue
+        border, frontier = set(), deque([cell])
+        seen.add(cell)
+        while frontier:
+            for n in neighbors[frontier.popleft()]:
+                if n in taken:
+                    border.add(n)
+                elif n not in seen:
+                    seen.add(n)
+                    frontier.append(n)
+        if not any(conn.cells[0] in border and conn.cells[1] in border for conn in pending):
+            return True
+        for n in border:
+            regions.setdefault(n, set()).add(cell)
+    for conn in pending:
+        a, b = conn.cells
+        if b not in neighbors[a] and not regions.get(a, set()) & regions.get(b, set()):
+            return True
+    return False
+
+
+def expand(board: FlowFreeBoard, state: tuple, branch_limit: int = 4, max_expansions: int = None,
+           deadline: float = None, count_expansions: int = None):
+    """
+    Iterador perezoso de los estados hijos de 'state' (que debe estar aplicado
+    en el tablero). Elige la conexión pendiente con menos caminos candidatos
+    (hasta 'branch_limit') y genera un hijo por cada camino, en orden de costo.
+    El tablero solo se lee al crear el iterador.
+
+    Cada conteo se corta a las 'count_expansions' expansiones (por defecto
+    COUNT_EXPANSIONS_PER_CELL por celda): una conexión con pocos caminos
+    válidos puede recorrer millones de caminos parciales antes de terminar de
+    contarlos, y se cuentan todas las pendientes en cada nodo. 'max_expansions'
+    acota en cambio la enumeración de la conexión elegida; con él la búsqueda
+    deja de ser completa (se pierden los hijos que no se llegaron a enumerar).
+    'deadline' corta ambas.
+    """
+    committed = {index for index, _ in state}
+    pending = [i for i in range(len(board.connections)) if i not in committed]
+    if not pending or _stranded_region(board, committed):
+        return iter(())
+
+    if count_expansions is None:
+        count_expansions = COUNT_EXPANSIONS_PER_CELL * board.rows * board.columns
+    best, best_count = None, None
+    for index in pending:
+        candidates = count_paths(board, board.connections[index], limit=branch_limit,
+                                 max_expansions=count_expansions, deadline=deadline)
+        if best_count is None or candidates < best_count:
+            best, best_count = index, candidates
+        if candidates <= 1:
+            break
+    if not best_count:
+        return iter(())
+
+    paths = enumerate_paths(board, board.connections[best], max_expansions=max_expansions, deadline=deadline)
+    first = next(paths, None)  # Inicializa el generador mientras el tablero refleja 'state'
+    if first is None:
+        return iter(())
+    columns = board.columns
+    return (state + ((best, tuple(y * columns + x for x, y in path)),) for path in chain([first], paths))
+
+
+class _SharedSearch:
+    """Estado compartido entre los trabajadores de la búsqueda paralela."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.tasks = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.found = multiprocessing.Event()
+        self.pending = multiprocessing.Value("q", 0)  # tareas creadas y no terminadas
+        self.queued = multiprocessing.Value("q", 0)   # tareas en cola sin tomar
+        self.idle = multiprocessing.Value("q", 0)     # trabajadores esperando tarea
+        self.nodes = multiprocessing.Value("q", 0)
+
+    def push(self, state: tuple) -> None:
+        with self.pending.get_lock():
+            self.pending.value += 1
+        with self.queued.get_lock():
+            self.queued.value += 1
+        self.tasks.put(state)
+
+    def hungry(self) -> bool:
+        """Hay trabajadores ociosos y no queda trabajo en cola para ellos."""
+        return self.idle.value > self.queued.value
+
+
+def search(board: FlowFreeBoard, state: tuple, shared: _SharedSearch = None, branch_limit: int = 4,
+           split_every: int = 8, deadline: float = None, trace=None, max_expansions: int = None,
+           count_expansions: int = None):
+    """
+    Backtracking en profundidad desde 'state'. Devuelve (estado_solución o None,
+    nodos expandidos). Con 'shared', cada 'split_every' nodos revisa si hay
+    trabajadores ociosos y les cede el siguiente hijo del nivel más superficial
+    con alternativas (el subárbol más grande que queda). Con 'trace' se emite un
+    evento 'assign' por cada camino probado. 'deadline', 'max_expansions' y
+    'count_expansions' llegan también a expand() (ver allí).
+
+    Cada nivel de la pila guarda una instantánea del tablero (board.snapshot()),
+    así pasar a un hijo es restaurar la del padre y fijar un solo camino, en vez
+    de rehacer todos los caminos del estado.
+    """
+    nodes = 0
+    columns = board.columns
+    apply_state(board, state)
+    # Una tarea cedida puede ser ya una asignación completa (una hoja)
+    if len(state) == len(board.connections):
+        return (state if board.is_full() else None), nodes
+    stack = [(board.snapshot(), expand(board, state, branch_limit, max_expansions, deadline, count_expansions))]
+    while stack:
+        if shared is not None and nodes % split_every == 0:
+            if shared.found.is_set():
+                return None, nodes
+            if shared.hungry():
+                for _, frame in stack:
+                    donated = next(frame, None)
+                    if donated is not None:
+                        shared.push(donated)
+                        break
+        if deadline is not None and time.monotonic() >= deadline:
+            return None, nodes
+
+        snapshot, frame = stack[-1]
+        child = next(frame, None)
+        if child is None:
+            stack.pop()
+            continue
+
+        nodes += 1
+        board.restore(snapshot)
+        index, path = child[-1]
+        board.connections[index].set_road((cell % columns, cell // columns) for cell in path)
+        if trace is not None:
+            trace.event("assign", depth=len(child), k=board.connections[index].key, p=list(path))
+        if len(child) == len(board.connections):
+            if board.is_full():
+                return child, nodes
+            continue
+        stack.append((board.snapshot(), expand(board, child, branch_limit, max_expansions, deadline, count_expansions)))
+    return None, nodes
+
+
+def split_root(board: FlowFreeBoard, tasks: int, branch_limit: int = 4, deadline: float = None,
+               max_expansions: int = None, count_expansions: int = None, max_children: int = 64):
+    """
+    Reparte el árbol antes de lanzar los trabajadores: expande en anchura desde
+    la raíz hasta tener al menos 'tasks' estados independientes. Un nodo con
+    más de 'max_children' hijos no se divide (se entrega entero, como una sola
+    tarea). Devuelve (tareas, estado_solución o None, nodos expandidos): si la
+    expansión ya llega a una solución, no hacen falta trabajadores.
+    """
+    frontier, whole = deque([()]), []
+    nodes = 0
+    while frontier and len(frontier) + len(whole) < tasks:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        state = frontier.popleft()
+        apply_state(board, state)
+        if len(state) == len(board.connections):
+            if board.is_full():
+                return [], state, nodes
+            continue
+        children = list(islice(expand(board, state, branch_limit, max_expansions, deadline, count_expansions),
+                               max_children + 1))
+        if len(children) > max_children:
+            whole.append(state)
+            continue
+        nodes += len(children)
+        frontier.extend(children)
+    return whole + list(frontier), None, nodes
+
+
+def _worker(board: FlowFreeBoard, shared: _SharedSearch, branch_limit: int, split_every: int,
+            deadline: float = None, max_expansions: int = None, count_expansions: int = None) -> None:
+    """Toma tareas de la cola común hasta que se encuentre una solución o se agote el trabajo."""
+    waiting = False
+    while not shared.found.is_set():
+        if not waiting:
+            waiting = True
+            with shared.idle.get_lock():
+                shared.idle.value += 1
+        try:
+            state = shared.tasks.get(timeout=0.05)
+        except queue.Empty:
+            if shared.pending.value == 0:
+                break
+            continue
+        waiting = False
+        with shared.idle.get_lock():
+            shared.idle.value -= 1
+        with shared.queued.get_lock():
+            shared.queued.value -= 1
+
+        result, nodes = search(board, state, shared, branch_limit, split_every, deadline,
+                               max_expansions=max_expansions, count_expansions=count_expansions)
+        with shared.nodes.get_lock():
+            shared.nodes.value += nodes
+        if result is not None:
+            shared.results.put(result)
+            shared.found.set()
+        with shared.pending.get_lock():
+            shared.pending.value -= 1
+
+
+def parallel_search(board: FlowFreeBoard, workers: int = None, branch_limit: int = 4, split_every: int = 8,
+                    timeout: float = None, deadline: float = None, max_expansions: int = None,
+                    count_expansions: int = None, tasks_per_worker: int = 4):
+    """
+    Búsqueda paralela sobre el árbol de asignación de caminos por color.
+    Devuelve (estado_solución o None, nodos expandidos).
+
+    Primero split_root() divide los primeros niveles en unas
+    'tasks_per_worker' tareas por trabajador, que se encolan antes de lanzar
+    los procesos, así todos empiezan a buscar a la vez. Después el reparto es
+    dinámico pero no es robo de trabajo: un trabajador no puede sacar nodos
+    de la pila de otro proceso. En su lugar cada trabajador ocupado revisa
+    cada 'split_every' nodos si hay ociosos sin tarea en cola y, si los hay,
+    encola el siguiente hijo de su nivel más superficial (reparto iniciado por
+    el emisor). La latencia hasta que un ocioso recibe trabajo es de a lo sumo
+    'split_every' nodos del trabajador que cede.
+
+    'timeout' (segundos) o 'deadline' (en time.monotonic(), reloj común a los
+    procesos) limitan la búsqueda; rige el que venza antes. Los trabajadores
+    también lo revisan, así no siguen dentro de un nodo largo tras el límite.
+    """
+    if timeout:
+        limit = time.monotonic() + timeout
+        deadline = limit if deadline is None else min(deadline, limit)
+    workers = workers or os.cpu_count() or 1
+    tasks, result, nodes = split_root(board, workers * tasks_per_worker, branch_limit, deadline,
+                                      max_expansions, count_expansions)
+    if result is not None or not tasks:
+        return result, nodes
+    shared = _SharedSearch(workers)
+    for state in tasks:
+        shared.push(state)
+    processes = [multiprocessing.Process(target=_worker, daemon=True,
+                                         args=(board, shared, branch_limit, split_every, deadline, max_expansions,
+                                               count_expansions))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        while any(process.is_alive() for process in processes):
+            try:
+                result = shared.results.get(timeout=0.05)
+                break
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        if result is None:
+            try:
+                result = shared.results.get_nowait()
+            except queue.Empty:
+                pass
+    finally:
+        # Cancelación global: los trabajadores revisan 'found' entre nodos
+        shared.found.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    return result, nodes + shared.nodes.value
+
+
+class BacktrackingPlayer(Metrics):
+    """
+    Agente completo: backtracking sobre la elección de camino de cada color,
+    en paralelo con reparto de subárboles entre procesos (ver
+    parallel_search()). Con workers=1 corre en el mismo proceso.
+
+    Una sola llamada a play() hace toda la búsqueda, así que el límite de
+    tiempo se aplica dentro de ella: 'timeout' del constructor o, si no se
+    dio, el de solve(). 'max_expansions' acota la enumeración de caminos del
+    color elegido en cada nodo y 'count_expansions' los conteos que ordenan
+    los colores (ver expand()).
+    """
+
+    def __init__(self, workers: int = None, branch_limit: int = 4, timeout: float = None, sink: ResultSink = None,
+                 seed: int = None, max_expansions: int = None, count_expansions: int = None):
+        super().__init__(name="Backtracking", sink=sink, seed=seed)
+        self.workers = workers or os.cpu_count() or 1
+        self.branch_limit = branch_limit
+        self.timeout = timeout
+        self.max_expansions = max_expansions
+        self.count_expansions = count_expansions
+
+    def play(self, board: FlowFreeBoard, level_name: str = "unknown_level"):
+        self._begin(board)
+
+        if board.is_full():
+            print("Backtracking Player: ¡Solución encontrada!")
+            self._generate_reports(board, level_name)
+            return None
+
+        deadline = time.monotonic() + self.timeout if self.timeout else self.deadline
+        with self.profiler.timer("search"):
+            if self.workers == 1:
+                result, nodes = search(board, (), branch_limit=self.branch_limit, deadline=deadline,
+                                       trace=self.tracer if self.tracer.enabled else None,
+                                       max_expansions=self.max_expansions, count_expansions=self.count_expansions)
+            else:
+                result, nodes = parallel_search(board, self.workers, self.branch_limit, deadline=deadline,
+                                                max_expansions=self.max_expansions,
+                                                count_expansions=self.count_expansions)
+        self.total_nodes_expanded += nodes
+
+        if result is None:
+            apply_state(board, ())
+            print("Backtracking Player: el nivel no tiene solución (o se agotó el tiempo).")
+            return None
+
+        apply_state(board, result)
+        self.max_search_depth_overall = max(self.max_search_depth_overall, len(result))
+        return board.connections[result[-1][0]].road[-1]
@@ -1,11 +1,12 @@
 # algorithms/bfs.py
 
 from collections import deque
-import time
-import tracemalloc
 
-from game.flow_free import FlowFreeBoard, Connection
+from game.board import FlowFreeBoard
 from algorithms.metrics import Metrics
+from algorithms.results import ResultSink
+from algorithms.memory import DeadEndMemory
+from algorithms.paths import occupied_cells
 
 
 class BFSPlayer(Metrics):
@@ -15,38 +16,44 @@ class BFSPlayer(Metrics):
     - Expande por turnos (round-robin) una capa por conexión, respetando UDLR.
     - Cuando la primera conexión encuentra ruta, aplica ese camino y termina el ciclo.
     - Si todas acaban sin ruta útil en este estado, se reinicia (limpia trazos).
+    - Es determinista: si el camino encontrado está descartado, prueba hasta
+      'commit_alternatives' caminos más de esa conexión (ver Metrics._choose_path).
     """
 
-    def __init__(self):
-        super().__init__(name="BFS")
-        self.failed_states = set()
+    def __init__(self, sink: ResultSink = None, seed: int = None, memory_bytes: int = 32 * 2**20,
+                 commit_alternatives: int = 4):
+        super().__init__(name="BFS", sink=sink, seed=seed, commit_alternatives=commit_alternatives)
+        self.failed_states = DeadEndMemory(memory_bytes)
 
     # ---------------- Utilidades ----------------
-    def _get_hashable_state(self, board: FlowFreeBoard):
-        return tuple(map(tuple, board.get_state()))
+    def _remember_failure(self, board: FlowFreeBoard) -> None:
+        with self.profiler.timer("get_state"):
+            st = self._state_key(board)
+        if st in self.failed_states:
+            self.profiler.count("failed_state_hits")
+        self.failed_states.add(st)
+
+    def _restart(self, board: FlowFreeBoard) -> None:
+        self.total_restarts += 1
+        self.profiler.count("restarts")
+        self.tracer.restart()
+        with self.profiler.timer("restart"):
+            for c in board.connections:
+                c.clean_road()
 
     @staticmethod
-    def _udlr_neighbors(x: int, y: int):
-        # Up, Down, Left, Right
-        return [(x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)]
+    def _udlr_neighbors(moves: tuple):
+        # Up, Down, Left, Right (board.moves guarda derecha, izquierda, abajo, arriba)
+        return moves[3], moves[2], moves[1], moves[0]
 
     # ---------------- Núcleo BFS round-robin ----------------
-    def _build_occupancy_for(self, board: FlowFreeBoard, target: Connection):
-        """
-        Retorna las celdas ocupadas por otras conexiones distintas de 'target'.
-        """
-        occupied = set()
-        for conn in board.connections:
-            if conn is not target:
-                occupied.update(conn.road)
-                occupied.update(conn.points)
-        return occupied
-
     def _bfs_round_robin(self, board: FlowFreeBoard):
         """
         Crea una cola por cada conexión incompleta y expande por turnos.
         Devuelve (target_connection, path, nodes_expanded, max_depth)
         o (None, None, nodes_expanded, max_depth) si nadie encontró ruta.
+        Los frentes guardan ids de celda; el camino encontrado se devuelve como
+        tuplas (x, y).
         """
         # Preparar frentes por conexión
         targets = [c for c in board.connections if not c.is_completed]
@@ -59,9 +66,12 @@ class BFSPlayer(Metrics):
         end_points = {}
         nodes_expanded = 0
         max_depth = 0
+        path_copies = 0
+        trace = self.tracer if self.tracer.enabled else None
 
+        moves = board.moves
         for conn in targets:
-            start, goal = conn.points[0], conn.points[1]
+            start, goal = conn.cells
             end_points[conn] = goal
             frontiers[conn] = deque([(start, [start])])
             visited[conn] = {start}
@@ -80,24 +90,26 @@ class BFSPlayer(Metrics):
                 # Expandimos toda la “capa actual” de esta conexión
                 layer_size = len(frontiers[conn])
                 goal = end_points[conn]
-                occupied_others = self._build_occupancy_for(board, conn)
+                with self.profiler.timer("occupancy"):
+                    occupied_others = occupied_cells(board, conn)
 
                 for _ in range(layer_size):
                     current, path = frontiers[conn].popleft()
                     nodes_expanded += 1
+                    if trace is not None:
+                        trace.expand(current)
                     if len(path) > max_depth:
                         max_depth = len(path)
 
                     if current == goal:
                         # Encontramos ruta para esta conexión
-                        return conn, path, nodes_expanded, max_depth
+                        self.profiler.count("path_copies", path_copies)
+                        return conn, [board.cell_points[cell] for cell in path], nodes_expanded, max_depth
 
-                    cx, cy = current
-                    for nx, ny in self._udlr_neighbors(cx, cy):
+                    for nxt in self._udlr_neighbors(moves[current]):
                         # Dentro del tablero
-                        if not board._validate_cell(nx, ny):
+                        if nxt < 0:
                             continue
-                        nxt = (nx, ny)
 
                         # No revisitar y no pisar otros caminos/endpoints
                         if nxt in visited[conn] or nxt in occupied_others:
@@ -109,9 +121,11 @@ class BFSPlayer(Metrics):
 
                         visited[conn].add(nxt)
                         frontiers[conn].append((nxt, path + [nxt]))
+                        path_copies += 1
 
             # Si en una vuelta completa nadie avanzó (todas colas vacías), no hay ruta
             if not progressed:
+                self.profiler.count("path_copies", path_copies)
                 return None, None, nodes_expanded, max_depth
 
     # ---------------- Bucle principal ----------------
@@ -124,29 +138,30 @@ class BFSPlayer(Metrics):
         - Aplica el primer camino encontrado y retorna la última celda de ese camino.
         """
         # Iniciar métricas globales si es la primera llamada
-        if self.start_time is None:
-            self.start_time = time.monotonic()
-            tracemalloc.start()
+        self._begin(board)
 
-        all_completed = all(c.is_completed for c in board.connections)
-        filled = board.percentage_filled()
+        all_completed = board.all_completed()
+        full = board.is_full()
 
         # Caso callejón: todo “completado” pero no 100% lleno
-        if all_completed and filled < 100:
-            st = self._get_hashable_state(board)
-            self.failed_states.add(st)
-            for c in board.connections:
-                c.clean_road()
+        if all_completed and not full:
+            self.profiler.count("dead_ends")
+            self.tracer.dead_end()
+            self._remember_failure(board)
+            self._restart(board)
             # Convención: devolver una celda válida para que el motor continúe
             return board.connections[0].points[0]
 
         # Caso solución: 100% lleno
-        if all_completed and filled == 100:
+        if all_completed and full:
             self._generate_reports(board, level_name)
             return None
 
         # Ejecutar BFS round-robin entre todas las conexiones incompletas
-        target_conn, path, nodes_expanded, max_depth = self._bfs_round_robin(board)
+        with self.profiler.timer("search"):
+            target_conn, path, nodes_expanded, max_depth = self._bfs_round_robin(board)
+        with self.profiler.timer("commit_check"):
+            path = self._choose_path(board, target_conn, path)
 
         # Actualizar métricas globales
         self.total_nodes_expanded += nodes_expanded
@@ -159,11 +174,15 @@ class BFSPlayer(Metrics):
             for p in path:
                 target_conn.add_to_road(p)
             target_conn.check_completion()
+            self.tracer.commit(target_conn.key, path)
             return path[-1]
 
         # Ninguna conexión encontró ruta en este estado -> memoriza y reinicia
-        st = self._get_hashable_state(board)
-        self.failed_states.add(st)
-        for c in board.connections:
-            c.clean_road()
+        self.profiler.count("stuck")
+        # Sin ruta para nadie, el atasco se atribuye a la primera conexión incompleta
+        if target_conn is None:
+            target_conn = next(conn for conn in board.connections if not conn.is_completed)
+        self.tracer.stuck(target_conn.key)
+        self._remember_failure(board)
+        self._restart(board)
         return board.connections[0].points[0]
@@ -1,14 +1,9 @@
-# Importaciones necesarias
-import time
-import copy
-import os
-import csv
-import tracemalloc
-import random
-
 # Importaciones de los módulos de tu proyecto
-from game.flow_free import FlowFreeBoard, Connection
+from game.board import FlowFreeBoard, Connection
 from algorithms.metrics import Metrics
+from algorithms.results import ResultSink
+from algorithms.memory import DeadEndMemory
+from algorithms.paths import occupied_cells
 
 class DFSPlayer(Metrics):
     """
@@ -16,59 +11,75 @@ class DFSPlayer(Metrics):
     Ahora incluye la medición de rendimiento y generación de reportes.
     """
 
-    def __init__(self):
+    def __init__(self, sink: ResultSink = None, seed: int = None, memory_bytes: int = 32 * 2**20,
+                 commit_alternatives: int = 0):
         """Inicializa el agente, la memoria y las variables para las métricas."""
-        super().__init__(name="DFS")
-        self.failed_states = set()
+        super().__init__(name="DFS", sink=sink, seed=seed, commit_alternatives=commit_alternatives)
+        self.failed_states = DeadEndMemory(memory_bytes)
         
-    def _get_hashable_state(self, board: FlowFreeBoard):
-        """Crea una representación inmutable del estado del tablero."""
-        return tuple(map(tuple, board.get_state()))
+    def _remember_failure(self, board: FlowFreeBoard) -> None:
+        """Guarda el estado actual en la memoria de fallos."""
+        with self.profiler.timer("get_state"):
+            board_state = self._state_key(board)
+        if board_state in self.failed_states:
+            self.profiler.count("failed_state_hits")
+        self.failed_states.add(board_state)
+
+    def _restart(self, board: FlowFreeBoard) -> None:
+        """Borra todos los caminos para empezar de nuevo."""
+        self.total_restarts += 1
+        self.profiler.count("restarts")
+        self.tracer.restart()
+        with self.profiler.timer("restart"):
+            for conn in board.connections:
+                conn.clean_road()
 
     def _dfs_for_one_color(self, board: FlowFreeBoard, target_connection: Connection):
         """
         Busca un camino para UNA SOLA conexión usando DFS.
         MODIFICADO: Ahora también devuelve métricas de su búsqueda local.
+        Trabaja con ids de celda (tablas del tablero); solo el camino devuelto
+        se convierte a tuplas (x, y).
         """
-        start_point = target_connection.points[0]
-        end_point = target_connection.points[1]
+        start, end = target_connection.cells
+        moves = board.moves
 
-        frontier = [(start_point, [start_point])]
-        visited = {start_point}
+        frontier = [(start, [start])]
+        visited = {start}
         
         # --- MÉTRICAS LOCALES ---
         nodes_expanded_this_run = 0
         max_depth_this_run = 0
 
-        occupied_by_others = set()
-        for conn in board.connections:
-            if conn != target_connection:
-                occupied_by_others.update(conn.road)
-                occupied_by_others.update(conn.points)
+        with self.profiler.timer("occupancy"):
+            occupied_by_others = occupied_cells(board, target_connection)
+        path_copies = 0
+        trace = self.tracer if self.tracer.enabled else None
+        shuffle = self.rng.shuffle
 
         while frontier:
-            current_point, path = frontier.pop()
+            current, path = frontier.pop()
             nodes_expanded_this_run += 1
+            if trace is not None:
+                trace.expand(current)
             max_depth_this_run = max(max_depth_this_run, len(path))
 
-            if current_point == end_point:
-                return path, nodes_expanded_this_run, max_depth_this_run
+            if current == end:
+                self.profiler.count("path_copies", path_copies)
+                return [board.cell_points[cell] for cell in path], nodes_expanded_this_run, max_depth_this_run
 
-            (x, y) = current_point
-            neighbors = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
-            random.shuffle(neighbors)
+            # Las cuatro direcciones (-1 si no es válida), barajadas igual que antes
+            neighbors = list(moves[current])
+            shuffle(neighbors)
 
             for neighbor in neighbors:
-                if neighbor not in visited:
-                    if not board._validate_cell(neighbor[0], neighbor[1]):
-                        continue
-                    if neighbor in occupied_by_others:
-                        continue
-                    
+                if neighbor >= 0 and neighbor not in visited and neighbor not in occupied_by_others:
                     visited.add(neighbor)
                     new_path = path + [neighbor]
                     frontier.append((neighbor, new_path))
+                    path_copies += 1
         
+        self.profiler.count("path_copies", path_copies)
         return None, nodes_expanded_this_run, max_depth_this_run
 
     def play(self, board: FlowFreeBoard, level_name: str = "unknown_level"):
@@ -77,21 +88,19 @@ class DFSPlayer(Metrics):
         MODIFICADO: Ahora maneja el inicio/fin de la medición y llama a la generación de reportes.
         """
         # MANEJO DE MÉTRICAS GLOBALES (INICIO)
-        if self.start_time is None:
-            self.start_time = time.monotonic()
-            tracemalloc.start()
+        self._begin(board)
 
-        all_completed = all(conn.is_completed for conn in board.connections)
+        profiler = self.profiler
+        all_completed = board.all_completed()
 
-        if all_completed and board.percentage_filled() < 100:
-            board_state = self._get_hashable_state(board)
-            self.failed_states.add(board_state)
-            print(f"DFS Player: Callejón sin salida. Reiniciando. Memoria: {len(self.failed_states)}")
-            for conn in board.connections:
-                conn.clean_road()
+        if all_completed and not board.is_full():
+            profiler.count("dead_ends")
+            self.tracer.dead_end()
+            self._remember_failure(board)
+            self._restart(board)
             return board.connections[0].points[0]
 
-        if all_completed and board.percentage_filled() == 100:
+        if all_completed and board.is_full():
             print("DFS Player: ¡Solución encontrada!")
             # --- MANEJO DE MÉTRICAS GLOBALES (FIN) ---
             self._generate_reports(board, level_name)
@@ -101,12 +110,15 @@ class DFSPlayer(Metrics):
         
         untouched_connections = [conn for conn in incomplete_connections if not conn.road]
         if untouched_connections:
-            target_connection = random.choice(untouched_connections)
+            target_connection = self.rng.choice(untouched_connections)
         else:
-            target_connection = random.choice(incomplete_connections)
+            target_connection = self.rng.choice(incomplete_connections)
 
         # --- ACUMULACIÓN DE MÉTRICAS ---
-        path, nodes_expanded, max_depth = self._dfs_for_one_color(board, target_connection)
+        with profiler.timer("search"):
+            path, nodes_expanded, max_depth = self._dfs_for_one_color(board, target_connection)
+        with profiler.timer("commit_check"):
+            path = self._choose_path(board, target_connection, path)
         self.total_nodes_expanded += nodes_expanded
         self.max_search_depth_overall = max(self.max_search_depth_overall, max_depth)
 
@@ -114,11 +126,11 @@ class DFSPlayer(Metrics):
             target_connection.clean_road()
             for point in path:
                 target_connection.add_to_road(point)
+            self.tracer.commit(target_connection.key, path)
             return path[-1]
         else:
-            board_state = self._get_hashable_state(board)
-            self.failed_states.add(board_state)
-            print(f"DFS Player: Atascado en '{target_connection.name}'. Reiniciando. Memoria: {len(self.failed_states)}")
-            for conn in board.connections:
-                conn.clean_road()
+            profiler.count("stuck")
+            self.tracer.stuck(target_connection.key)
+            self._remember_failure(board)
+            self._restart(board)
             return board.connections[0].points[0]
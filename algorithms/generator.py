@@ -0,0 +1,388 @@
+"""
+Generador de niveles: crea tableros de cualquier tamaño, cantidad de colores y
+densidad de paredes, con una solución conocida y comprobada.
+
+1. Paredes: se ponen al azar ('walls' es la fracción de celdas) sin dejar
+   aisladas zonas libres.
+2. Partición: las celdas libres se cubren con caminos aleatorios. Cada camino
+   empieza en la celda libre con menos vecinos libres y avanza prefiriendo
+   también las celdas más encerradas (así no quedan huecos sueltos), y no
+   pasa junto a una celda propia que no sea la anterior: un camino que se
+   toca a sí mismo casi siempre admite un atajo y el nivel deja de ser único.
+   Los caminos de menos de 3 celdas se unen a un vecino; luego se unen
+   caminos por sus puntas hasta quedar en 'colors' y, si faltan, se parten los
+   más largos.
+3. Unicidad: algorithms.uniqueness cuenta hasta 2 soluciones con un
+   presupuesto de nodos (por defecto crece con las celdas libres), guiado
+   por la solución generada. Si aparece una segunda, el nivel se descarta y
+   se genera otro. Si se agota el presupuesto el nivel queda 'unverified'
+   (no se encontró otra solución, pero no está demostrado); solo se acepta
+   con allow_unverified. Desde 15x15 (más de CHECK_MAX_CELLS celdas libres)
+   el conteo casi nunca termina, ni con presupuestos 50 veces mayores, y en
+   30x30 cuesta unos 25 s por nivel: por defecto no se hace y esos niveles
+   quedan 'unchecked' (requieren allow_unverified). Con un 'max_nodes'
+   explícito se cuenta igual, lo que sirve para descartar niveles con otra
+   solución.
+
+Los niveles se escriben en el formato de levels/ ({ancho}x{alto}_{colores}C_{n}.txt);
+los que no están comprobados como únicos llevan el estado en el nombre
+({ancho}x{alto}_{colores}C_{n}-unverified.txt o -unchecked.txt), para que
+ningún benchmark los tome por verificados. Cada uno agrega una línea a
+manifest.jsonl en la misma carpeta, con la semilla (para regenerarlo), el
+estado de unicidad ('unique' y 'verified') y la solución como ids de celda
+(y * ancho + x) por color.
+
+Uso (desde 15x15 se requiere --allow-unverified y no se comprueba la unicidad salvo con --max-nodes):
+    python -m algorithms.generator --size 12 --colors 10 --count 100 --seed 1
+    python -m algorithms.generator --size 20 --height 15 --colors 14 --walls 0.05 --allow-unverified --workers 4
+"""
+import argparse
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from game.board import FlowFreeBoard, Connection, format_rows
+from algorithms.uniqueness import count_solutions
+
+DEFAULT_OUT = os.path.join("levels", "generated")
+# Presupuesto por defecto del conteo de soluciones: nodos por celda libre, con un mínimo
+NODES_PER_CELL = 25
+MIN_NODES = 2000
+# Celdas libres por encima de las cuales el conteo por defecto no se hace (14x14)
+CHECK_MAX_CELLS = 196
+
+
+def level_filename(width: int, height: int, colors: int, number: int, status: str) -> str:
+    """Nombre del archivo de un nivel; si su unicidad no está comprobada, el estado va en el nombre."""
+    tag = "" if status == "unique" else f"-{status}"
+    return f"{width}x{height}_{colors}C_{number}{tag}.txt"
+
+
+def _neighbor_table(width: int, height: int, walls: set) -> list:
+    """Vecinos libres de cada celda (por id), en orden derecha, izquierda, abajo, arriba."""
+    table = []
+    for cell in range(width * height):
+        if cell in walls:
+            table.append(())
+            continue
+        x, y = cell % width, cell // width
+        candidates = ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+        table.append(tuple(ny * width + nx for nx, ny in candidates
+                           if 0 <= nx < width and 0 <= ny < height and ny * width + nx not in walls))
+    return table
+
+
+def _place_walls(width: int, height: int, density: float, rng: random.Random) -> set:
+    """Paredes al azar; se salta toda pared que dejaría las celdas libres en más de una zona."""
+    walls = set()
+    wanted = int(width * height * density)
+    cells = list(range(width * height))
+    rng.shuffle(cells)
+    for cell in cells:
+        if len(walls) >= wanted:
+            break
+        walls.add(cell)
+        neighbors = _neighbor_table(width, height, walls)
+        free = [c for c in range(width * height) if c not in walls]
+        seen, frontier = {free[0]}, deque([free[0]])
+        while frontier:
+            for n in neighbors[frontier.popleft()]:
+                if n not in seen:
+                    seen.add(n)
+                    frontier.append(n)
+        if len(seen) != len(free):
+            walls.discard(cell)
+    return walls
+
+
+def _partition(neighbors: list, free: list, colors: int, rng: random.Random) -> list | None:
+    """Caminos (listas de ids) que cubren 'free' sin tocarse a sí mismos, o None si no se pudo."""
+    owner = {}
+    uncovered = set(free)
+    open_neighbors = {cell: len(neighbors[cell]) for cell in free}  # vecinos todavía sin cubrir
+    target = max(3, len(free) // colors)
+
+    def cover(cell: int, path_id: int) -> None:
+        owner[cell] = path_id
+        uncovered.discard(cell)
+        for n in neighbors[cell]:
+            if n in uncovered:
+                open_neighbors[n] -= 1
+
+    def most_enclosed(cells: list) -> int:
+        fewest = min(open_neighbors[c] for c in cells)
+        return rng.choice([c for c in cells if open_neighbors[c] == fewest])
+
+    paths = {}
+    while uncovered:
+        path_id = len(paths)
+        path = [most_enclosed(list(uncovered))]
+        cover(path[0], path_id)
+        length = rng.randint(max(3, target // 2), target * 2)
+        turned = False
+        while len(path) < length:
+            head = path[-1]
+            options = [n for n in neighbors[head] if n in uncovered]
+            if len(path) >= 2:
+                options = [n for n in options if not any(m != head and owner.get(m) == path_id for m in neighbors[n])]
+            if not options:
+                if turned:
+                    break
+                # Atascado: se sigue creciendo por la otra punta
+                path.reverse()
+                turned = True
+                continue
+            path.append(most_enclosed(options))
+            cover(path[-1], path_id)
+        paths[path_id] = path
+
+    def touches_itself(path: list) -> bool:
+        position = {cell: i for i, cell in enumerate(path)}
+        return any(abs(position.get(m, i) - i) > 1 for i, cell in enumerate(path) for m in neighbors[cell])
+
+    def joins(path_id: int, cut: bool = False, touching: bool = False) -> list:
+        """
+        Uniones de 'path_id' con un camino vecino, como (ids que desaparecen,
+        caminos nuevos). Por las puntas de los dos caminos o, con 'cut', también
+        partiendo el vecino en la celda que toca y uniendo una de sus partes (la
+        otra queda como camino propio). Con 'touching' se aceptan uniones que
+        se tocan a sí mismas.
+        """
+        path = paths[path_id]
+        found = []
+        for end in {path[0], path[-1]}:
+            oriented = path if end == path[-1] else path[::-1]  # termina en 'end'
+            for n in neighbors[end]:
+                other_id = owner[n]
+                if other_id == path_id:
+                    continue
+                other = paths[other_id]
+                i = other.index(n)
+                if n == other[0] or n == other[-1]:
+                    pieces = [(other if i == 0 else other[::-1], [])]
+                elif cut:
+                    pieces = [(other[i:], other[:i]), (other[i::-1], other[i + 1:])]
+                else:
+                    continue
+                for piece, rest in pieces:
+                    joined = oriented + piece
+                    if touching or not touches_itself(joined):
+                        found.append(({path_id, other_id}, [joined] + ([rest] if rest else [])))
+        return found
+
+    def apply(option: tuple) -> None:
+        removed, created = option
+        for path_id in removed:
+            del paths[path_id]
+        for path in created:
+            path_id = max(paths, default=-1) + 1
+            paths[path_id] = path
+            for cell in path:
+                owner[cell] = path_id
+
+    # Arreglos con un presupuesto de pasos: caminos de menos de 3 celdas se unen
+    # a un vecino (partiéndolo si hace falta); si sobran caminos se unen por las
+    # puntas, y cuando ya no hay uniones directas se reacomoda uno partiendo un
+    # vecino (no cambia la cantidad, pero abre uniones nuevas). Tras muchos
+    # reacomodos seguidos sin unión se aceptan caminos que se tocan a sí mismos:
+    # el nivel casi seguro tendrá otra solución, que el conteo encuentra enseguida.
+    stuck = 0
+    for _ in range(4 * len(free)):
+        short = [path_id for path_id, path in paths.items() if len(path) < 3]
+        if short:
+            path_id = rng.choice(short)
+            options = joins(path_id) or joins(path_id, cut=True) or joins(path_id, cut=True, touching=True)
+            if not options:
+                return None
+            apply(rng.choice(options))
+        elif len(paths) > colors:
+            order = sorted(paths, key=lambda i: (len(paths[i]), rng.random()))
+            options = next((found for found in map(joins, order) if found), None)
+            if options is None and stuck >= 20:
+                options = next((found for found in (joins(i, touching=True) for i in order) if found), None)
+            if options:
+                stuck = 0
+                apply(min(options, key=lambda option: (len(option[1][0]), rng.random())))
+                continue
+            stuck += 1
+            path_id = rng.choice(order)
+            options = [option for option in joins(path_id, cut=True, touching=stuck >= 20) if len(option[1]) == 2]
+            if options:
+                apply(rng.choice(options))
+        else:
+            break
+    else:
+        return None
+
+    result = list(paths.values())
+    while len(result) < colors:
+        longest = max(range(len(result)), key=lambda i: len(result[i]))
+        path = result[longest]
+        if len(path) < 6:
+            return None
+        cut = rng.randint(3, len(path) - 3)
+        result[longest], tail = path[:cut], path[cut:]
+        result.append(tail)
+    return result
+
+
+def _rows(width: int, height: int, walls: set, paths: list) -> list:
+    """
+    Filas del nivel en el formato de levels/: id del color en los extremos, '.'
+    y '#'. Las letras de la paleta alcanzan para 14 colores; con más, los ids
+    son números y las celdas van separadas por espacios.
+    """
+    ids = list(Connection.NAMES) if len(paths) <= len(Connection.NAMES) else [str(i) for i in range(1, len(paths) + 1)]
+    grid = ["#" if cell in walls else "." for cell in range(width * height)]
+    for key, path in zip(ids, paths):
+        grid[path[0]] = grid[path[-1]] = key
+    return format_rows([grid[y * width:(y + 1) * width] for y in range(height)])
+
+
+def generate_level(width: int, height: int, colors: int, walls: float = 0.0, seed: int = None,
+                   max_nodes: int = None, allow_unverified: bool = False, check: bool = True,
+                   attempts: int = 200, time_limit: float = None) -> dict | None:
+    """
+    Genera un nivel. Devuelve un dict con 'rows' (filas del nivel), 'solution'
+    (ids de celda de cada camino, en el orden de board.connections), 'unique'
+    ('unique', 'unverified' o 'unchecked'), 'nodes' (nodos del conteo),
+    'attempts' y 'seed', o None si ninguno de los 'attempts' intentos dio un
+    nivel aceptable o se agotaron los 'time_limit' segundos. La misma semilla
+    da el mismo nivel. Sin 'max_nodes' el conteo tiene NODES_PER_CELL nodos
+    por celda libre (al menos MIN_NODES) y no se hace con más de
+    CHECK_MAX_CELLS celdas libres: el nivel queda 'unchecked', así que hace
+    falta allow_unverified (ValueError si no).
+    """
+    if width * height < 3 * colors:
+        raise ValueError(f"Un tablero de {width}x{height} no alcanza para {colors} colores")
+    seed = random.randrange(2**32) if seed is None else seed
+    rng = random.Random(seed)
+    wall_cells = _place_walls(width, height, walls, rng) if walls else set()
+    neighbors = _neighbor_table(width, height, wall_cells)
+    free = [cell for cell in range(width * height) if cell not in wall_cells]
+    if check and not max_nodes and len(free) > CHECK_MAX_CELLS:
+        if not allow_unverified:
+            raise ValueError(f"La unicidad de un tablero de {len(free)} celdas libres no se puede comprobar "
+                             f"(más de {CHECK_MAX_CELLS}): hace falta allow_unverified o un max_nodes explícito")
+        check = False
+    max_nodes = max_nodes or max(MIN_NODES, NODES_PER_CELL * len(free))
+    deadline = time.monotonic() + time_limit if time_limit else None
+
+    for attempt in range(1, attempts + 1):
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        paths = _partition(neighbors, free, colors, rng)
+        if paths is None:
+            continue
+        rows = _rows(width, height, wall_cells, paths)
+        board = FlowFreeBoard.from_lines(rows, name="<generado>")
+        # Los caminos en el orden de las conexiones del tablero (orden de lectura de su primer extremo)
+        by_end = {path[0]: path for path in paths}
+        by_end.update({path[-1]: path[::-1] for path in paths})
+        solution = [by_end[conn.cells[0]] for conn in board.connections]
+
+        status, nodes = "unchecked", 0
+        if check:
+            solutions, nodes, complete = count_solutions(board, limit=2, max_nodes=max_nodes, hint=solution)
+            if solutions > 1:
+                continue
+            status = "unique" if complete else "unverified"
+            if status == "unverified" and not allow_unverified:
+                continue
+        return {"rows": rows, "solution": solution, "unique": status, "nodes": nodes,
+                "attempts": attempt, "seed": seed}
+    return None
+
+
+def _next_number(out: str, width: int, height: int, colors: int) -> int:
+    pattern = re.compile(rf"^{width}x{height}_{colors}C_(\d+)(?:-\w+)?\.txt$")
+    numbers = [int(m.group(1)) for m in map(pattern.match, os.listdir(out)) if m]
+    return max(numbers, default=0) + 1
+
+
+def _generate_task(task: tuple) -> dict | None:
+    width, height, colors, walls, seed, options = task
+    return generate_level(width, height, colors, walls, seed, **options)
+
+
+class _Serial:
+    """Sustituto de Pool en el mismo proceso (workers=1)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap(self, function, iterable):
+        return map(function, iterable)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generador de niveles con solución única. Desde 15x15 el conteo de soluciones casi nunca "
+                    "termina: esos tamaños requieren --allow-unverified, no se cuentan salvo con --max-nodes y "
+                    "sus niveles llevan '-unchecked' o '-unverified' en el nombre.")
+    parser.add_argument("--size", type=int, required=True, help="Ancho del tablero")
+    parser.add_argument("--height", type=int, default=None, help="Alto (por defecto, igual al ancho)")
+    parser.add_argument("--colors", type=int, required=True)
+    parser.add_argument("--walls", type=float, default=0.0, help="Fracción de celdas que son pared")
+    parser.add_argument("--count", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--max-nodes", type=int, default=None,
+                        help=f"Presupuesto del conteo de soluciones (por defecto, {NODES_PER_CELL} por celda libre, "
+                             f"al menos {MIN_NODES}, y sin conteo con más de {CHECK_MAX_CELLS} celdas libres)")
+    parser.add_argument("--allow-unverified", action="store_true",
+                        help="Acepta niveles cuyo conteo agotó el presupuesto sin encontrar otra solución, "
+                             "guardados con '-unverified' en el nombre. Necesario desde 15x15, donde por defecto "
+                             "no se cuenta y los niveles llevan '-unchecked'")
+    parser.add_argument("--no-check", action="store_true", help="No comprueba la unicidad")
+    parser.add_argument("--attempts", type=int, default=200, help="Particiones por nivel antes de rendirse")
+    parser.add_argument("--level-timeout", type=float, default=60.0,
+                        help="Segundos por nivel antes de rendirse (0 = sin límite)")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    width, height = args.size, args.height or args.size
+    free = width * height - int(width * height * args.walls)
+    if not args.no_check and not args.max_nodes and not args.allow_unverified and free > CHECK_MAX_CELLS:
+        parser.error(f"con {free} celdas libres (más de {CHECK_MAX_CELLS}) la unicidad no se comprueba: "
+                     f"usa --allow-unverified, --no-check o un --max-nodes explícito")
+    os.makedirs(args.out, exist_ok=True)
+    seeds = random.Random(args.seed)
+    options = {"max_nodes": args.max_nodes, "allow_unverified": args.allow_unverified,
+               "check": not args.no_check, "attempts": args.attempts, "time_limit": args.level_timeout}
+    tasks = [(width, height, args.colors, args.walls, seeds.randrange(2**32), options) for _ in range(args.count)]
+
+    start = time.perf_counter()
+    written = failed = 0
+    number = _next_number(args.out, width, height, args.colors)
+    with Pool(args.workers) if args.workers > 1 else _Serial() as pool:
+        for level in pool.imap(_generate_task, tasks):
+            if level is None:
+                failed += 1
+                continue
+            name = level_filename(width, height, args.colors, number, level["unique"])
+            number += 1
+            with open(os.path.join(args.out, name), "w", encoding="utf-8", newline="\r\n") as f:
+                f.write("\n".join(level["rows"]))
+            entry = {"file": name, "width": width, "height": height, "colors": args.colors, "walls": args.walls,
+                     "seed": level["seed"], "unique": level["unique"], "verified": level["unique"] == "unique",
+                     "check_nodes": level["nodes"],
+                     "attempts": level["attempts"], "solution": level["solution"]}
+            with open(os.path.join(args.out, "manifest.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            written += 1
+            print(f"{name}: {level['unique']} ({level['nodes']} nodos, {level['attempts']} intento(s))")
+    elapsed = time.perf_counter() - start
+    print(f"{written} nivel(es) en {args.out} en {elapsed:.1f} s"
+          + (f"; {failed} sin resultado tras {args.attempts} intentos o {args.level_timeout:g} s" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
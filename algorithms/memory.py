@@ -0,0 +1,191 @@
+import hashlib
+
+# Bytes aproximados que ocupa cada entrada además de su clave: el objeto bytes,
+# su casilla en el diccionario y en la lista de la tabla, y su marca CLOCK
+ENTRY_OVERHEAD = 120
+
+
+def state_bytes(state) -> bytes:
+    """
+    Forma canónica de un estado (sus bytes): la misma en todos los procesos,
+    a diferencia de hash(), que para str y bytes depende de PYTHONHASHSEED.
+    """
+    return state if isinstance(state, bytes) else repr(state).encode()
+
+
+def fingerprint(state) -> int:
+    """
+    Huella de 64 bits estable entre procesos de un estado. El 0 queda
+    reservado para las casillas vacías de las tablas que lo usan.
+    """
+    digest = hashlib.blake2b(state_bytes(state), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class DeadEndMemory:
+    """
+    Memoria de estados fallidos con presupuesto fijo de bytes, con la interfaz
+    de set que usan los agentes (add, in, len).
+
+    - Delante, un filtro de Bloom de 'bits_per_entry' bits por entrada: la
+      mayoría de las consultas de estados nuevos se responden sin tocar la
+      tabla. Sus posiciones salen de fingerprint(), así que no dependen del
+      proceso.
+    - Detrás, una tabla exacta con los estados mismos (state_bytes()) y
+      desalojo CLOCK: una consulta acertada marca la entrada, y el puntero da
+      una segunda oportunidad a las marcadas antes de desalojar. Como guarda
+      el estado y no una huella, la tabla no da falsos positivos: los del
+      filtro se descartan aquí.
+
+    'capacity' es el presupuesto en bytes de la tabla y del filtro juntos. Cada
+    entrada cuesta el largo de su clave más ENTRY_OVERHEAD (una estimación), así
+    que en tableros grandes caben menos estados. El filtro no permite borrar;
+    se reconstruye cuando se desaloja la mitad de las entradas y se agranda al
+    doble cuando las entradas superan las previstas (el costo amortizado sigue
+    siendo O(1) por inserción).
+    """
+
+    def __init__(self, capacity: int = 32 * 2**20, bits_per_entry: int = 10):
+        self.capacity = max(1, capacity)
+        self.bits_per_entry = bits_per_entry
+        # Número óptimo de funciones hash: (m / n) * ln 2
+        self.hashes = max(1, round(bits_per_entry * 0.693))
+        self._expected = 1024                 # entradas para las que está dimensionado el filtro
+        self._resize_bloom()
+        self._slots = {}                      # clave -> posición en la tabla
+        self._keys = []                       # posición -> clave (None si está libre)
+        self._referenced = bytearray()
+        self._free = []
+        self._hand = 0
+        self._stale = 0
+        self.bytes = 0                        # claves más ENTRY_OVERHEAD por entrada
+        # Estadísticas
+        self.lookups = 0
+        self.hits = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+        self.inserts = 0
+        self.evictions = 0
+
+    def _resize_bloom(self) -> None:
+        self.bits = max(64, self._expected * self.bits_per_entry)
+        self._bloom = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: bytes):
+        # Doble hash sobre las dos mitades de la huella
+        value = fingerprint(key)
+        h1, h2 = value & 0xFFFFFFFF, (value >> 32) | 1
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def _bloom_contains(self, key: bytes) -> bool:
+        bloom = self._bloom
+        for p in self._positions(key):
+            if not bloom[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def _bloom_add(self, key: bytes) -> None:
+        bloom = self._bloom
+        for p in self._positions(key):
+            bloom[p >> 3] |= 1 << (p & 7)
+
+    def _rebuild_bloom(self) -> None:
+        self._resize_bloom()
+        for key in self._slots:
+            self._bloom_add(key)
+        self._stale = 0
+
+    def _evict(self) -> None:
+        """Avanza el puntero CLOCK hasta una entrada no marcada y la libera."""
+        keys, referenced = self._keys, self._referenced
+        while True:
+            slot = self._hand
+            self._hand = (slot + 1) % len(keys)
+            key = keys[slot]
+            if key is None:
+                continue
+            if referenced[slot]:
+                referenced[slot] = 0
+                continue
+            del self._slots[key]
+            keys[slot] = None
+            self._free.append(slot)
+            self.bytes -= len(key) + ENTRY_OVERHEAD
+            self.evictions += 1
+            self._stale += 1
+            if self._stale >= max(1, len(self._slots) // 2):
+                self._rebuild_bloom()
+            return
+
+    def __contains__(self, state) -> bool:
+        self.lookups += 1
+        key = state_bytes(state)
+        if not self._bloom_contains(key):
+            self.bloom_negatives += 1
+            return False
+        slot = self._slots.get(key)
+        if slot is None:
+            self.false_positives += 1
+            return False
+        self._referenced[slot] = 1
+        self.hits += 1
+        return True
+
+    def add(self, state) -> None:
+        key = state_bytes(state)
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._referenced[slot] = 1
+            return
+        cost = len(key) + ENTRY_OVERHEAD
+        if cost + len(self._bloom) > self.capacity:
+            return  # Un estado más grande que todo el presupuesto no se guarda
+        while self._slots and self.bytes + cost + len(self._bloom) > self.capacity:
+            self._evict()
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+            self._referenced[slot] = 0
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._referenced.append(0)
+        self._slots[key] = slot
+        self.bytes += cost
+        self.inserts += 1
+        if len(self._slots) > self._expected:
+            self._expected *= 2
+            self._rebuild_bloom()
+        else:
+            self._bloom_add(key)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def clear(self) -> None:
+        self._slots.clear()
+        self._keys = []
+        self._referenced = bytearray()
+        self._free = []
+        self._hand = 0
+        self._stale = 0
+        self.bytes = 0
+        self._bloom = bytearray(len(self._bloom))
+
+    def stats(self) -> dict:
+        misses = self.lookups - self.hits
+        return {
+            "size": len(self._slots),
+            "bytes": self.bytes,
+            "capacity": self.capacity,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 6) if self.lookups else 0.0,
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+            "false_positive_rate": round(self.false_positives / misses, 6) if misses else 0.0,
+            "inserts": self.inserts,
+            "evictions": self.evictions,
+            "bloom_bytes": len(self._bloom),
+        }
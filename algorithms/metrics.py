@@ -1,77 +1,262 @@
-import os
+import random
 import time
 import tracemalloc
-import csv
+from itertools import islice
 from abc import abstractmethod
 
 from game.base_player import Player
-from game.flow_free import FlowFreeBoard, Connection
+from game.board import FlowFreeBoard, Connection
+from algorithms.results import ResultSink, default_sink
+from algorithms.profiler import Profiler, NULL_PROFILER
+from algorithms.trace import TraceWriter, NULL_TRACER
+from algorithms.telemetry import Telemetry, NULL_TELEMETRY
+from algorithms import solution
+from algorithms.paths import enumerate_paths, sealed_region
+
+# Patrones aprendidos por color y nivel como máximo (los siguientes se descartan)
+NOGOODS_PER_COLOR = 256
 
 class Metrics(Player):
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, sink: ResultSink = None, seed: int = None, commit_alternatives: int = 0):
         super().__init__()
         self.name = name
+        # Destino de los resultados (CSV, JSONL o SQLite). El compartido por
+        # defecto es el de las partidas interactivas: cada registro se vuelca
+        # al generarse, no al llenar el lote o al salir
+        self.sink = sink or default_sink()
+        self._flush_reports = sink is None
+        self.run_id = None
+        # Argumentos del constructor que se guardan en el registro para repetir
+        # la ejecución (los asigna algorithms.runner)
+        self.agent_kwargs = None
+        # Generador propio: con la misma semilla la ejecución se repite exactamente
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**32)
+        self.rng = random.Random(self.seed)
+        # Temporizadores y contadores por fase (desactivados por defecto)
+        self.profiler = NULL_PROFILER
+        # Traza de eventos de búsqueda (desactivada por defecto)
+        self.tracer = NULL_TRACER
+        # Progreso periódico de resoluciones largas (desactivado por defecto)
+        self.telemetry = NULL_TELEMETRY
         
         # Métricas de ren~dimiento
         self.start_time = None
         self.total_nodes_expanded = 0
         self.max_search_depth_overall = 0
+        self.total_restarts = 0
+
+        # Memoria de callejones: las subclases que reinician la reemplazan
+        self.failed_states = None
+        # Patrones que sellan una región, por (nivel, color): (celdas que la
+        # bloquean, región), ver _is_nogood()
+        self.nogoods = {}
+        # Alternativas que se prueban cuando el camino encontrado está descartado,
+        # y expansiones de enumerate_paths permitidas para buscarlas (0 = no se buscan)
+        self.commit_alternatives = commit_alternatives
+        self.commit_expansions = 256
+        # Hora límite (time.monotonic()) de la llamada a solve() en curso, para
+        # agentes que resuelven todo el nivel dentro de un solo play()
+        self.deadline = None
+
+    def _begin(self, board: FlowFreeBoard) -> None:
+        """
+        Se llama al inicio de cada jugada: en la primera inicia la medición (y la
+        traza); en todas da a la telemetría la oportunidad de reportar.
+        """
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+            tracemalloc.start()
+            self.tracer.start(board, self)
+        self.telemetry.tick(self, board)
+
+    @staticmethod
+    def _state_key(board: FlowFreeBoard, target: Connection = None, path: list = None) -> tuple:
+        """
+        Clave del estado del tablero: el camino de cada conexión. Con 'target' y
+        'path' es la clave del estado que resultaría de aplicar 'path' a 'target',
+        sin modificar el tablero.
+        """
+        return tuple(tuple(path) if conn is target else tuple(conn.road) for conn in board.connections)
+
+    @staticmethod
+    def _touches_wall(board: FlowFreeBoard, path: list) -> bool:
+        """True si alguna celda del camino tiene al lado el borde del tablero o una pared."""
+        columns, moves = board.columns, board.moves
+        return any(-1 in moves[y * columns + x] for x, y in path)
+
+    def _is_nogood(self, board: FlowFreeBoard, conn: Connection, path: list) -> bool:
+        """
+        True si el camino sella una región. Lo que se aprende es el patrón (las
+        celdas que rodean la región, la región): cualquier camino posterior del
+        mismo color en este nivel que pase por todas esas celdas y por ninguna
+        de la región la vuelve a sellar, sea cual sea el resto del tablero.
+
+        La región solo se busca (un recorrido de todo el tablero) si el camino
+        toca el borde o una pared: sealed_region no cuenta los demás caminos,
+        así que sin el borde o una pared casi nunca hay nada que cerrar. Un
+        camino que se cierra sobre sí mismo en el interior no se aprende.
+        """
+        known = self.nogoods.setdefault((tuple(board.board), conn.index), [])
+        cells = set(path)
+        for blocking, region in known:
+            if blocking <= cells and region.isdisjoint(cells):
+                self.profiler.count("nogood_hits")
+                return True
+        if not self._touches_wall(board, path):
+            return False
+        self.profiler.count("sealed_checks")
+        region = sealed_region(board, conn, path)
+        if region is None:
+            return False
+        if len(known) < NOGOODS_PER_COLOR:
+            columns, points = board.columns, board.cell_points
+            blocking = frozenset(points[n] for x, y in region for n in board.neighbors[y * columns + x]
+                                 if points[n] not in region)
+            known.append((blocking, region))
+            self.profiler.count("nogoods_learned")
+        return True
+
+    def _admissible(self, board: FlowFreeBoard, conn: Connection, path: list) -> bool:
+        """Un camino es admisible si no sella una región ni lleva a un estado fallido conocido."""
+        if self._is_nogood(board, conn, path):
+            return False
+        return self.failed_states is None or self._state_key(board, conn, path) not in self.failed_states
+
+    def _choose_path(self, board: FlowFreeBoard, conn: Connection, path: list) -> list | None:
+        """
+        Paso previo a aplicar un camino: si 'path' no es admisible, prueba hasta
+        'commit_alternatives' alternativas de enumerate_paths (en orden de
+        longitud, con a lo sumo 'commit_expansions' expansiones). Desactivado por
+        defecto en los agentes aleatorios: enumerar alternativas en cada commit
+        rechazado cuesta más que el reinicio que evita. Un agente determinista
+        (BFS) las necesita: sin ellas, tras reiniciar vuelve a elegir el mismo
+        camino rechazado. Devuelve el camino a aplicar, o None si no hay ninguno.
+        """
+        if not path or self._admissible(board, conn, path):
+            return path
+        self.profiler.count("pruned_commits")
+        if self.commit_alternatives <= 0:
+            return None
+        candidates = enumerate_paths(board, conn, max_expansions=self.commit_expansions)
+        for candidate in islice(candidates, self.commit_alternatives):
+            self.profiler.count("alternatives_tried")
+            if candidate != path and self._admissible(board, conn, candidate):
+                return candidate
+        return None
 
     @abstractmethod
     def play(self, board: FlowFreeBoard, level_name: str):
         pass
 
-    def _generate_reports(self, final_board: FlowFreeBoard, level_name: str):
-        """Crea los archivos de salida .txt y .csv con las métricas de rendimiento."""
-        running_time = time.monotonic() - self.start_time
-        _, max_ram_usage = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        max_ram_usage /= 1024**2  # Convertir a MB
+    def solve(self, board: FlowFreeBoard, level_name: str = "unknown_level", timeout: float = None,
+              should_stop=None) -> bool:
+        """
+        Bucle sin interfaz: llama a play() hasta llenar el tablero, sin generar
+        reportes. Se detiene al agotar 'timeout' (segundos) o cuando
+        'should_stop()' devuelve True. Devuelve True si el tablero quedó resuelto.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        self.deadline = deadline
+        try:
+            self._begin(board)  # Un tablero ya lleno no llega a llamar a play()
+            while not board.is_full():
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                if should_stop is not None and should_stop():
+                    return False
+                if self.play(board, level_name) is None:
+                    break
+            return board.is_full()
+        finally:
+            self.deadline = None
+
+    def enable_profiling(self) -> Profiler:
+        """Activa el perfilado por fases; el desglose se añade a los reportes."""
+        if not self.profiler.enabled:
+            self.profiler = Profiler()
+        return self.profiler
 
+    def enable_tracing(self, path: str, buffer_size: int = 4096) -> TraceWriter:
+        """Activa la traza de eventos de búsqueda hacia 'path' (ver algorithms.trace)."""
+        self.tracer.close()
+        self.tracer = TraceWriter(path, buffer_size)
+        return self.tracer
+
+    def enable_telemetry(self, interval: float = 1.0, path: str = None, stream=None) -> Telemetry:
+        """
+        Activa el reporte periódico de progreso cada 'interval' segundos, a la
+        terminal (stderr por defecto) y/o a un archivo JSONL 'path'.
+        """
+        self.telemetry.close()
+        self.telemetry = Telemetry(interval, path, stream)
+        return self.telemetry
+
+    def reserve_run_id(self) -> int:
+        """Reserva el run_id de la próxima ejecución en el sink de resultados."""
+        if self.run_id is None:
+            self.run_id = self.sink.next_run_id()
+        return self.run_id
+
+    def _build_record(self, final_board: FlowFreeBoard, level_name: str, running_time: float, max_ram_usage: float) -> dict:
+        """Arma el registro de resultados de una ejecución."""
         cost_of_path = sum(len(conn.road) - 1 for conn in final_board.connections)
         search_depth = cost_of_path  # La profundidad de la solución es el total de celdas del camino
 
         path_to_goal_matrix = [['' for _ in range(final_board.columns)] for _ in range(final_board.rows)]
         for conn in final_board.connections:
-            # Encuentra la letra inicial del color
-            char = next((key for key, value in Connection.NAMES.items() if value == conn.name), '?')
             for (px, py) in conn.road:
-                path_to_goal_matrix[py][px] = char
+                path_to_goal_matrix[py][px] = conn.key
 
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # A TXT
-        file_base_name = f"{level_name.replace('.txt', '')}"
-        txt_filename = os.path.join(output_dir, f"{file_base_name}.txt")
-        with open(txt_filename, 'w') as f:
-            f.write(f"path_to_goal: {path_to_goal_matrix}\n")
-            f.write(f"cost_of_path: {cost_of_path}\n")
-            f.write(f"nodes_expanded: {self.total_nodes_expanded}\n")
-            f.write(f"search_depth: {search_depth}\n")
-            f.write(f"max_search_depth: {self.max_search_depth_overall}\n")
-            f.write(f"running_time: {running_time:.8f}\n")
-            f.write(f"max_ram_usage: {max_ram_usage:.8f}\n")
-        print(f"\nReporte .txt guardado en: {txt_filename}")
-        
-        csv_filename = os.path.join(output_dir, "benchmark.csv")
-        file_exists = os.path.isfile(csv_filename)
-        
-        with open(csv_filename, 'a', newline='') as f:
-            writer = csv.writer(f)
-            headers = ["Algorithm-Level", "cost_of_path", "nodes_expanded", "search_depth", "max_search_depth", "running_time", "max_ram_usage"]
-            if not file_exists:
-                writer.writerow(headers)
-            
-            row_data = [
-                f"{level_name.replace('.txt', '')}",
-                cost_of_path,
-                self.total_nodes_expanded,
-                search_depth,
-                self.max_search_depth_overall,
-                f"{running_time:.8f}",
-                f"{max_ram_usage:.8f}"
-            ]
-            writer.writerow(row_data)
-        print(f"Resultados añadidos a: {csv_filename}")
\ No newline at end of file
+        record = {
+            "run_id": self.run_id,
+            "Algorithm-Level": f"{level_name.replace('.txt', '')}",
+            "agent": type(self).__name__,
+            "level": final_board.path,
+            "seed": self.seed,
+            "kwargs": self.agent_kwargs,
+            "cost_of_path": cost_of_path,
+            "nodes_expanded": self.total_nodes_expanded,
+            "search_depth": search_depth,
+            "max_search_depth": self.max_search_depth_overall,
+            "restarts": self.total_restarts,
+            "nogoods": sum(len(patterns) for patterns in self.nogoods.values()),
+            "running_time": f"{running_time:.8f}",
+            "max_ram_usage": f"{max_ram_usage:.8f}",
+            "path_to_goal": path_to_goal_matrix,
+            "solution": solution.encode(final_board),
+        }
+        # Estadísticas de la memoria de callejones (tamaño, aciertos, falsos positivos)
+        if hasattr(self.failed_states, "stats"):
+            record["dead_end_memory"] = self.failed_states.stats()
+        return record
+
+    def _finish_unsolved(self, final_board: FlowFreeBoard) -> None:
+        """Cierra la medición de una ejecución que no resolvió el nivel (sin registro)."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.tracer.finish(solved=False, nodes=self.total_nodes_expanded)
+        self.telemetry.finish(self, final_board)
+
+    def _generate_reports(self, final_board: FlowFreeBoard, level_name: str):
+        """Envía las métricas de rendimiento de la ejecución al sink de resultados."""
+        running_time = time.monotonic() - self.start_time
+        _, max_ram_usage = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        max_ram_usage /= 1024**2  # Convertir a MB
+        self.tracer.finish(solved=True, nodes=self.total_nodes_expanded)
+        self.telemetry.finish(self, final_board)
+
+        self.reserve_run_id()
+        with self.profiler.timer("report"):
+            record = self._build_record(final_board, level_name, running_time, max_ram_usage)
+        if self.profiler.enabled:
+            record["profile"] = self.profiler.as_dict()
+            print(f"Perfil de {self.name} (tiempo total {running_time:.6f} s):")
+            print(self.profiler.table(running_time))
+        self.sink.write(record)
+        if self._flush_reports:
+            self.sink.flush()
+        self.run_id = None
+        print(f"Resultados añadidos a: {self.sink.path}")
+        return record
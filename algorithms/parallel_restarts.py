@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+
+from game.board import FlowFreeBoard
+from algorithms.results import ResultSink
+from algorithms.astar import AStarPlayer
+from algorithms.portfolio import PortfolioPlayer, member_label
+from algorithms.memory import fingerprint
+
+
+class SharedStateTable:
+    """
+    Conjunto de estados fallidos compartido entre procesos, sin Manager: una
+    tabla de direccionamiento abierto de huellas de 64 bits en memoria
+    compartida, dividida en franjas con un candado cada una. Las inserciones
+    bloquean solo su franja; las consultas no bloquean, porque una casilla solo
+    pasa de vacía a ocupada y nunca se borra.
+
+    Tiene la interfaz de set que usan los agentes (add, in, len). Si una franja
+    se llena, las nuevas huellas de esa franja se descartan.
+    """
+
+    def __init__(self, capacity: int = 1 << 20, stripes: int = 64):
+        self.stripes = stripes
+        self.stripe_size = max(1, capacity // stripes)
+        self.capacity = self.stripe_size * stripes
+        self._slots = multiprocessing.RawArray("Q", self.capacity)
+        self._locks = [multiprocessing.Lock() for _ in range(stripes)]
+        self._size = multiprocessing.Value("q", 0)
+        self._dropped = multiprocessing.Value("q", 0)
+
+    def _probe(self, key: int):
+        """Recorre las casillas de la franja de 'key' empezando por su posición."""
+        stripe = key % self.stripes
+        base = stripe * self.stripe_size
+        offset = (key // self.stripes) % self.stripe_size
+        for i in range(self.stripe_size):
+            yield base + (offset + i) % self.stripe_size
+
+    def __contains__(self, state) -> bool:
+        key = fingerprint(state)
+        for slot in self._probe(key):
+            value = self._slots[slot]
+            if value == key:
+                return True
+            if value == 0:
+                return False
+        return False
+
+    def add(self, state) -> None:
+        key = fingerprint(state)
+        stripe = key % self.stripes
+        with self._locks[stripe]:
+            for slot in self._probe(key):
+                value = self._slots[slot]
+                if value == key:
+                    return
+                if value == 0:
+                    self._slots[slot] = key
+                    with self._size.get_lock():
+                        self._size.value += 1
+                    return
+        with self._dropped.get_lock():
+            self._dropped.value += 1
+
+    def __len__(self) -> int:
+        return self._size.value
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped.value
+
+
+def _run_restart_worker(index: int, factory, kwargs: dict, board: FlowFreeBoard, level_name: str,
+                        timeout: float, seed: int, failed_states: SharedStateTable, results) -> None:
+    """Proceso de un trabajador: semilla propia y memoria de fallos compartida."""
+    solved, roads, nodes, depth = False, None, 0, 0
+    try:
+        player = factory(**{"seed": seed, **kwargs})
+        player.failed_states = failed_states
+        solved = player.solve(board, level_name, timeout=timeout)
+        roads = [list(conn.road) for conn in board.connections]
+        nodes, depth = player.total_nodes_expanded, player.max_search_depth_overall
+    finally:
+        results.put((index, solved, roads, nodes, depth))
+
+
+class ParallelRestartPlayer(PortfolioPlayer):
+    """
+    Reinicio aleatorio en paralelo: N trabajadores con el mismo agente y
+    semillas distintas exploran a la vez, comparten la memoria de estados
+    fallidos y se detienen en cuanto uno resuelve el nivel.
+    """
+
+    def __init__(self, factory=AStarPlayer, kwargs: dict = None, workers: int = None, seed: int = None,
+                 capacity: int = 1 << 20, timeout: float = None, sink: ResultSink = None):
+        workers = workers or os.cpu_count() or 1
+        super().__init__(members=[(factory, kwargs or {})] * workers, timeout=timeout, sink=sink, seed=seed)
+        self.name = "ParallelRestart"
+        self.capacity = capacity
+        self.failed_states = None
+
+    def _spawn(self, index: int, factory, kwargs: dict, board: FlowFreeBoard, level_name: str,
+               timeout: float, results):
+        if self.failed_states is None:
+            self.failed_states = SharedStateTable(self.capacity)
+        return multiprocessing.Process(
+            target=_run_restart_worker, daemon=True,
+            args=(index, factory, kwargs, board, level_name, timeout, self.member_seed(index),
+                  self.failed_states, results))
+
+    def _build_record(self, final_board: FlowFreeBoard, level_name: str, running_time: float, max_ram_usage: float) -> dict:
+        record = super()._build_record(final_board, level_name, running_time, max_ram_usage)
+        record["Algorithm-Level"] = f"{level_name.replace('.txt', '')}: ParallelRestart[{member_label(*self.members[0])} x{len(self.members)}]."
+        record["workers"] = len(self.members)
+        record["failed_states"] = len(self.failed_states) if self.failed_states is not None else 0
+        return record
@@ -0,0 +1,191 @@
+import heapq
+import time
+from collections import deque
+from itertools import count
+
+from game.board import FlowFreeBoard, Connection
+
+
+def occupied_cells(board: FlowFreeBoard, target: Connection) -> set:
+    """Ids de las celdas ocupadas por conexiones distintas de 'target' (caminos y extremos)."""
+    columns = board.columns
+    occupied = set()
+    for conn in board.connections:
+        if conn is not target:
+            occupied.update(y * columns + x for x, y in conn.road)
+            occupied.update(conn.cells)
+    return occupied
+
+
+def _terminals(board: FlowFreeBoard, target: Connection) -> set:
+    """
+    Ids de las celdas por las que otra conexión incompleta todavía puede entrar
+    a una región libre: sus extremos y la punta de su camino parcial.
+    """
+    columns = board.columns
+    terminals = set()
+    for conn in board.connections:
+        if conn is target or conn.is_completed:
+            continue
+        terminals.update(conn.cells)
+        if conn.road:
+            x, y = conn.road[-1]
+            terminals.add(y * columns + x)
+    return terminals
+
+
+def enumerate_paths(board: FlowFreeBoard, target_connection: Connection,
+                    prune_dead_cells: bool = True, max_length: int = None, max_expansions: int = None,
+                    deadline: float = None):
+    """
+    Genera de forma perezosa los caminos simples de 'target_connection',
+    ordenados por costo (número de celdas). Es una búsqueda best-first sobre
+    caminos parciales con f = g + manhattan, así que los caminos completos salen
+    en orden no decreciente de longitud y, a igual costo, en orden de inserción.
+
+    Cada camino es una lista de tuplas (x, y) desde el primer extremo hasta el
+    segundo. Los caminos de las demás conexiones se tratan como obstáculos; el
+    camino actual de 'target_connection' se ignora.
+
+    Con 'prune_dead_cells' se descarta todo camino parcial que deje una celda
+    libre con menos de dos vecinos utilizables: esa celda ya no podría quedar
+    cubierta, así que el tablero no se llenaría al 100%.
+
+    'max_expansions' limita los caminos parciales expandidos: sin él, una
+    conexión con pocos caminos válidos puede recorrer muchísimos parciales.
+    'deadline' (en time.monotonic()) corta la enumeración al pasar esa hora.
+    Si se corta por cualquiera de los dos, el generador termina con valor
+    True (StopIteration.value): faltaron caminos por generar.
+    """
+    start_point, end_point = target_connection.points
+    columns = board.columns
+    blocked = occupied_cells(board, target_connection)
+
+    # Vecinos por id de celda (tabla del tablero) sin las celdas bloqueadas:
+    # 'n in neighbors' equivale a "celda libre". Las paredes no son vecinas de
+    # ninguna celda, así que tenerlas como clave no cambia nada.
+    neighbors = {cell: adjacent for cell, adjacent in enumerate(board.neighbors) if cell not in blocked}
+
+    start, goal = target_connection.cells
+    terminal_ids = _terminals(board, target_connection)
+    terminal_ids.add(goal)
+    goal_x, goal_y = end_point
+
+    def is_dead(cell: int, path_mask: int, head: int, terminals: set) -> bool:
+        # Una celda libre necesita dos vecinos por los que pueda pasar un camino
+        if cell in terminals:
+            return False
+        available = 0
+        for n in neighbors[cell]:
+            if n == head or n in terminals or (n in neighbors and not path_mask >> n & 1):
+                available += 1
+                if available >= 2:
+                    return False
+        return True
+
+    def seals_dead_cell(prev: int, path_mask: int, head: int, terminals: set = terminal_ids) -> bool:
+        # Solo pierden vecinos utilizables las celdas libres junto a 'prev'
+        for n in neighbors.get(prev, ()):
+            if n != head and n in neighbors and not path_mask >> n & 1 and is_dead(n, path_mask, head, terminals):
+                return True
+        return False
+
+    def to_points(path: tuple) -> list:
+        return [(cell % columns, cell // columns) for cell in path]
+
+    # Al cerrar el camino, el segundo extremo deja de ser una entrada libre
+    closed_terminals = terminal_ids - {goal}
+
+    tie = count()
+    open_set = [(abs(start_point[0] - goal_x) + abs(start_point[1] - goal_y), next(tie), (start,), 1 << start)]
+
+    expansions = 0
+    while open_set:
+        if max_expansions is not None and expansions >= max_expansions:
+            return True
+        # Revisar el reloj cada 64 expansiones basta y casi no cuesta
+        if deadline is not None and expansions & 63 == 0 and time.monotonic() >= deadline:
+            return True
+        expansions += 1
+        _, _, path, path_mask = heapq.heappop(open_set)
+        head = path[-1]
+
+        if head == goal:
+            if prune_dead_cells and seals_dead_cell(goal, path_mask, -1, closed_terminals):
+                continue
+            yield to_points(path)
+            continue
+
+        if max_length is not None and len(path) >= max_length:
+            continue
+
+        for nxt in neighbors.get(head, ()):
+            if nxt not in neighbors or path_mask >> nxt & 1:
+                continue
+            new_mask = path_mask | (1 << nxt)
+            if prune_dead_cells and seals_dead_cell(head, new_mask, nxt):
+                continue
+            x, y = nxt % columns, nxt // columns
+            f_score = len(path) + abs(x - goal_x) + abs(y - goal_y)
+            heapq.heappush(open_set, (f_score, next(tie), path + (nxt,), new_mask))
+
+
+def sealed_region(board: FlowFreeBoard, target_connection: Connection, path: list) -> frozenset | None:
+    """
+    Región libre que 'path' (un camino completo de 'target_connection') cierra
+    por sí solo junto con paredes y bordes, sin contar los caminos de las demás
+    conexiones: una región sin extremos, o con un extremo cuyo par quedó fuera.
+    Nadie puede llenarla, y los otros caminos solo pueden cerrar más el
+    tablero, así que ese camino es inválido en cualquier estado del nivel.
+    Devuelve la región (como tuplas (x, y)), o None si el camino no sella ninguna.
+    """
+    columns = board.columns
+    neighbors = board.neighbors
+    blocked = {y * columns + x for x, y in path}
+    blocked.update(target_connection.cells)
+    partner = {}
+    for conn in board.connections:
+        if conn is not target_connection:
+            a, b = conn.cells
+            partner[a], partner[b] = b, a
+
+    seen = set(blocked)
+    for cell in range(len(neighbors)):
+        if cell in seen or not board._validate_cell(*board.cell_points[cell]):
+            continue
+        region, frontier = {cell}, deque([cell])
+        seen.add(cell)
+        while frontier:
+            for n in neighbors[frontier.popleft()]:
+                if n not in seen:
+                    seen.add(n)
+                    region.add(n)
+                    frontier.append(n)
+        endpoints = [c for c in region if c in partner]
+        if not endpoints or any(partner[c] not in region for c in endpoints):
+            return frozenset(board.cell_points[c] for c in region)
+    return None
+
+
+def count_paths(board: FlowFreeBoard, target_connection: Connection, limit: int = None,
+                prune_dead_cells: bool = True, max_expansions: int = None, deadline: float = None) -> int:
+    """
+    Cuenta los caminos candidatos de una conexión, hasta 'limit' si se indica.
+    Sirve como señal barata de factor de ramificación (p. ej. elegir primero la
+    conexión más restringida). Si 'max_expansions' o 'deadline' cortan la
+    enumeración antes de llegar a 'limit', el conteo no es exacto y se
+    devuelve 'limit' (sin 'limit', lo contado y al menos 1): nunca 0 por falta
+    de tiempo, porque 0 significa que la conexión no tiene ningún camino.
+    """
+    total = 0
+    paths = enumerate_paths(board, target_connection, prune_dead_cells=prune_dead_cells,
+                            max_expansions=max_expansions, deadline=deadline)
+    while limit is None or total < limit:
+        try:
+            next(paths)
+        except StopIteration as stop:
+            if stop.value:
+                return limit if limit is not None else max(total, 1)
+            break
+        total += 1
+    return total
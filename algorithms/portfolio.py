@@ -0,0 +1,152 @@
+import multiprocessing
+import queue
+import time
+
+from game.board import FlowFreeBoard
+from algorithms.metrics import Metrics
+from algorithms.results import ResultSink
+from algorithms.astar import AStarPlayer
+from algorithms.bfs import BFSPlayer
+from algorithms.dfs import DFSPlayer
+from algorithms import solution
+
+# Miembros por defecto: (clase del agente, argumentos). Cualquier subclase de
+# Metrics con play()/solve() sirve como miembro. BacktrackingPlayer no está
+# entre ellos hasta que resuelva los niveles de más de 10x10 a tiempo.
+DEFAULT_MEMBERS = [
+    (DFSPlayer, {}),
+    (BFSPlayer, {}),
+    (AStarPlayer, {"heuristics": ["manhattan", "penalty_enclosure", "euclidean", "exploration_bonus"]}),
+    (AStarPlayer, {"heuristics": ["exploration_bonus"]}),
+    (AStarPlayer, {"heuristics": ["manhattan", "penalty_enclosure"]}),
+]
+
+
+def member_label(factory, kwargs: dict) -> str:
+    """Nombre legible de un miembro, p. ej. 'AStarPlayer(manhattan - euclidean)'."""
+    name = getattr(factory, "__name__", str(factory))
+    if kwargs.get("heuristics"):
+        return f"{name}({' - '.join(kwargs['heuristics'])})"
+    return name
+
+
+def _run_member(index: int, factory, kwargs: dict, board: FlowFreeBoard, level_name: str,
+                timeout: float, seed: int, results) -> None:
+    """Proceso de un miembro: resuelve su copia del tablero y envía los caminos."""
+    solved, roads, nodes, depth = False, None, 0, 0
+    try:
+        player = factory(**{"seed": seed, **kwargs})
+        solved = player.solve(board, level_name, timeout=timeout)
+        roads = [list(conn.road) for conn in board.connections]
+        nodes, depth = player.total_nodes_expanded, player.max_search_depth_overall
+    finally:
+        results.put((index, solved, roads, nodes, depth))
+
+
+class PortfolioPlayer(Metrics):
+    """
+    Carrera de varios agentes sobre el mismo nivel, cada uno en su propio
+    proceso. Se queda con la primera solución que pasa el verificador, cancela
+    al resto y guarda qué miembro ganó. Así la latencia por nivel es el mínimo
+    entre estrategias.
+
+    Nota: max_ram_usage mide solo el proceso principal; los nodos expandidos y la
+    profundidad son los del miembro ganador.
+    """
+
+    def __init__(self, members: list = None, timeout: float = None, sink: ResultSink = None, seed: int = None):
+        super().__init__(name="Portfolio", sink=sink, seed=seed)
+        self.members = members or DEFAULT_MEMBERS
+        self.timeout = timeout
+        self.winner = None
+        self.winner_index = None
+
+    def member_seed(self, index: int) -> int:
+        """Semilla del miembro 'index', derivada de la semilla del portafolio."""
+        return (self.seed + index) % 2**32
+
+    def _spawn(self, index: int, factory, kwargs: dict, board: FlowFreeBoard, level_name: str,
+               timeout: float, results):
+        """Crea el proceso de un miembro; las subclases pueden pasarle estado compartido."""
+        return multiprocessing.Process(target=_run_member, daemon=True,
+                                       args=(index, factory, kwargs, board, level_name, timeout,
+                                             self.member_seed(index), results))
+
+    def _race(self, board: FlowFreeBoard, level_name: str) -> bool:
+        """
+        Lanza los miembros y aplica al tablero la primera solución verificada.
+        La carrera termina en el plazo propio ('timeout') o, sin él, en el de
+        solve(); los miembros reciben lo que queda como su 'timeout'.
+        """
+        deadline = time.monotonic() + self.timeout if self.timeout else self.deadline
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+        results = multiprocessing.Queue()
+        processes = [self._spawn(i, factory, kwargs, board, level_name, remaining, results)
+                     for i, (factory, kwargs) in enumerate(self.members)]
+        for process in processes:
+            process.start()
+
+        pending = set(range(len(processes)))
+        try:
+            while pending:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                try:
+                    index, solved, roads, nodes, depth = results.get(timeout=0.1)
+                except queue.Empty:
+                    # Un miembro que murió sin enviar resultado (p. ej. sin memoria) deja de contar
+                    pending -= {i for i in pending if not processes[i].is_alive() and processes[i].exitcode != 0}
+                    continue
+                pending.discard(index)
+                if not solved:
+                    continue
+
+                for conn, road in zip(board.connections, roads):
+                    conn.set_road(road)
+                errors = solution.verify(solution.encode(board))
+                if errors:
+                    print(f"{self.name}: solución inválida de {member_label(*self.members[index])}: {errors[0]}")
+                    for conn in board.connections:
+                        conn.clean_road()
+                    continue
+
+                self.winner = member_label(*self.members[index])
+                self.winner_index = index
+                self.total_nodes_expanded += nodes
+                self.max_search_depth_overall = max(self.max_search_depth_overall, depth)
+                return True
+            return False
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join()
+
+    def play(self, board: FlowFreeBoard, level_name: str = "unknown_level"):
+        self._begin(board)
+
+        if board.is_full():
+            print(f"{self.name}: ¡Solución encontrada por {self.winner}!")
+            self._generate_reports(board, level_name)
+            return None
+
+        if not self._race(board, level_name):
+            print(f"{self.name}: ningún miembro encontró una solución.")
+            return None
+
+        last_connection = board.connections[-1]
+        return last_connection.road[-1]
+
+    def _build_record(self, final_board: FlowFreeBoard, level_name: str, running_time: float, max_ram_usage: float) -> dict:
+        record = super()._build_record(final_board, level_name, running_time, max_ram_usage)
+        record["Algorithm-Level"] = f"{level_name.replace('.txt', '')}: Portfolio[{self.winner}]."
+        record["portfolio_winner"] = self.winner
+        # Basta para repetir al ganador solo (ver algorithms.runner.reproduce)
+        factory, kwargs = self.members[self.winner_index]
+        record["member"] = {"agent": factory.__name__, "kwargs": kwargs, "seed": self.member_seed(self.winner_index)}
+        return record
@@ -0,0 +1,97 @@
+import time
+from contextlib import nullcontext
+
+
+class _Timer:
+    """Context manager que suma el tiempo del bloque a un temporizador con nombre."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Temporizadores y contadores por fase que los agentes registran durante la
+    búsqueda (heurística, reinicios, hash del estado, etc.). Los contadores de
+    bucles internos se acumulan en variables locales y se suman una vez por
+    búsqueda, para no pagar una llamada por nodo. Los temporizadores pueden
+    anidarse (p. ej. 'heuristic' dentro de 'search'), así que los porcentajes
+    no suman 100.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+
+    def timer(self, name: str) -> _Timer:
+        return _Timer(self, name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.times[name] = self.times.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self) -> None:
+        self.times.clear()
+        self.calls.clear()
+        self.counters.clear()
+
+    def as_dict(self) -> dict:
+        return {
+            "timers": {name: {"seconds": round(self.times[name], 8), "calls": self.calls[name]}
+                       for name in sorted(self.times, key=self.times.get, reverse=True)},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def table(self, total_time: float = None) -> str:
+        """Tabla de texto con el desglose por fase y los contadores."""
+        lines = [f"  {'fase':<20}{'llamadas':>10}{'segundos':>14}{'% total':>9}"]
+        for name, stats in self.as_dict()["timers"].items():
+            share = f"{100 * stats['seconds'] / total_time:8.1f}%" if total_time else f"{'-':>9}"
+            lines.append(f"  {name:<20}{stats['calls']:>10}{stats['seconds']:>14.6f}{share}")
+        if self.counters:
+            lines.append(f"  {'contador':<20}{'valor':>10}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"  {name:<20}{value:>10}")
+        return "\n".join(lines)
+
+
+class NullProfiler:
+    """Perfilador desactivado: misma interfaz sin hacer nada (coste casi nulo)."""
+    enabled = False
+    _null_timer = nullcontext()
+
+    def timer(self, name: str):
+        return self._null_timer
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+    def as_dict(self) -> dict:
+        return {}
+
+    def table(self, total_time: float = None) -> str:
+        return ""
+
+
+NULL_PROFILER = NullProfiler()
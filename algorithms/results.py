@@ -0,0 +1,285 @@
+import atexit
+import csv
+import json
+import os
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Bloqueo exclusivo entre procesos usando un archivo '<path>.lock'."""
+    with open(f"{path}.lock", "a+b") as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Sinks abiertos con registros que volcar al terminar el proceso. Un único
+# hook de atexit los recorre; el conjunto es débil para no retener los sinks
+# que nadie cierra (esos vuelcan su lote en __del__)
+_OPEN_SINKS = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_sinks() -> None:
+    for sink in list(_OPEN_SINKS):
+        sink.flush()
+
+
+def _encode(value):
+    """Las listas y diccionarios se guardan como JSON dentro de CSV/SQLite."""
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class ResultSink(ABC):
+    """
+    Destino de resultados con escritura en lotes. Los registros se acumulan en
+    memoria y se vuelcan cada 'batch_size' registros, al cerrar el sink o al
+    terminar el proceso. Es seguro con varios procesos escribiendo el mismo
+    archivo: cada volcado y cada asignación de run_id se hacen bajo bloqueo.
+    """
+
+    def __init__(self, path: str, batch_size: int = 32):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self._buffer = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _OPEN_SINKS.add(self)
+
+    def next_run_id(self) -> int:
+        """Reserva de forma atómica el siguiente identificador de ejecución."""
+        counter = f"{self.path}.runid"
+        with _file_lock(self.path):
+            try:
+                with open(counter, "r") as f:
+                    run_id = int(f.read().strip() or 0) + 1
+            except FileNotFoundError:
+                run_id = 1
+            with open(counter, "w") as f:
+                f.write(str(run_id))
+        return run_id
+
+    def write(self, record: dict) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if records:
+            self._write_batch(records)
+
+    def close(self) -> None:
+        self.flush()
+        _OPEN_SINKS.discard(self)
+
+    def __del__(self):
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    @abstractmethod
+    def _write_batch(self, records: list) -> None:
+        """Añade 'records' al archivo (bajo _file_lock si otros procesos lo comparten)."""
+
+    def read(self) -> list:
+        """Devuelve todos los registros guardados (vuelca antes el lote pendiente)."""
+        self.flush()
+        if not os.path.isfile(self.path):
+            return []
+        return self._read_records()
+
+    @abstractmethod
+    def _read_records(self) -> list:
+        """Lee todos los registros del archivo, que ya existe."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONLSink(ResultSink):
+    """Un registro JSON por línea."""
+
+    def _write_batch(self, records: list) -> None:
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with _file_lock(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+
+    def _read_records(self) -> list:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+class CSVSink(ResultSink):
+    """
+    CSV con cabecera. Si el archivo ya existe se respetan sus columnas, así los
+    resultados nuevos se pueden seguir añadiendo a un benchmark.csv antiguo. Si
+    los registros traen columnas nuevas, el archivo se reescribe una vez con la
+    cabecera ampliada (las filas antiguas quedan vacías en esas columnas).
+    """
+
+    def _write_batch(self, records: list) -> None:
+        with _file_lock(self.path):
+            fieldnames = None
+            if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "r", newline="", encoding="utf-8") as f:
+                    fieldnames = next(csv.reader(f), None)
+            new_fields = list(dict.fromkeys(key for r in records for key in r if key not in (fieldnames or ())))
+            write_header = not fieldnames
+            if write_header:
+                fieldnames = new_fields
+            elif new_fields:
+                fieldnames = fieldnames + new_fields
+                self._rewrite(fieldnames)
+
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+                if write_header:
+                    writer.writeheader()
+                writer.writerows({k: _encode(v) for k, v in r.items()} for r in records)
+
+    def _rewrite(self, fieldnames: list) -> None:
+        """Reescribe el archivo con una cabecera ampliada (se llama bajo bloqueo)."""
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(temporary, self.path)
+
+    def _read_records(self) -> list:
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+
+class SQLiteSink(ResultSink):
+    """
+    Tabla 'results' en SQLite. Las columnas se crean según las claves de los
+    registros y el run_id sale de una tabla AUTOINCREMENT.
+    """
+
+    def __init__(self, path: str, batch_size: int = 32, table: str = "results"):
+        super().__init__(path, batch_size)
+        self.table = table
+
+    def _connect(self):
+        import sqlite3
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        connection.execute("CREATE TABLE IF NOT EXISTS run_ids (id INTEGER PRIMARY KEY AUTOINCREMENT)")
+        connection.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" (id INTEGER PRIMARY KEY AUTOINCREMENT)')
+        return connection
+
+    def next_run_id(self) -> int:
+        connection = self._connect()
+        try:
+            return connection.execute("INSERT INTO run_ids DEFAULT VALUES").lastrowid
+        finally:
+            connection.close()
+
+    def _write_batch(self, records: list) -> None:
+        columns = list(dict.fromkeys(key for r in records for key in r))
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            existing = {row[1] for row in connection.execute(f'PRAGMA table_info("{self.table}")')}
+            for column in columns:
+                if column not in existing:
+                    connection.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{column}"')
+            placeholders = ", ".join("?" for _ in columns)
+            names = ", ".join(f'"{c}"' for c in columns)
+            connection.executemany(
+                f'INSERT INTO "{self.table}" ({names}) VALUES ({placeholders})',
+                [[_encode(r.get(c)) for c in columns] for r in records],
+            )
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def _read_records(self) -> list:
+        import sqlite3
+        connection = self._connect()
+        try:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(f'SELECT * FROM "{self.table}" ORDER BY id').fetchall()
+            return [{k: row[k] for k in row.keys() if k != "id"} for row in rows]
+        finally:
+            connection.close()
+
+
+class NullSink(ResultSink):
+    """Descarta los registros; útil para ejecuciones de calentamiento o de prueba."""
+
+    def __init__(self):
+        self.path = os.devnull
+        self.batch_size = 1
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def next_run_id(self) -> None:
+        return None
+
+    def _write_batch(self, records: list) -> None:
+        pass
+
+    def _read_records(self) -> list:
+        return []
+
+
+SINKS = {".jsonl": JSONLSink, ".csv": CSVSink, ".db": SQLiteSink, ".sqlite": SQLiteSink}
+
+_default_sink = None
+
+
+def open_sink(path: str, batch_size: int = 32) -> ResultSink:
+    """Crea el sink adecuado según la extensión del archivo."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Extensión '{extension}' no soportada. Extensiones válidas: {list(SINKS.keys())}")
+    return SINKS[extension](path, batch_size=batch_size)
+
+
+def default_sink() -> ResultSink:
+    """Sink compartido por defecto: output/benchmark.csv."""
+    global _default_sink
+    if _default_sink is None:
+        _default_sink = CSVSink(os.path.join("output", "benchmark.csv"))
+    return _default_sink
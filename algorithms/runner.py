@@ -0,0 +1,427 @@
+"""
+Ejecución por lotes de los agentes sobre niveles, con semillas deterministas.
+
+Cada ejecución recibe su propia semilla (derivada de la semilla del lote) y
+queda guardada en el registro de resultados junto con el agente, el nivel y
+sus argumentos. Con eso una ejecución atípica se puede repetir exactamente
+(salvo las de ParallelRestart, ver reproduce()), por ejemplo para perfilarla:
+
+    python -m algorithms.runner batch levels/7x7_6C_1.txt --agents AStarPlayer --repetitions 20 --seed 1
+    python -m algorithms.runner reproduce output/benchmark.csv --run-id 17 --profile
+
+solve_many() resuelve muchos tableros en procesos reutilizables y entrega los
+resultados en orden de finalización:
+
+    python -m algorithms.runner many levels/*.txt --agent AStarPlayer --workers 4 --timeout 10 \
+        --kwargs '{"heuristics": ["manhattan", "exploration_bonus"]}'
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+
+from game.board import FlowFreeBoard
+from algorithms.results import ResultSink, NullSink, open_sink, default_sink
+from algorithms.astar import AStarPlayer
+from algorithms.bfs import BFSPlayer
+from algorithms.dfs import DFSPlayer
+from algorithms.backtracking import BacktrackingPlayer
+from algorithms.portfolio import PortfolioPlayer
+from algorithms.parallel_restarts import ParallelRestartPlayer
+
+AGENTS = {cls.__name__: cls for cls in (DFSPlayer, BFSPlayer, AStarPlayer, BacktrackingPlayer,
+                                        PortfolioPlayer, ParallelRestartPlayer)}
+
+# Argumentos que no se guardan con el agente: el registro los tiene aparte
+# (seed) o dependen de cómo se lanzó la ejecución (sink, timeout)
+_RUN_ARGUMENTS = ("sink", "seed", "timeout")
+
+
+def _to_json(value):
+    """Las clases de agentes (p. ej. 'factory' o los miembros de un portafolio) se guardan por nombre."""
+    if isinstance(value, type):
+        return value.__name__
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    return value
+
+
+def agent_kwargs(factory, kwargs: dict) -> dict:
+    """
+    Argumentos completos del constructor de 'factory' para el registro: los
+    dados y los valores por defecto de los demás, así la repetición no cambia
+    si cambia un valor por defecto.
+    """
+    bound = inspect.signature(factory).bind_partial(**kwargs)
+    bound.apply_defaults()
+    return {name: _to_json(value) for name, value in bound.arguments.items() if name not in _RUN_ARGUMENTS}
+
+
+def _from_json(kwargs: dict) -> dict:
+    """Inversa de agent_kwargs para 'factory' y 'members', que llevan nombres de agentes."""
+    kwargs = dict(kwargs)
+    if isinstance(kwargs.get("factory"), str):
+        kwargs["factory"] = AGENTS[kwargs["factory"]]
+    if kwargs.get("members"):
+        kwargs["members"] = [(AGENTS[name], member_kwargs) for name, member_kwargs in kwargs["members"]]
+    return kwargs
+
+
+def run_level(agent: str, level: str | FlowFreeBoard, seed: int = None, sink: ResultSink = None, timeout: float = None,
+              profile: bool = False, trace: str = None, telemetry: dict = None, **kwargs) -> dict | None:
+    """
+    Resuelve un nivel (ruta o FlowFreeBoard) con el agente indicado (nombre de
+    clase) y devuelve el registro guardado en el sink, o None si no se resolvió
+    antes de 'timeout'.
+    Con 'profile' el registro incluye el desglose por fases; con 'trace' los
+    eventos de búsqueda se añaden a ese archivo; 'telemetry' son los argumentos
+    de Metrics.enable_telemetry (p. ej. {"interval": 5}).
+    """
+    if agent not in AGENTS:
+        raise ValueError(f"Agente '{agent}' no es válido. Agentes válidos: {list(AGENTS.keys())}")
+    factory = AGENTS[agent]
+    recorded = agent_kwargs(factory, kwargs)
+    # Los agentes que buscan dentro de una sola jugada (backtracking, portafolio)
+    # necesitan el plazo también en el constructor
+    if timeout is not None and "timeout" in inspect.signature(factory).parameters and "timeout" not in kwargs:
+        kwargs["timeout"] = timeout
+    player = factory(sink=sink, seed=seed, **kwargs)
+    player.agent_kwargs = recorded
+    if profile:
+        player.enable_profiling()
+    if trace:
+        player.enable_tracing(trace)
+    if telemetry is not None:
+        player.enable_telemetry(**telemetry)
+    board = level if isinstance(level, FlowFreeBoard) else FlowFreeBoard(level)
+    level_name = f"{player.name}_{os.path.basename(board.path)}"
+    try:
+        if not player.solve(board, level_name, timeout=timeout):
+            player._finish_unsolved(board)
+            return None
+        return player._generate_reports(board, level_name)
+    finally:
+        player.tracer.close()
+
+
+def run_batch(levels: list, agents: list, repetitions: int = 1, seed: int = None, sink: ResultSink = None,
+              timeout: float = None, profile: bool = False, trace: str = None, telemetry: dict = None):
+    """
+    Genera los registros de 'repetitions' ejecuciones de cada agente en cada
+    nivel. 'agents' es una lista de nombres o de pares (nombre, argumentos).
+    Las semillas de cada ejecución salen de 'seed', así el lote completo se
+    repite igual con la misma semilla.
+    """
+    seeds = random.Random(seed)
+    for level in levels:
+        for agent in agents:
+            name, kwargs = (agent, {}) if isinstance(agent, str) else agent
+            for _ in range(repetitions):
+                yield run_level(name, level, seed=seeds.randrange(2**32), sink=sink, timeout=timeout,
+                                profile=profile, trace=trace, telemetry=telemetry, **kwargs)
+
+
+def solve_task(agent: str, level: str | FlowFreeBoard, seed: int = None, timeout: float = None,
+               kwargs: dict = None) -> dict:
+    """
+    Resuelve un tablero sin escribir en la salida ni en un sink y devuelve
+    {"status": "solved" | "unsolved" | "error", "record": ..., "error": ...}.
+    Es la unidad de trabajo de solve_many y del servicio de resolución.
+    """
+    try:
+        # Los agentes y la carga de niveles imprimen en stdout
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            board = level if isinstance(level, FlowFreeBoard) else FlowFreeBoard(level)
+            if not board.connections:
+                return {"status": "error", "error": f"Nivel vacío o no encontrado: {board.path}"}
+            record = run_level(agent, board, seed=seed, sink=NullSink(), timeout=timeout, **(kwargs or {}))
+    except Exception as error:
+        return {"status": "error", "error": f"{type(error).__name__}: {error}"}
+    if record is None:
+        return {"status": "unsolved"}
+    return {"status": "solved", "record": record}
+
+
+def _solve_many_worker(worker: int, tasks, results) -> None:
+    """Proceso reutilizable de solve_many: resuelve tareas de su cola hasta recibir None."""
+    while (task := tasks.get()) is not None:
+        index, agent, level, seed, timeout, kwargs = task
+        results.put((worker, index, solve_task(agent, level, seed, timeout, kwargs)))
+
+
+def solve_many(boards, agent: str = "AStarPlayer", workers: int = None, timeout: float = None, seed: int = None,
+               grace: float = 5.0, kwargs: dict = None):
+    """
+    Resuelve muchos tableros (FlowFreeBoard o rutas de nivel) con el mismo
+    agente y genera un resultado por tablero en orden de finalización:
+
+        {"index": i, "level": ruta, "status": ..., "record": ..., "seconds": s}
+
+    'kwargs' son los argumentos del agente. 'index' es la posición del tablero
+    en 'boards', que puede ser un iterable perezoso (se consume a medida que se
+    liberan procesos). Las semillas salen de 'seed' en el orden de entrada, así
+    el resultado no depende del reparto.
+
+    Con 'workers' > 1 se usan procesos que viven toda la llamada, así cada uno
+    conserva entre tableros sus tablas precalculadas (celdas del tablero,
+    tablas de A*). Un tablero que sigue sin terminar 'timeout' + 'grace'
+    segundos después de empezar se da por 'timeout' y su proceso se reemplaza,
+    así un nivel sin solución nunca bloquea al resto. Con workers=1 se resuelve
+    en este proceso y solo cuenta el plazo cooperativo del agente.
+    """
+    if agent not in AGENTS:
+        raise ValueError(f"Agente '{agent}' no es válido. Agentes válidos: {list(AGENTS.keys())}")
+    workers = workers or os.cpu_count() or 1
+    seeds = random.Random(seed)
+    tasks = ((index, agent, level, seeds.randrange(2**32), timeout, kwargs) for index, level in enumerate(boards))
+
+    def result(task: tuple, outcome: dict, started: float) -> dict:
+        level = task[2]
+        return {"index": task[0], "level": level.path if isinstance(level, FlowFreeBoard) else level,
+                **outcome, "seconds": round(time.monotonic() - started, 6)}
+
+    if workers == 1:
+        for task in tasks:
+            started = time.monotonic()
+            yield result(task, solve_task(*task[1:]), started)
+        return
+
+    results = multiprocessing.Queue()
+    pool = []  # por proceso: [proceso, cola de tareas, tarea en curso, inicio]
+
+    def spawn(worker: int) -> list:
+        inbox = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_solve_many_worker, args=(worker, inbox, results), daemon=True)
+        process.start()
+        return [process, inbox, None, None]
+
+    exhausted = False
+    try:
+        pool = [spawn(worker) for worker in range(workers)]
+        while True:
+            for slot in pool:
+                if slot[2] is None and not exhausted:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    slot[1].put(task)
+                    slot[2], slot[3] = task, time.monotonic()
+            if all(slot[2] is None for slot in pool):
+                return
+
+            try:
+                worker, index, outcome = results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            else:
+                slot = pool[worker]
+                # Un resultado de una tarea ya abandonada (su proceso fue reemplazado) se descarta
+                if slot[2] is not None and slot[2][0] == index:
+                    task, started = slot[2], slot[3]
+                    slot[2] = slot[3] = None
+                    yield result(task, outcome, started)
+
+            now = time.monotonic()
+            for worker, slot in enumerate(pool):
+                task, started = slot[2], slot[3]
+                if task is None:
+                    continue
+                overdue = timeout is not None and now - started > timeout + grace
+                if overdue or not slot[0].is_alive():
+                    slot[0].terminate()
+                    slot[0].join()
+                    pool[worker] = spawn(worker)
+                    outcome = {"status": "timeout"} if overdue else \
+                        {"status": "error", "error": f"El proceso terminó con código {slot[0].exitcode}"}
+                    yield result(task, outcome, started)
+    finally:
+        for process, inbox, _, _ in pool:
+            if process.is_alive():
+                inbox.put(None)
+        for process, _, _, _ in pool:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+
+def _field(record: dict, key: str):
+    """Lee un campo que en CSV/SQLite llega como texto JSON."""
+    value = record.get(key)
+    if isinstance(value, str) and value[:1] in "[{":
+        return json.loads(value)
+    return value
+
+
+def reproduce(record: dict, sink: ResultSink = None, timeout: float = None, profile: bool = False,
+              trace: str = None, telemetry: dict = None) -> dict | None:
+    """
+    Repite exactamente la ejecución de un registro de resultados: mismo agente,
+    nivel, argumentos del constructor ('kwargs' del registro) y semilla. Para
+    Portfolio y ParallelRestart se repite solo el miembro ganador, que es el
+    que produjo la solución. Los registros anteriores a 'kwargs' solo
+    recuperan las heurísticas.
+
+    La repetición de ParallelRestart es aproximada: en la original el ganador
+    también podaba con los estados fallidos que los otros trabajadores iban
+    dejando en la tabla compartida, según cómo se intercalaron los procesos, y
+    eso no se puede volver a producir. La repetición corre al ganador solo, con
+    su semilla, y normalmente expande más nodos.
+    """
+    member = _field(record, "member")
+    if member:
+        agent, kwargs, seed = member["agent"], dict(member["kwargs"]), member["seed"]
+    else:
+        agent, kwargs, seed = record["agent"], _field(record, "kwargs"), record["seed"]
+        if isinstance(kwargs, dict):
+            kwargs = _from_json(kwargs)
+        else:
+            kwargs = {}
+            heuristics = _field(record, "heuristics")
+            if heuristics:
+                kwargs["heuristics"] = heuristics
+    if not agent or seed in (None, ""):
+        raise ValueError(f"El registro {record.get('run_id')} no guarda agente y semilla; no se puede repetir.")
+    return run_level(agent, record["level"], seed=int(seed), sink=sink, timeout=timeout, profile=profile,
+                     trace=trace, telemetry=telemetry, **kwargs)
+
+
+def find_record(sink: ResultSink, run_id: int) -> dict:
+    """Busca en el sink el registro con el run_id indicado."""
+    for record in sink.read():
+        if str(record.get("run_id")) == str(run_id):
+            return record
+    raise KeyError(f"No hay ningún registro con run_id={run_id} en {sink.path}")
+
+
+def _add_telemetry_arguments(parser) -> None:
+    parser.add_argument("--telemetry", type=float, default=None, metavar="SEGUNDOS",
+                        help="Reporta el progreso (nodos/s, reinicios/s, memoria, RSS) cada SEGUNDOS")
+    parser.add_argument("--telemetry-file", default=None, help="Guarda las muestras de progreso en este JSONL")
+
+
+def _telemetry_options(args) -> dict | None:
+    if args.telemetry is None and args.telemetry_file is None:
+        return None
+    return {"interval": args.telemetry or 1.0, "path": args.telemetry_file,
+            "stream": sys.stderr if args.telemetry is not None else None}
+
+
+def _add_kwargs_argument(parser) -> None:
+    parser.add_argument("--kwargs", default=None, metavar="JSON",
+                        help='Argumentos del agente como objeto JSON, p. ej. \'{"heuristics": ["manhattan"]}\'')
+
+
+def _agent_options(parser, text: str, agents: list) -> dict:
+    """
+    Argumentos de --kwargs, comprobados con agent_kwargs() contra el
+    constructor de cada agente; un argumento que alguno no acepta es un error
+    de uso.
+    """
+    if text is None:
+        return {}
+    try:
+        kwargs = json.loads(text)
+    except json.JSONDecodeError as error:
+        parser.error(f"--kwargs no es JSON válido: {error}")
+    if not isinstance(kwargs, dict):
+        parser.error("--kwargs debe ser un objeto JSON")
+    try:
+        kwargs = _from_json(kwargs)
+        for agent in agents:
+            agent_kwargs(AGENTS[agent], kwargs)
+    except (KeyError, TypeError, ValueError) as error:
+        parser.error(f"--kwargs no vale para {', '.join(agents)}: {error}")
+    return kwargs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecución por lotes y reproducción de ejecuciones.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Ejecuta agentes sobre niveles con semillas deterministas.")
+    batch.add_argument("levels", nargs="+")
+    batch.add_argument("--agents", nargs="+", default=["AStarPlayer"], choices=list(AGENTS.keys()))
+    batch.add_argument("--repetitions", type=int, default=1)
+    batch.add_argument("--seed", type=int, default=None)
+    batch.add_argument("--timeout", type=float, default=None)
+    batch.add_argument("--sink", default=None, help="Archivo de resultados (.csv, .jsonl, .db)")
+    batch.add_argument("--profile", action="store_true", help="Añade el desglose por fases a cada registro")
+    batch.add_argument("--trace", default=None, help="Archivo de traza de búsqueda (.jsonl o .jsonl.gz)")
+    _add_kwargs_argument(batch)
+    _add_telemetry_arguments(batch)
+
+    again = commands.add_parser("reproduce", help="Repite exactamente una ejecución guardada.")
+    again.add_argument("results", help="Archivo de resultados donde está la ejecución")
+    again.add_argument("--run-id", type=int, required=True)
+    again.add_argument("--timeout", type=float, default=None)
+    again.add_argument("--sink", default=None, help="Dónde guardar la repetición (por defecto el mismo archivo)")
+    again.add_argument("--profile", action="store_true", help="Muestra el desglose por fases de la repetición")
+    again.add_argument("--trace", default=None, help="Archivo de traza de búsqueda (.jsonl o .jsonl.gz)")
+    _add_telemetry_arguments(again)
+
+    many = commands.add_parser("many", help="Resuelve muchos niveles en paralelo con un agente.")
+    many.add_argument("levels", nargs="+")
+    many.add_argument("--agent", default="AStarPlayer", choices=list(AGENTS.keys()))
+    many.add_argument("--workers", type=int, default=None, help="Procesos (por defecto, CPUs)")
+    many.add_argument("--timeout", type=float, default=None, help="Segundos por nivel")
+    many.add_argument("--seed", type=int, default=None)
+    many.add_argument("--sink", default=None, help="Archivo de resultados (.csv, .jsonl, .db)")
+    _add_kwargs_argument(many)
+    args = parser.parse_args()
+
+    if args.command == "many":
+        kwargs = _agent_options(parser, args.kwargs, [args.agent])
+        sink = open_sink(args.sink) if args.sink else default_sink()
+        for result in solve_many(args.levels, args.agent, args.workers, args.timeout, args.seed, kwargs=kwargs):
+            record = result.get("record")
+            if record is not None:
+                record["run_id"] = sink.next_run_id()
+                sink.write(record)
+            nodes = record["nodes_expanded"] if record else "-"
+            print(f"[{result['index']}] {result['level']}: {result['status']} en {result['seconds']:.3f} s "
+                  f"(nodos {nodes})" + (f" {result['error']}" if "error" in result else ""))
+        sink.close()
+        return
+
+    if args.command == "batch":
+        kwargs = _agent_options(parser, args.kwargs, args.agents)
+        agents = [(agent, kwargs) for agent in args.agents]
+        sink = open_sink(args.sink) if args.sink else default_sink()
+        for record in run_batch(args.levels, agents, args.repetitions, args.seed, sink, args.timeout,
+                                args.profile, args.trace, _telemetry_options(args)):
+            if record is not None:
+                print(f"run_id={record['run_id']} {record['Algorithm-Level']} seed={record['seed']} "
+                      f"nodes={record['nodes_expanded']} time={record['running_time']}s")
+        sink.close()
+        return
+
+    source = open_sink(args.results)
+    original = find_record(source, args.run_id)
+    sink = open_sink(args.sink) if args.sink else source
+    approximate = original.get("agent") == "ParallelRestartPlayer"
+    if approximate:
+        print("Aviso: ParallelRestart se repite de forma aproximada (solo el trabajador ganador, "
+              "sin los estados fallidos que compartían los demás).")
+    record = reproduce(original, sink, args.timeout, args.profile, args.trace, _telemetry_options(args))
+    sink.close()
+    if record is None:
+        print("La repetición no resolvió el nivel.")
+        return
+    print(f"Original:   nodes={original['nodes_expanded']} time={original['running_time']}s")
+    print(f"Repetición: nodes={record['nodes_expanded']} time={record['running_time']}s (run_id={record['run_id']})")
+    if str(record["nodes_expanded"]) != str(original["nodes_expanded"]) and not approximate:
+        print("Aviso: los nodos expandidos no coinciden; la ejecución original no era reproducible.")
+
+
+if __name__ == "__main__":
+    main()
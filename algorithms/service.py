@@ -0,0 +1,435 @@
+"""
+Servicio local de resolución: recibe niveles como líneas JSON, los encola y
+los resuelve en un pool de procesos con los agentes existentes. Las respuestas
+salen en orden de finalización, cada una con el 'id' de su petición.
+
+Petición (una línea JSON):
+
+    {"id": 1, "rows": ["A..B", ".AB.", ...], "agent": "AStarPlayer", "seed": 7, "timeout": 5}
+    {"id": 2, "level": "levels/7x7_5C_2.txt", "agent": "DFSPlayer", "kwargs": {"memory_bytes": 1048576}}
+    {"id": 3, "op": "stats"}
+
+'level' tiene que ser un archivo del directorio de niveles del servicio (la
+ruta puede ser relativa a él). 'kwargs' solo admite los argumentos de
+CLIENT_KWARGS para el agente pedido, con sus valores validados; los que
+escriben archivos o crean procesos (sink, trace, telemetry, profile,
+workers...) no se aceptan por la red.
+
+Respuesta:
+
+    {"id": 1, "status": "solved", "queued": 0.0012, "seconds": 0.031, "record": {...}}
+
+'status' es 'solved', 'unsolved' (no se resolvió antes del plazo), 'timeout'
+(el trabajador no devolvió nada dentro del plazo más un margen; su proceso se
+termina y se reemplaza, así no retiene a las peticiones siguientes), 'expired'
+(el plazo venció mientras esperaba en la cola) o 'error' (también para una
+petición mal formada, p. ej. un 'timeout' que no es un número positivo).
+'record' es el registro de resultados del agente (métricas y solución), el
+mismo que se guarda en los sinks.
+
+El plazo de cada petición cuenta desde que se acepta: el agente recibe lo que
+queda de él como 'timeout'. Cuando la cola está llena el servicio deja de leer
+la entrada hasta que haya lugar (contrapresión: en TCP el cliente queda
+bloqueado al escribir).
+
+Uso:
+    python -m algorithms.service stdio [--workers 2] [--queue 32] [--timeout 30]
+    python -m algorithms.service tcp [--host 127.0.0.1] [--port 8765]
+    python -m algorithms.service client levels/5x5_4C_1.txt levels/7x7_5C_2.txt --port 8765
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.board import FlowFreeBoard
+from algorithms.runner import AGENTS, solve_task
+
+
+HEURISTICS = ("manhattan", "penalty_enclosure", "euclidean", "exploration_bonus")
+MAX_MEMORY_BYTES = 256 * 2**20
+
+
+def _integer(low: int, high: int, optional: bool = False):
+    def check(value) -> str | None:
+        if optional and value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+            return f"debe ser un entero entre {low} y {high}" + (" o null" if optional else "")
+        return None
+    return check
+
+
+def _boolean(value) -> str | None:
+    return None if isinstance(value, bool) else "debe ser true o false"
+
+
+def _heuristics(value) -> str | None:
+    if not isinstance(value, list) or not all(isinstance(name, str) and name in HEURISTICS for name in value):
+        return f"debe ser una lista con nombres de {list(HEURISTICS)}"
+    return None
+
+
+_MEMORY = {"memory_bytes": _integer(1, MAX_MEMORY_BYTES), "commit_alternatives": _integer(0, 64)}
+
+# Argumentos de constructor que un cliente puede fijar, por agente, con la
+# validación de su valor. Portfolio y ParallelRestart no admiten ninguno: los
+# suyos son clases de agentes y cantidades de procesos.
+CLIENT_KWARGS = {
+    "AStarPlayer": {"heuristics": _heuristics, "batched": _boolean, **_MEMORY},
+    "BFSPlayer": dict(_MEMORY),
+    "DFSPlayer": dict(_MEMORY),
+    "BacktrackingPlayer": {"branch_limit": _integer(1, 64), "max_expansions": _integer(1, 10**9, optional=True),
+                           "count_expansions": _integer(1, 10**9, optional=True)},
+    "PortfolioPlayer": {},
+    "ParallelRestartPlayer": {},
+}
+
+
+def _solve(agent: str, level: str, rows: list, seed: int, timeout: float, kwargs: dict) -> dict:
+    """Proceso del pool: resuelve una petición y devuelve su respuesta parcial (sin 'id')."""
+    if rows is not None:
+        try:
+            level = FlowFreeBoard.from_lines(rows, name=level or "<rows>")
+        except Exception as error:
+            return {"status": "error", "error": f"{type(error).__name__}: {error}"}
+    return solve_task(agent, level, seed, timeout, kwargs)
+
+
+def _worker_init() -> None:
+    """
+    Inicio del proceso de cada pool: lo pone en su propio grupo de procesos,
+    así al reciclarlo se terminan también los que haya creado (los miembros de
+    Portfolio y ParallelRestart). En Windows no hay grupos y solo se termina
+    el proceso del pool.
+    """
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+
+class SolveService:
+    """
+    Cola acotada de peticiones y 'workers' despachadores, cada uno con su
+    propio proceso. 'timeout' es el plazo por defecto de una petición; 'grace'
+    es el margen extra que se le da al agente antes de responder 'timeout' (el
+    agente respeta su plazo entre jugadas, así que una jugada larga puede
+    pasarse). Tras un 'timeout' el proceso del despachador se reemplaza.
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = 32, timeout: float = 30.0,
+                 grace: float = 5.0, agent: str = "AStarPlayer", levels_dir: str = "levels"):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.grace = grace
+        self.agent = agent
+        self.levels_dir = os.path.realpath(levels_dir)
+        self.queue = None
+        self.pools = []
+        self.pids = []
+        self._dispatchers = []
+        self.stats = {"accepted": 0, "solved": 0, "unsolved": 0, "timeout": 0, "expired": 0, "error": 0,
+                      "recycled": 0}
+        self.in_flight = 0
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        for _ in range(self.workers):
+            pool, pid = await self._new_pool()
+            self.pools.append(pool)
+            self.pids.append(pid)
+        self._dispatchers = [asyncio.create_task(self._dispatch(slot)) for slot in range(self.workers)]
+
+    @staticmethod
+    async def _new_pool() -> tuple:
+        """
+        Crea el pool de un despachador y devuelve (pool, pid de su proceso). El
+        pool tiene un único proceso, que se arranca ya para conocer su pid.
+        """
+        # 'spawn': un proceso creado con fork heredaría los sockets abiertos de las
+        # conexiones y el cliente no vería el cierre de la suya
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_worker_init)
+        pid = await asyncio.get_running_loop().run_in_executor(pool, os.getpid)
+        return pool, pid
+
+    async def _recycle(self, slot: int) -> None:
+        """
+        Termina el proceso del despachador 'slot', que sigue ocupado con una
+        petición vencida (el agente no se puede interrumpir desde afuera), junto
+        con los procesos que haya creado, y lo reemplaza por un pool nuevo.
+        """
+        with contextlib.suppress(ProcessLookupError):
+            if hasattr(os, "killpg"):
+                os.killpg(self.pids[slot], signal.SIGTERM)  # El pid es el del grupo (ver _worker_init)
+            else:
+                os.kill(self.pids[slot], signal.SIGTERM)
+        self.pools[slot].shutdown(wait=False, cancel_futures=True)
+        self.pools[slot], self.pids[slot] = await self._new_pool()
+        self.stats["recycled"] += 1
+
+    async def close(self) -> None:
+        """Espera a que se vacíe la cola y libera el pool."""
+        await self.queue.join()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        for pool in self.pools:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    async def submit(self, request: dict, reply) -> None:
+        """
+        Encola una petición; 'reply' es una corrutina que recibe la respuesta.
+        Espera mientras la cola esté llena (contrapresión).
+        """
+        if request.get("op") == "stats":
+            await reply({"id": request.get("id"), "status": "stats", "queued": self.queue.qsize(),
+                         "in_flight": self.in_flight, **self.stats})
+            return
+        error = self._validate(request)
+        if error:
+            self.stats["error"] += 1
+            await reply({"id": request.get("id"), "status": "error", "error": error})
+            return
+        if request.get("rows") is None:
+            request = {**request, "level": self._level_path(request["level"])}
+        self.stats["accepted"] += 1
+        timeout = float(request.get("timeout") or self.timeout)  # ya validado
+        accepted = time.monotonic()
+        await self.queue.put((request, accepted, accepted + timeout, reply))
+
+    def _level_path(self, level: str) -> str | None:
+        """
+        Ruta real de 'level' (relativa al directorio actual o al de niveles) si
+        es un archivo dentro del directorio de niveles; si no, None.
+        """
+        for candidate in (level, os.path.join(self.levels_dir, level)):
+            path = os.path.realpath(candidate)
+            with contextlib.suppress(ValueError):  # Otra unidad en Windows
+                if os.path.commonpath([self.levels_dir, path]) == self.levels_dir and os.path.isfile(path):
+                    return path
+        return None
+
+    def _validate(self, request: dict) -> str | None:
+        agent = request.get("agent", self.agent)
+        if not isinstance(agent, str) or agent not in AGENTS:
+            return f"Agente '{agent}' no es válido. Agentes válidos: {list(AGENTS.keys())}"
+        rows, level = request.get("rows"), request.get("level")
+        if level is not None and not isinstance(level, str):
+            return "'level' debe ser un texto"
+        if rows is not None:
+            if not isinstance(rows, list) or not all(isinstance(row, str) for row in rows):
+                return "'rows' debe ser una lista de textos"
+        elif not level:
+            return "La petición necesita 'rows' (filas del nivel) o 'level' (ruta)"
+        elif self._level_path(level) is None:
+            return f"'level' debe ser un archivo del directorio de niveles ({self.levels_dir})"
+        kwargs = request.get("kwargs", {})
+        if not isinstance(kwargs, dict):
+            return "'kwargs' debe ser un objeto"
+        allowed = CLIENT_KWARGS.get(agent, {})
+        for name, value in kwargs.items():
+            if name not in allowed:
+                return f"'{name}' no se acepta en 'kwargs' de {agent}. Admitidos: {sorted(allowed)}"
+            error = allowed[name](value)
+            if error:
+                return f"'kwargs.{name}' {error}"
+        timeout = request.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+                                    or not math.isfinite(timeout) or timeout <= 0):
+            return f"'timeout' debe ser un número mayor que 0, no {timeout!r}"
+        seed = request.get("seed")
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+            return f"'seed' debe ser un entero o null, no {seed!r}"
+        return None
+
+    async def _dispatch(self, slot: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            request, accepted, deadline, reply = await self.queue.get()
+            try:
+                response = await self._run(loop, slot, request, accepted, deadline)
+                self.stats[response["status"]] += 1
+                await reply(response)
+            except Exception as error:  # Una respuesta fallida no detiene al despachador
+                print(f"service: no se pudo responder a {request.get('id')}: {error}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, loop, slot: int, request: dict, accepted: float, deadline: float) -> dict:
+        started = time.monotonic()
+        response = {"id": request.get("id")}
+        remaining = deadline - started
+        if remaining <= 0:
+            response["status"] = "expired"
+        else:
+            self.in_flight += 1
+            future = loop.run_in_executor(self.pools[slot], _solve, request.get("agent", self.agent),
+                                          request.get("level"), request.get("rows"), request.get("seed"),
+                                          remaining, request.get("kwargs", {}))
+            try:
+                response.update(await asyncio.wait_for(future, remaining + self.grace))
+            except asyncio.TimeoutError:
+                response["status"] = "timeout"
+                await self._recycle(slot)
+            finally:
+                self.in_flight -= 1
+        finished = time.monotonic()
+        response["queued"] = round(started - accepted, 6)
+        response["seconds"] = round(finished - accepted, 6)
+        return response
+
+
+def _parse(line: str):
+    """Devuelve (petición, None) o (None, respuesta de error)."""
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as error:
+        return None, {"id": None, "status": "error", "error": f"JSON inválido: {error}"}
+    if not isinstance(request, dict):
+        return None, {"id": None, "status": "error", "error": "Cada línea debe ser un objeto JSON"}
+    return request, None
+
+
+async def serve_stdio(service: SolveService) -> None:
+    """Lee peticiones de stdin y escribe las respuestas en stdout hasta el fin de la entrada."""
+    loop = asyncio.get_running_loop()
+
+    async def reply(response: dict) -> None:
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    await service.start()
+    while True:
+        # readline en un hilo: funciona igual con tuberías, archivos y terminales
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        request, error = _parse(line)
+        if error:
+            await reply(error)
+            continue
+        await service.submit(request, reply)
+    await service.close()
+
+
+async def serve_tcp(service: SolveService, host: str = "127.0.0.1", port: int = 8765, ready=None) -> None:
+    """
+    Servidor TCP de líneas JSON. Cada conexión recibe las respuestas de sus
+    propias peticiones. 'ready' (asyncio.Event) se activa al empezar a escuchar.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(response: dict) -> None:
+            if not writer.is_closing():
+                writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+
+        pending = []
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                request, error = _parse(line.decode("utf-8"))
+                if error:
+                    await reply(error)
+                    continue
+                # Se espera a que la cola tenga lugar antes de leer la siguiente línea
+                done = asyncio.Event()
+
+                async def reply_and_mark(response: dict, done=done) -> None:
+                    try:
+                        await reply(response)
+                    finally:
+                        done.set()
+                await service.submit(request, reply_and_mark)
+                pending.append(done)
+            # Fin de la entrada del cliente: se responden las peticiones aceptadas antes de cerrar
+            await asyncio.gather(*(done.wait() for done in pending))
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    await service.start()
+    server = await asyncio.start_server(handle, host, port, limit=2**20)
+    if ready is not None:
+        ready.set()
+    print(f"Servicio escuchando en {host}:{server.sockets[0].getsockname()[1]}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+async def request_many(requests: list, host: str = "127.0.0.1", port: int = 8765):
+    """Cliente: envía las peticiones por una conexión y genera las respuestas según llegan."""
+    reader, writer = await asyncio.open_connection(host, port, limit=2**20)
+    try:
+        for request in requests:
+            writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            await writer.drain()
+        writer.write_eof()
+        while line := await reader.readline():
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de resolución con cola y pool de procesos.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("stdio", "tcp"):
+        command = commands.add_parser(name)
+        command.add_argument("--workers", type=int, default=None, help="Procesos del pool (por defecto, CPUs)")
+        command.add_argument("--queue", type=int, default=32, help="Peticiones en espera antes de frenar la entrada")
+        command.add_argument("--timeout", type=float, default=30.0, help="Plazo por defecto de una petición (s)")
+        command.add_argument("--grace", type=float, default=5.0, help="Margen sobre el plazo antes de 'timeout' (s)")
+        command.add_argument("--agent", default="AStarPlayer", choices=list(AGENTS.keys()))
+        command.add_argument("--levels-dir", default="levels", help="Único directorio del que se leen niveles")
+        if name == "tcp":
+            command.add_argument("--host", default="127.0.0.1")
+            command.add_argument("--port", type=int, default=8765)
+    client = commands.add_parser("client", help="Envía niveles a un servicio TCP y muestra las respuestas.")
+    client.add_argument("levels", nargs="+")
+    client.add_argument("--agent", default="AStarPlayer", choices=list(AGENTS.keys()))
+    client.add_argument("--timeout", type=float, default=None)
+    client.add_argument("--seed", type=int, default=None)
+    client.add_argument("--host", default="127.0.0.1")
+    client.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == "client":
+        async def run_client():
+            requests = [{"id": i, "level": level, "agent": args.agent, "timeout": args.timeout, "seed": args.seed}
+                        for i, level in enumerate(args.levels)]
+            async for response in request_many(requests, args.host, args.port):
+                record = response.get("record") or {}
+                print(f"[{response['id']}] {args.levels[response['id']] if response['id'] is not None else '-'}: "
+                      f"{response['status']} en {response.get('seconds', 0):.3f} s "
+                      f"(cola {response.get('queued', 0):.3f} s, nodos {record.get('nodes_expanded', '-')})"
+                      + (f" {response['error']}" if "error" in response else ""))
+        asyncio.run(run_client())
+        return
+
+    service = SolveService(args.workers, args.queue, args.timeout, args.grace, args.agent, args.levels_dir)
+    try:
+        if args.command == "stdio":
+            asyncio.run(serve_stdio(service))
+        else:
+            asyncio.run(serve_tcp(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import csv
+import json
+import sys
+
+from game.board import FlowFreeBoard, parse_rows
+
+FORMAT = "flowfree-solution"
+VERSION = 1
+
+
+def encode(board: FlowFreeBoard) -> dict:
+    """
+    Convierte los caminos de un tablero al formato estructurado de solución:
+
+        {"format": "flowfree-solution", "version": 1,
+         "level": ["A.Y.Y", ...],            # el puzzle original
+         "paths": {"A": [0, 1, 6, ...], ...}} # celdas en orden, id = y * columns + x
+
+    El puzzle va incluido para que la solución se pueda verificar sin los
+    archivos de niveles.
+    """
+    columns = board.columns
+    return {
+        "format": FORMAT,
+        "version": VERSION,
+        "level": list(board.board),
+        "paths": {conn.key: [y * columns + x for x, y in conn.road] for conn in board.connections},
+    }
+
+
+def decode(solution: dict) -> dict:
+    """Devuelve los caminos como listas ordenadas de tuplas (x, y) por color."""
+    columns = len(parse_rows(solution["level"])[0])
+    return {key: [(cell % columns, cell // columns) for cell in path] for key, path in solution["paths"].items()}
+
+
+def dumps(solution: dict) -> str:
+    return json.dumps(solution, separators=(",", ":"))
+
+
+def loads(text: str) -> dict:
+    solution = json.loads(text)
+    if solution.get("format") != FORMAT:
+        raise ValueError(f"Formato '{solution.get('format')}' no es una solución de Flow Free")
+    return solution
+
+
+def verify(solution: dict) -> list:
+    """
+    Verifica una solución en tiempo lineal respecto al número de celdas.
+    Comprueba que cada camino una los dos extremos de su color, que celdas
+    consecutivas sean adyacentes, que no haya solapamientos ni paredes y que
+    se cubra todo el tablero. Devuelve la lista de errores (vacía si es válida).
+    """
+    level = parse_rows(solution["level"])
+    rows, columns = len(level), len(level[0]) if level else 0
+    size = rows * columns
+
+    endpoints = {}
+    walls = 0
+    for y, line in enumerate(level):
+        if len(line) != columns:
+            return [f"La fila {y} del nivel no tiene {columns} columnas"]
+        for x, cell in enumerate(line):
+            if cell == "#":
+                walls += 1
+            elif cell != ".":
+                endpoints.setdefault(cell, []).append(y * columns + x)
+
+    errors = []
+    paths = solution["paths"]
+    for key in endpoints.keys() - paths.keys():
+        errors.append(f"Falta el camino del color '{key}'")
+
+    owner = [None] * size
+    covered = 0
+    for key, path in paths.items():
+        ends = endpoints.get(key)
+        if not ends or len(ends) != 2:
+            errors.append(f"El color '{key}' no tiene dos extremos en el nivel")
+            continue
+        if len(path) < 2 or {path[0], path[-1]} != set(ends):
+            errors.append(f"El camino '{key}' no une sus dos extremos")
+
+        previous = None
+        for cell in path:
+            if not 0 <= cell < size:
+                errors.append(f"El camino '{key}' sale del tablero en la celda {cell}")
+                break
+            x, y = cell % columns, cell // columns
+            if level[y][x] == "#":
+                errors.append(f"El camino '{key}' pasa por la pared ({x},{y})")
+            elif level[y][x] not in (".", key):
+                errors.append(f"El camino '{key}' pisa el extremo de '{level[y][x]}' en ({x},{y})")
+            if owner[cell] is not None:
+                errors.append(f"Solapamiento en ({x},{y}) entre '{owner[cell]}' y '{key}'")
+            else:
+                owner[cell] = key
+                covered += 1
+            if previous is not None:
+                px, py = previous % columns, previous // columns
+                if abs(px - x) + abs(py - y) != 1:
+                    errors.append(f"El camino '{key}' salta de ({px},{py}) a ({x},{y})")
+            previous = cell
+
+    if covered != size - walls:
+        errors.append(f"Cobertura incompleta: {covered} de {size - walls} celdas")
+    return errors
+
+
+def _iter_solutions(path: str):
+    """Recorre las soluciones de un archivo JSONL o CSV de resultados."""
+    if path.endswith(".csv"):
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    for number, record in enumerate(records, start=1):
+        solution = record.get("solution", record) if isinstance(record, dict) else None
+        if isinstance(solution, str):
+            solution = json.loads(solution) if solution else None
+        if solution and solution.get("format") == FORMAT:
+            yield number, record, solution
+
+
+def verify_file(path: str) -> dict:
+    """Valida en bloque todas las soluciones de un archivo de resultados."""
+    summary = {"total": 0, "valid": 0, "invalid": []}
+    for number, record, solution in _iter_solutions(path):
+        summary["total"] += 1
+        errors = verify(solution)
+        if errors:
+            summary["invalid"].append((number, record.get("run_id"), errors))
+        else:
+            summary["valid"] += 1
+    return summary
+
+
+if __name__ == '__main__':
+    for results_path in sys.argv[1:]:
+        result = verify_file(results_path)
+        print(f"{results_path}: {result['valid']}/{result['total']} soluciones válidas")
+        for number, run_id, errors in result["invalid"]:
+            print(f"  registro {number} (run_id {run_id}): {'; '.join(errors)}")
@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_mb() -> float | None:
+    """Memoria residente del proceso en MB (psutil si está instalado, /proc en Linux, pico en otros Unix)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024**2
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+    return None
+
+
+class Telemetry:
+    """
+    Progreso de una resolución larga a intervalo fijo: nodos/s, reinicios/s,
+    tamaño de la memoria de fallos, mejor porcentaje de llenado y RSS. Los
+    agentes llaman a tick() en cada jugada; solo se escribe una muestra cuando
+    pasó 'interval' segundos desde la anterior. Las muestras van a la terminal
+    ('stream') y/o a un archivo JSONL ('path').
+    """
+    enabled = True
+
+    def __init__(self, interval: float = 1.0, path: str = None, stream=None):
+        self.interval = interval
+        self.path = path
+        self.stream = stream if stream is not None or path else sys.stderr
+        self._file = None
+        self._start = None
+        self._next = None
+        self._last = None  # (tiempo, nodos, reinicios) de la muestra anterior
+        self.best_fill = 0
+
+    def _observe(self, board) -> None:
+        fill = board.percentage_filled()
+        if fill > self.best_fill:
+            self.best_fill = fill
+
+    def tick(self, player, board) -> None:
+        self._observe(board)
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+            self._next = now + self.interval
+            self._last = (now, player.total_nodes_expanded, player.total_restarts)
+        if now >= self._next:
+            self._next = now + self.interval
+            self._emit(player, now)
+
+    def _emit(self, player, now: float) -> None:
+        last_time, last_nodes, last_restarts = self._last
+        elapsed = now - last_time
+        nodes, restarts = player.total_nodes_expanded, player.total_restarts
+        failed_states = getattr(player, "failed_states", None)
+        sample = {
+            "agent": player.name,
+            "elapsed": round(now - self._start, 3),
+            "nodes": nodes,
+            "nodes_per_s": round((nodes - last_nodes) / elapsed, 1) if elapsed > 0 else 0.0,
+            "restarts_per_s": round((restarts - last_restarts) / elapsed, 2) if elapsed > 0 else 0.0,
+            "failed_states": len(failed_states) if failed_states is not None else 0,
+            "best_fill": self.best_fill,
+            "rss_mb": current_rss_mb(),
+        }
+        self._last = (now, nodes, restarts)
+
+        if self.stream is not None:
+            rss = f"{sample['rss_mb']:.1f} MB" if sample["rss_mb"] is not None else "n/d"
+            self.stream.write(f"[{sample['agent']}] {sample['elapsed']:8.1f} s | {sample['nodes_per_s']:>10,.0f} nodos/s"
+                              f" | {sample['restarts_per_s']:>7.1f} reinicios/s | memoria {sample['failed_states']:,}"
+                              f" | mejor {sample['best_fill']}% | RSS {rss}\n")
+            self.stream.flush()
+        if self.path:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(sample) + "\n")
+            self._file.flush()
+
+    def finish(self, player, board=None) -> None:
+        """Escribe una última muestra (al resolver o al rendirse) y cierra el archivo."""
+        if board is not None:
+            self._observe(board)
+        if self._start is not None:
+            self._emit(player, time.monotonic())
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NullTelemetry:
+    """Telemetría desactivada."""
+    enabled = False
+
+    def tick(self, player, board) -> None:
+        pass
+
+    def finish(self, player, board=None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_TELEMETRY = NullTelemetry()
@@ -0,0 +1,278 @@
+"""
+Trazas de búsqueda para análisis sin volver a ejecutar el agente.
+
+Los agentes con la traza activada (player.enable_tracing(path)) emiten un
+evento por nodo expandido, camino aplicado, callejón sin salida y reinicio.
+Cada evento es una línea JSON con el tiempo desde el inicio ('t', segundos),
+el tipo ('e') y celdas como ids compactos (y * columnas + x):
+
+    {"t":0.0,"e":"start","agent":"AStarPlayer","seed":1,"level":"levels/5x5_4C_1.txt","rows":[...]}
+    {"t":0.000031,"e":"expand","c":7}
+    {"t":0.000102,"e":"commit","k":"A","p":[0,5,6,7]}
+    {"t":0.000150,"e":"stuck","k":"R"}
+    {"t":0.000151,"e":"restart"}
+    {"t":0.000982,"e":"end","solved":true,"nodes":107}
+
+El backtracking completo (con un solo proceso) emite en cambio 'assign' con
+la profundidad del camino probado; no emite 'expand'.
+
+Un archivo puede tener varias ejecuciones seguidas (se abre en modo 'append').
+Los eventos se acumulan en un búfer acotado que se vuelca al llenarse, así la
+memoria no crece con la longitud de la búsqueda. Si el archivo termina en
+'.gz' se comprime.
+
+Herramienta de reproducción:
+    python -m algorithms.trace heatmap traza.jsonl
+    python -m algorithms.trace step traza.jsonl [--run 0] [--delay 0.2]
+"""
+import argparse
+import gzip
+import json
+import time
+
+from game.board import FlowFreeBoard, format_rows, parse_rows
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceWriter:
+    """Escribe los eventos de búsqueda de un agente en un archivo JSONL."""
+    enabled = True
+
+    def __init__(self, path: str, buffer_size: int = 4096):
+        self.path = path
+        self.buffer_size = max(1, buffer_size)
+        self._buffer = []
+        self._file = None
+        self._start = time.perf_counter()
+        self.columns = 1
+        self.events = 0
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def _emit(self, line: str) -> None:
+        self._buffer.append(line)
+        self.events += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def event(self, kind: str, **fields) -> None:
+        record = {"t": round(self._elapsed(), 6), "e": kind, **fields}
+        self._emit(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def start(self, board: FlowFreeBoard, player) -> None:
+        self._start = time.perf_counter()
+        self.columns = board.columns
+        self.event("start", agent=type(player).__name__, seed=player.seed, level=getattr(board, "path", None),
+                   rows=list(board.board))
+
+    def expand(self, cell: int) -> None:
+        # Es el evento más frecuente: se formatea a mano
+        self._emit(f'{{"t":{self._elapsed():.6f},"e":"expand","c":{cell}}}\n')
+
+    def expand_point(self, point: tuple) -> None:
+        self.expand(point[1] * self.columns + point[0])
+
+    def commit(self, key: str, path: list) -> None:
+        columns = self.columns
+        self.event("commit", k=key, p=[y * columns + x for x, y in path])
+
+    def dead_end(self) -> None:
+        self.event("dead_end")
+
+    def stuck(self, key: str) -> None:
+        self.event("stuck", k=key)
+
+    def restart(self) -> None:
+        self.event("restart")
+
+    def finish(self, solved: bool, nodes: int) -> None:
+        self.event("end", solved=solved, nodes=nodes)
+        self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = _open(self.path, "a")
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NullTracer:
+    """Traza desactivada: misma interfaz sin hacer nada."""
+    enabled = False
+
+    def event(self, kind: str, **fields) -> None:
+        pass
+
+    def start(self, board, player) -> None:
+        pass
+
+    def expand(self, cell: int) -> None:
+        pass
+
+    def expand_point(self, point: tuple) -> None:
+        pass
+
+    def commit(self, key: str, path: list) -> None:
+        pass
+
+    def dead_end(self) -> None:
+        pass
+
+    def stuck(self, key: str) -> None:
+        pass
+
+    def restart(self) -> None:
+        pass
+
+    def finish(self, solved: bool, nodes: int) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+# ---------------- Lectura y reproducción ----------------
+
+def read_runs(path: str) -> list:
+    """Separa el archivo en ejecuciones: cada una es una lista de eventos que empieza en 'start'."""
+    runs = []
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event["e"] == "start" or not runs:
+                runs.append([])
+            runs[-1].append(event)
+    return runs
+
+
+def heatmap(events: list) -> list:
+    """Matriz (filas x columnas) con cuántas veces se expandió cada celda."""
+    rows = parse_rows(events[0]["rows"])
+    columns = len(rows[0]) if rows else 0
+    counts = [[0] * columns for _ in rows]
+    for event in events:
+        if event["e"] == "expand":
+            counts[event["c"] // columns][event["c"] % columns] += 1
+    return counts
+
+
+def format_heatmap(rows: list, counts: list) -> str:
+    """Texto del mapa de calor: número de expansiones por celda, '#' para paredes."""
+    width = max(3, len(str(max((max(r) for r in counts), default=0))))
+    lines = []
+    for y, row in enumerate(parse_rows(rows)):
+        lines.append(" ".join("#".rjust(width) if row[x] == "#" else str(counts[y][x]).rjust(width)
+                              for x in range(len(row))))
+    return "\n".join(lines)
+
+
+def replay(events: list):
+    """
+    Recorre una ejecución y genera (evento, cuadrícula) tras cada camino
+    aplicado, callejón, atasco o reinicio. La cuadrícula es una lista de filas
+    de texto: la letra del color en sus extremos, la minúscula en su camino.
+    """
+    rows = parse_rows(events[0]["rows"])
+    columns = len(rows[0]) if rows else 0
+    roads = {}
+    for event in events[1:]:
+        kind = event["e"]
+        if kind == "expand":
+            continue
+        if kind == "commit":
+            roads[event["k"]] = event["p"]
+        elif kind == "assign":
+            # Backtracking: el camino de profundidad d reemplaza a los de profundidad >= d
+            roads = dict(list(roads.items())[:event["depth"] - 1])
+            roads[event["k"]] = event["p"]
+        elif kind == "restart":
+            roads.clear()
+        grid = [list(row) for row in rows]
+        for key, path in roads.items():
+            for cell in path:
+                y, x = divmod(cell, columns)
+                if grid[y][x] == ".":
+                    grid[y][x] = key.lower()
+        yield event, format_rows(grid)
+
+
+def summarize(events: list) -> dict:
+    kinds = {}
+    for event in events:
+        kinds[event["e"]] = kinds.get(event["e"], 0) + 1
+    start, end = events[0], events[-1]
+    return {"agent": start.get("agent"), "seed": start.get("seed"), "level": start.get("level"),
+            "events": kinds, "seconds": end["t"], "solved": end.get("solved") if end["e"] == "end" else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análisis de trazas de búsqueda.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    heat = commands.add_parser("heatmap", help="Mapa de calor de celdas expandidas por nivel.")
+    heat.add_argument("trace")
+    heat.add_argument("--out", default=None, help="Guarda los mapas en un archivo JSON")
+    step = commands.add_parser("step", help="Recorre la búsqueda camino a camino.")
+    step.add_argument("trace")
+    step.add_argument("--run", type=int, default=0, help="Índice de la ejecución dentro del archivo")
+    step.add_argument("--delay", type=float, default=None, help="Segundos entre pasos (por defecto, Enter)")
+    args = parser.parse_args()
+
+    runs = read_runs(args.trace)
+    if args.command == "heatmap":
+        # Las ejecuciones del mismo nivel se acumulan en un solo mapa
+        levels = {}
+        for events in runs:
+            level = events[0].get("level") or "\n".join(events[0]["rows"])
+            counts = heatmap(events)
+            if level in levels:
+                previous = levels[level]["counts"]
+                counts = [[a + b for a, b in zip(r1, r2)] for r1, r2 in zip(previous, counts)]
+            levels[level] = {"rows": events[0]["rows"], "counts": counts,
+                             "runs": levels.get(level, {}).get("runs", 0) + 1}
+        for level, data in levels.items():
+            print(f"\n{level} ({data['runs']} ejecución(es)):")
+            print(format_heatmap(data["rows"], data["counts"]))
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(levels, f)
+        return
+
+    events = runs[args.run]
+    info = summarize(events)
+    print(f"{info['agent']} seed={info['seed']} {info['level']}: {info['events']} en {info['seconds']:.3f} s")
+    for index, (event, grid) in enumerate(replay(events)):
+        label = event["e"] + (f" {event['k']}" if "k" in event else "")
+        print(f"\n[{index}] t={event['t']:.6f} {label}")
+        print("\n".join(grid))
+        if args.delay is None:
+            if input("Enter para seguir, q para salir: ").strip().lower() == "q":
+                break
+        else:
+            time.sleep(args.delay)
+
+
+if __name__ == "__main__":
+    main()
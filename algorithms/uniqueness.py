@@ -0,0 +1,217 @@
+"""
+Conteo de soluciones de un nivel por propagación de restricciones. Lo usa el
+generador de niveles para comprobar que un nivel tiene solución única.
+
+Cada par de celdas libres vecinas es una arista que un camino usa o no
+(encendida, apagada o sin decidir), y cada celda tiene una máscara de bits con
+los colores que todavía puede tomar (bit i = board.connections[i]). Reglas:
+
+- Grado: un extremo usa exactamente una arista; cualquier otra celda, dos.
+- Color: una arista encendida une celdas del mismo color; entre celdas sin
+  colores en común la arista se apaga.
+- Soporte: una celda conserva un color solo si tiene tantos vecinos que lo
+  admiten como aristas le faltan (dos, o uno si es extremo).
+- Ciclos: cada punta de un fragmento de camino conoce la otra punta; la
+  arista que las uniría cerraría un ciclo y se apaga.
+- Alcance: un color desaparece de las celdas a las que no llega desde su
+  extremo por celdas que lo admiten; si no llega al otro extremo, no hay
+  solución. Solo se recalcula para los colores que perdieron celdas o aristas.
+
+Cuando la propagación se detiene se ramifica sobre una arista de la celda con
+menos aristas sin decidir. Con 'hint' (una solución conocida) se prueba primero
+el valor de esa solución: se la encuentra enseguida y el resto del presupuesto
+se dedica a buscar otra distinta.
+"""
+from game.board import FlowFreeBoard
+
+
+class _Model:
+    """Datos fijos del nivel: aristas por celda, grado de cada celda y extremos de cada color."""
+
+    def __init__(self, board: FlowFreeBoard):
+        self.cells = [cell for cell, (x, y) in enumerate(board.cell_points) if board._validate_cell(x, y)]
+        size = len(board.cell_points)
+        edge_ids = {}
+        cell_edges = [() for _ in range(size)]
+        for cell in self.cells:
+            pairs = []
+            for n in board.neighbors[cell]:
+                key = (min(cell, n), max(cell, n))
+                pairs.append((edge_ids.setdefault(key, len(edge_ids)), n))
+            cell_edges[cell] = tuple(pairs)
+        self.edge_ids = edge_ids
+        self.cell_edges = cell_edges
+        self.colors = len(board.connections)
+        self.ends = [conn.cells for conn in board.connections]
+
+        self.degree = [2] * size
+        full = (1 << self.colors) - 1
+        self.mask = [full if board._validate_cell(x, y) else 0 for x, y in board.cell_points]
+        for index, (a, b) in enumerate(self.ends):
+            self.degree[a] = self.degree[b] = 1
+            self.mask[a] = self.mask[b] = 1 << index
+        self.edges = [-1] * len(edge_ids)
+
+    def edge_of(self, a: int, b: int) -> int:
+        return self.edge_ids[(min(a, b), max(a, b))]
+
+    def propagate(self, edge: list, mask: list, other: list, pending: set, dirty: int) -> bool:
+        """
+        Aplica las reglas hasta un punto fijo sobre el estado (modificándolo).
+        'pending' son las celdas a revisar y 'dirty' la máscara de colores cuyo
+        alcance hay que recalcular. Devuelve False si el estado no tiene solución.
+        """
+        cell_edges, degree = self.cell_edges, self.degree
+        while True:
+            while pending:
+                v = pending.pop()
+                on = 0
+                undecided = []
+                supports = []
+                for e, u in cell_edges[v]:
+                    state = edge[e]
+                    if state == 1:
+                        on += 1
+                        m = mask[v] & mask[u]
+                        if not m:
+                            return False
+                        if m != mask[u]:
+                            dirty |= mask[u] & ~m
+                            mask[u] = m
+                            pending.add(u)
+                        if m != mask[v]:
+                            dirty |= mask[v] & ~m
+                            mask[v] = m
+                            pending.add(v)
+                        supports.append(m)
+                    elif state == -1:
+                        undecided.append((e, u))
+                        supports.append(mask[u])
+                need = degree[v] - on
+                if need < 0 or need > len(undecided):
+                    return False
+
+                # Soporte: colores presentes en al menos 'degree' vecinos utilizables
+                allowed = 0
+                if degree[v] == 1:
+                    for m in supports:
+                        allowed |= m
+                else:
+                    for i in range(len(supports) - 1):
+                        for j in range(i + 1, len(supports)):
+                            allowed |= supports[i] & supports[j]
+                m = mask[v] & allowed
+                if m != mask[v]:
+                    if not m:
+                        return False
+                    dirty |= mask[v] & ~m
+                    mask[v] = m
+                    pending.update(u for _, u in cell_edges[v])
+
+                if not undecided:
+                    continue
+                if need == 0:
+                    for e, u in undecided:
+                        edge[e] = 0
+                        dirty |= mask[v] & mask[u]
+                        pending.add(u)
+                elif need == len(undecided):
+                    for e, u in undecided:
+                        if other[v] == u:
+                            return False
+                        edge[e] = 1
+                        a, b = other[v], other[u]
+                        other[a], other[b] = b, a
+                        pending.update((u, a, b))
+                    pending.add(v)
+                else:
+                    mv = mask[v]
+                    for e, u in undecided:
+                        if not mv & mask[u] or other[v] == u:
+                            edge[e] = 0
+                            dirty |= mv & mask[u]
+                            pending.update((u, v))
+
+            if not dirty:
+                return True
+            while dirty:
+                bit = dirty & -dirty
+                dirty ^= bit
+                start, goal = self.ends[bit.bit_length() - 1]
+                seen = {start}
+                frontier = [start]
+                while frontier:
+                    v = frontier.pop()
+                    for e, u in cell_edges[v]:
+                        if edge[e] and u not in seen and mask[u] & bit:
+                            seen.add(u)
+                            frontier.append(u)
+                if goal not in seen:
+                    return False
+                for cell in self.cells:
+                    if mask[cell] & bit and cell not in seen:
+                        mask[cell] &= ~bit
+                        if not mask[cell]:
+                            return False
+                        pending.add(cell)
+            if not pending:
+                return True
+
+    def branch_cell(self, edge: list):
+        """Celda con menos aristas sin decidir (y esas aristas), o None si no queda ninguna."""
+        best, best_count = None, 5
+        for v in self.cells:
+            undecided = [(e, u) for e, u in self.cell_edges[v] if edge[e] == -1]
+            if undecided and len(undecided) < best_count:
+                best, best_count = (v, undecided), len(undecided)
+                if best_count == 2:
+                    break
+        return best
+
+
+def count_solutions(board: FlowFreeBoard, limit: int = 2, max_nodes: int = None, hint: list = None):
+    """
+    Cuenta las soluciones del nivel (sin mirar sus caminos actuales) hasta
+    'limit'. 'hint' es una solución conocida: una secuencia de ids de celda por
+    conexión, en el orden de board.connections. Devuelve (soluciones, nodos,
+    completo): 'completo' es False si se agotó 'max_nodes' antes de terminar, y
+    entonces el conteo es solo una cota inferior.
+    """
+    model = _Model(board)
+    preferred = set()
+    for path in hint or ():
+        preferred.update(model.edge_of(a, b) for a, b in zip(path, path[1:]))
+
+    root = (model.edges[:], model.mask[:], list(range(len(model.mask))), set(model.cells), (1 << model.colors) - 1)
+    stack = [root]
+    solutions = nodes = 0
+    while stack:
+        if max_nodes is not None and nodes >= max_nodes:
+            return solutions, nodes, False
+        edge, mask, other, pending, dirty = stack.pop()
+        nodes += 1
+        if not model.propagate(edge, mask, other, pending, dirty):
+            continue
+        chosen = model.branch_cell(edge)
+        if chosen is None:
+            solutions += 1
+            if solutions >= limit:
+                return solutions, nodes, True
+            continue
+
+        v, undecided = chosen
+        e, u = undecided[0]
+        off_edge = edge[:]
+        off_edge[e] = 0
+        children = [(off_edge, mask[:], other[:], {v, u}, mask[v] & mask[u])]
+        if other[v] != u:
+            on_edge, on_other = edge[:], other[:]
+            on_edge[e] = 1
+            a, b = on_other[v], on_other[u]
+            on_other[a], on_other[b] = b, a
+            children.append((on_edge, mask[:], on_other, {v, u, a, b}, 0))
+        if e in preferred:
+            children.reverse()
+        # La pila saca el último: el primero de 'children' es el que se explora antes
+        stack.extend(reversed(children))
+    return solutions, nodes, True
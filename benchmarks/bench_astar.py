@@ -0,0 +1,61 @@
+"""
+Compara la búsqueda A* escalar con la variante por lotes: comprueba que ambas
+devuelven el mismo camino y expanden los mismos nodos, y mide nodos por segundo.
+Los estados de prueba salen de partidas reales de AStarPlayer con semilla fija.
+
+Uso: python -m benchmarks.bench_astar [--levels 7x7_5C_2.txt 9x9_9C_3.txt] [--states 200]
+"""
+import argparse
+import os
+import time
+
+from game.board import FlowFreeBoard
+from algorithms.astar import AStarPlayer
+
+DEFAULT_LEVELS = ["5x5_4C_1.txt", "7x7_5C_2.txt", "7x7_6C_1.txt", "9x9_9C_3.txt", "10x10_8C_5.txt"]
+
+
+def sample_states(level_path: str, count: int, seed: int) -> list:
+    """Guarda (instantánea del tablero, conexión) de los pasos de una partida de A* con reinicios."""
+    board = FlowFreeBoard(level_path)
+    player = AStarPlayer(seed=seed)
+    states = []
+    while len(states) < count and not board.is_full():
+        for conn in board.connections:
+            if not conn.is_completed:
+                states.append((board.snapshot(), board.connections.index(conn)))
+        player.play(board)
+    return board, states[:count]
+
+
+def run(player: AStarPlayer, search, board: FlowFreeBoard, states: list):
+    results, nodes = [], 0
+    start = time.perf_counter()
+    for snapshot, index in states:
+        board.restore(snapshot)
+        path, expanded, depth = search(board, board.connections[index])
+        results.append((path, expanded, depth))
+        nodes += expanded
+    return results, nodes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", nargs="+", default=DEFAULT_LEVELS)
+    parser.add_argument("--states", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for level in args.levels:
+        board, states = sample_states(os.path.join("levels", level), args.states, args.seed)
+        player = AStarPlayer()
+        scalar, nodes, scalar_time = run(player, player._astar_search, board, states)
+        batched, _, batched_time = run(player, player._astar_search_batched, board, states)
+        same = "idénticos" if scalar == batched else "DIFERENTES"
+        print(f"{level:>18}: {len(states):4d} búsquedas, {nodes:7d} nodos | "
+              f"escalar {nodes / scalar_time:10.0f} nodos/s | lotes {nodes / batched_time:10.0f} nodos/s | "
+              f"x{scalar_time / batched_time:5.1f} | resultados {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Mide la memoria por tablero: bytes de un FlowFreeBoard recién cargado, de un
+fork (board.fork()) y de una instantánea (board.snapshot()), con los caminos de
+una partida de A* aplicados. Se crean 'count' copias vivas a la vez y se divide
+el total de tracemalloc, como cuando un portafolio, una caché o una evaluación
+por lotes guardan muchos tableros.
+
+Uso: python -m benchmarks.bench_memory [--levels 7x7_5C_2.txt 15x15_13C_23.txt] [--count 500]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tracemalloc
+
+from game.board import FlowFreeBoard
+from algorithms.astar import AStarPlayer
+
+DEFAULT_LEVELS = ["5x5_4C_1.txt", "7x7_5C_2.txt", "9x9_9C_3.txt", "15x15_13C_23.txt"]
+
+
+def bytes_per_object(make, count: int) -> float:
+    """Memoria media retenida por cada uno de 'count' objetos creados con make()."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [make() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / count
+
+
+def played_board(level_path: str, moves: int, seed: int) -> FlowFreeBoard:
+    """Tablero con algunos caminos aplicados por A* (los tableros vacíos no miden los caminos)."""
+    board = FlowFreeBoard(level_path)
+    player = AStarPlayer(seed=seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(moves):
+            if board.is_full():
+                break
+            player.play(board)
+    return board
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", nargs="+", default=DEFAULT_LEVELS)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--moves", type=int, default=5, help="Jugadas de A* antes de medir")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for level in args.levels:
+        path = os.path.join("levels", level)
+        board = played_board(path, args.moves, args.seed)
+        loaded = bytes_per_object(lambda: FlowFreeBoard(path), args.count)
+        forked = bytes_per_object(board.fork, args.count)
+        snapshot = bytes_per_object(board.snapshot, args.count)
+        print(f"{level:>18}: {board.percentage_filled():3d}% lleno | cargado {loaded:9.0f} B | "
+              f"fork {forked:8.0f} B | instantánea {snapshot:6.0f} B")
+
+
+if __name__ == "__main__":
+    main()
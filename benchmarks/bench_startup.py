@@ -0,0 +1,52 @@
+"""
+Benchmark de arranque en frío: mide cuánto tarda un proceso nuevo en importar
+el núcleo (tablero, cargador y agentes) y comprueba que no se carga ninguna
+dependencia interactiva ('keyboard', menú, controles) ni numpy, que solo usan
+game.board_array y los benchmarks de escalado.
+
+Uso: python -m benchmarks.bench_startup [--runs 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CORE_IMPORT = (
+    "import sys, game.board, game.cargar_txt, algorithms.astar, algorithms.bfs, algorithms.dfs; "
+    "leaked = [m for m in ('keyboard', 'game.control', 'game.menu', 'game.player', 'numpy', 'game.board_array') "
+    "if m in sys.modules]; "
+    "sys.exit(1 if leaked else 0)"
+)
+
+
+def measure(statement: str, runs: int) -> list:
+    """Tiempos (ms) de 'python -c statement' en procesos nuevos."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", statement], cwd=ROOT)
+        times.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError("El núcleo importó dependencias interactivas o numpy")
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    baseline = measure("pass", args.runs)
+    core = measure(CORE_IMPORT, args.runs)
+    interpreter = statistics.median(baseline)
+    print(f"Intérprete vacío:  {interpreter:8.2f} ms (mediana de {args.runs})")
+    print(f"Núcleo importado:  {statistics.median(core):8.2f} ms")
+    print(f"Coste del núcleo:  {statistics.median(core) - interpreter:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+"""
+Curvas de complejidad: barre el lado del tablero y la cantidad de colores
+sobre niveles generados (algorithms.generator) y/o existentes, resuelve cada
+nivel con cada agente (y cada conjunto de heurísticas) y ajusta cómo crecen el
+tiempo, los nodos expandidos y la RAM.
+
+Por cada caso y métrica se ajustan, en escala logarítmica y sobre la mediana
+de cada nivel:
+- contra el lado y contra los colores, una potencia y = a·x^b y una
+  exponencial y = a·e^(c·x); 'best' es la de mayor R²;
+- una potencia conjunta y = a·lado^p·colores^q, que separa los dos efectos.
+
+Las ejecuciones que no terminan dentro de --timeout cuentan como fallos y,
+en el tiempo, valen lo que tardaron en rendirse y al menos --timeout
+(censuradas, como en benchmarks.suite). Un nivel con la mitad o más de sus
+ejecuciones fallidas entra en el ajuste del tiempo con una mediana que es solo
+una cota inferior: 'censored' cuenta esos niveles, y con ellos el crecimiento
+ajustado es también una cota inferior; si todos los niveles de un caso están
+así, el tiempo no tiene ajuste (n/a). Las otras métricas no tienen valor para
+una ejecución fallida. Con --baseline se marca una regresión cuando un
+exponente de la potencia conjunta crece más que --threshold o cuando sube la
+fracción de ejecuciones fallidas de un caso; el código de salida es 1 si hay
+regresiones.
+
+Uso:
+    python -m benchmarks.scaling --sizes 5 6 7 8 9 --colors 4 6 8 --agents AStarPlayer DFSPlayer \\
+        --out output/scaling.json
+    python -m benchmarks.scaling --levels levels/*.txt --agents AStarPlayer \\
+        --heuristics manhattan,euclidean manhattan,penalty_enclosure,euclidean,exploration_bonus
+    python -m benchmarks.scaling --sizes 5 6 7 8 9 --colors 4 6 8 --baseline output/scaling.json
+"""
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from algorithms.generator import generate_level
+from algorithms.portfolio import member_label
+from algorithms.results import NullSink, open_sink
+from algorithms.runner import AGENTS, run_level
+from benchmarks.suite import METRICS, summarize
+from game.board import FlowFreeBoard, parse_rows
+from game.cargar_txt import load
+
+
+def generated_levels(sizes: list, colors: list, per_point: int, walls: float, seed: int,
+                     check: bool = False) -> list:
+    """
+    Niveles (nombre, filas, unicidad) generados para cada combinación de lado y
+    colores que entra en el tablero. Con 'check' se comprueba la unicidad (los
+    que agotan el presupuesto se aceptan como 'unverified'); si no, quedan
+    'unchecked'. Los que no son 'unique' llevan el estado al final del nombre.
+    """
+    seeds = random.Random(seed)
+    levels = []
+    for side in sizes:
+        for count in colors:
+            if side * side < 3 * count:
+                continue
+            for number in range(1, per_point + 1):
+                level = generate_level(side, side, count, walls, seed=seeds.randrange(2**32), check=check,
+                                       allow_unverified=True)
+                if level is not None:
+                    tag = "" if level["unique"] == "unique" else f"-{level['unique']}"
+                    levels.append((f"{side}x{side}_{count}C_g{number}{tag}", level["rows"], level["unique"]))
+    return levels
+
+
+def describe(name: str, rows: list, unique: str = None) -> dict:
+    """
+    Tamaño de un nivel: lado (el mayor de alto y ancho), colores y celdas
+    libres, y su unicidad según el generador (None para niveles existentes).
+    """
+    cells = parse_rows(rows)
+    board = FlowFreeBoard.from_lines(rows, name)
+    return {"level": name, "side": max(board.rows, board.columns), "colors": len(board.connections),
+            "cells": sum(token != "#" for row in cells for token in row), "unique": unique}
+
+
+def agent_cases(agents: list, heuristic_sets: list) -> list:
+    """(agente, kwargs) por agente; los que aceptan 'heuristics', uno por conjunto."""
+    cases = []
+    for agent in agents:
+        if heuristic_sets and "heuristics" in inspect.signature(AGENTS[agent]).parameters:
+            cases.extend((agent, {"heuristics": heuristics}) for heuristics in heuristic_sets)
+        else:
+            cases.append((agent, {}))
+    return cases
+
+
+def measure(agent: str, kwargs: dict, name: str, rows: list, repetitions: int, seed: int,
+            timeout: float = None, sink=None) -> dict:
+    """
+    Resuelve un nivel 'repetitions' veces (un tablero nuevo cada vez) y resume
+    cada métrica. Una ejecución fallida suma a 'failures' y, en
+    'running_time', vale lo que tardó y al menos 'timeout' ('censored').
+    """
+    seeds = random.Random(seed)
+    samples = {metric: [] for metric in METRICS}
+    failures = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repetitions):
+            started = time.monotonic()
+            record = run_level(agent, FlowFreeBoard.from_lines(rows, name), seed=seeds.randrange(2**32),
+                               sink=sink or NullSink(), timeout=timeout, **kwargs)
+            if record is None:
+                failures += 1
+                samples["running_time"].append(max(time.monotonic() - started, timeout or 0.0))
+                continue
+            for metric in METRICS:
+                samples[metric].append(float(record[metric]))
+    metrics = {metric: summarize(values) for metric, values in samples.items() if values}
+    if "running_time" in metrics:
+        metrics["running_time"]["censored"] = failures
+    return {"failures": failures, "metrics": metrics}
+
+
+def censored_median(stats: dict) -> bool:
+    """Si la mediana de una métrica es solo una cota inferior (la mitad o más de sus muestras censuradas)."""
+    censored = stats.get("censored", 0)
+    return censored > 0 and 2 * censored >= stats["n"]
+
+
+def fit_axis(xs: list, ys: list) -> dict | None:
+    """
+    Ajusta y = a·x^b y y = a·e^(c·x) por mínimos cuadrados sobre log(y). Devuelve
+    los coeficientes, el R² de cada modelo (en escala log) y el mejor, o None si
+    no hay al menos dos valores distintos de x con y > 0.
+    """
+    points = [(x, y) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+    x = np.array([p[0] for p in points], dtype=float)
+    log_y = np.log([p[1] for p in points])
+
+    def r2(predicted: np.ndarray) -> float:
+        total = float(((log_y - log_y.mean()) ** 2).sum())
+        return 1 - float(((log_y - predicted) ** 2).sum()) / total if total else 1.0
+
+    b, log_a = np.polyfit(np.log(x), log_y, 1)
+    c, log_a_exp = np.polyfit(x, log_y, 1)
+    power = {"a": float(np.exp(log_a)), "b": float(b), "r2": r2(log_a + b * np.log(x))}
+    exponential = {"a": float(np.exp(log_a_exp)), "c": float(c), "r2": r2(log_a_exp + c * x)}
+    return {"power": power, "exponential": exponential,
+            "best": "exponential" if exponential["r2"] > power["r2"] else "power"}
+
+
+def fit_joint(sides: list, colors: list, ys: list) -> dict | None:
+    """Ajusta y = a·lado^p·colores^q sobre log(y), o None si lado y colores no varían lo suficiente."""
+    points = [(s, k, y) for s, k, y in zip(sides, colors, ys) if y > 0]
+    if len(points) < 3 or len({s for s, _, _ in points}) < 2 or len({k for _, k, _ in points}) < 2:
+        return None
+    design = np.array([[1.0, np.log(s), np.log(k)] for s, k, _ in points])
+    log_y = np.log([y for _, _, y in points])
+    (log_a, p, q), *_ = np.linalg.lstsq(design, log_y, rcond=None)
+    residual = log_y - design @ np.array([log_a, p, q])
+    total = float(((log_y - log_y.mean()) ** 2).sum())
+    return {"a": float(np.exp(log_a)), "side_exponent": float(p), "colors_exponent": float(q),
+            "r2": 1 - float((residual ** 2).sum()) / total if total else 1.0}
+
+
+def fit_case(points: list) -> dict:
+    """
+    Ajustes por métrica a partir de los puntos (nivel medido) de un caso.
+    'censored' cuenta los puntos cuya mediana es una cota inferior; entran en
+    el ajuste con esa cota. Si todas lo son no se ajusta nada (los ajustes son
+    None): la pendiente solo describiría cómo se eligió el plazo.
+    """
+    fits = {}
+    for metric in METRICS:
+        measured = [p for p in points if metric in p["metrics"]]
+        censored = sum(censored_median(p["metrics"][metric]) for p in measured)
+        if measured and censored == len(measured):
+            fits[metric] = {"side": None, "colors": None, "joint": None, "censored": censored}
+            continue
+        sides = [p["side"] for p in measured]
+        colors = [p["colors"] for p in measured]
+        medians = [p["metrics"][metric]["median"] for p in measured]
+        fits[metric] = {"side": fit_axis(sides, medians), "colors": fit_axis(colors, medians),
+                        "joint": fit_joint(sides, colors, medians), "censored": censored}
+    return fits
+
+
+def failure_rate(report: dict, case: dict) -> float | None:
+    """Fracción de ejecuciones fallidas de un caso, o None si no tiene ejecuciones."""
+    runs = len(case["points"]) * report.get("repetitions", 1)
+    return sum(p["failures"] for p in case["points"]) / runs if runs else None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Marca cada exponente de la potencia conjunta de 'current' frente a
+    'baseline': 'regression' si crece más que 'threshold', 'improvement' si baja
+    más que 'threshold', si no 'ok'. Además marca la fracción de ejecuciones
+    fallidas de cada caso (métrica 'failures'): cualquier aumento es una
+    regresión, aunque los exponentes de las que terminaron mejoren.
+    """
+    flags = []
+    for key, case in current["cases"].items():
+        before = baseline.get("cases", {}).get(key)
+        if before is None:
+            continue
+        rate, old_rate = failure_rate(current, case), failure_rate(baseline, before)
+        if rate is not None and old_rate is not None:
+            status = "regression" if rate > old_rate else "improvement" if rate < old_rate else "ok"
+            case["failure_rate"] = {"rate": rate, "baseline_rate": old_rate, "status": status}
+            flags.append((key, "failures", "rate", status))
+        for metric, fits in case["fits"].items():
+            joint, old = fits["joint"], before["fits"].get(metric, {}).get("joint")
+            if joint is None or old is None:
+                continue
+            for exponent in ("side_exponent", "colors_exponent"):
+                change = joint[exponent] - old[exponent]
+                status = "regression" if change > threshold else "improvement" if change < -threshold else "ok"
+                joint.setdefault("baseline", {})[exponent] = old[exponent]
+                joint.setdefault("status", {})[exponent] = status
+                flags.append((key, metric, exponent, status))
+    return flags
+
+
+def print_report(report: dict) -> None:
+    for key, case in report["cases"].items():
+        failures = sum(p["failures"] for p in case["points"])
+        print(f"\n{key}  ({len(case['points'])} niveles, fallos: {failures})")
+        change = case.get("failure_rate")
+        if change is not None and change["status"] != "ok":
+            print(f"  fallos {change['status'].upper()}: {change['rate']:.0%} (antes {change['baseline_rate']:.0%})")
+        for metric, fits in case["fits"].items():
+            parts = []
+            if fits["side"] is None and fits["colors"] is None and fits["joint"] is None:
+                reason = (f"las {fits['censored']} medianas son el plazo" if fits.get("censored")
+                          else "sin ejecuciones terminadas o sin variación de tamaño")
+                print(f"  {metric:>15}: n/a ({reason})")
+                continue
+            if fits.get("censored"):
+                parts.append(f"cota inferior ({fits['censored']} nivel(es) con mediana censurada)")
+            for axis, label in (("side", "lado"), ("colors", "colores")):
+                fit = fits[axis]
+                if fit is None:
+                    continue
+                best = fit[fit["best"]]
+                growth = f"x^{best['b']:.2f}" if fit["best"] == "power" else f"e^({best['c']:.3f}x)"
+                parts.append(f"{label} {growth} (R² {best['r2']:.2f})")
+            joint = fits["joint"]
+            if joint is not None:
+                parts.append(f"lado^{joint['side_exponent']:.2f}·colores^{joint['colors_exponent']:.2f}"
+                             f" (R² {joint['r2']:.2f})")
+                for exponent, status in joint.get("status", {}).items():
+                    if status != "ok":
+                        parts.append(f"{exponent} {status.upper()} (antes {joint['baseline'][exponent]:.2f})")
+            print(f"  {metric:>15}: " + " | ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Curvas de crecimiento por tamaño de tablero y cantidad de colores.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[], help="Lados de los niveles generados")
+    parser.add_argument("--colors", type=int, nargs="*", default=[], help="Colores de los niveles generados")
+    parser.add_argument("--per-point", type=int, default=2, help="Niveles generados por (lado, colores)")
+    parser.add_argument("--walls", type=float, default=0.0, help="Fracción de paredes de los niveles generados")
+    parser.add_argument("--check-unique", action="store_true",
+                        help="Comprueba la unicidad de los niveles generados (por defecto quedan 'unchecked')")
+    parser.add_argument("--levels", nargs="*", default=[], help="Niveles existentes a incluir")
+    parser.add_argument("--agents", nargs="+", default=["AStarPlayer"], choices=list(AGENTS.keys()))
+    parser.add_argument("--heuristics", nargs="*", default=[],
+                        help="Conjuntos de heurísticas separadas por comas, p. ej. manhattan,euclidean")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Segundos por ejecución")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--raw", default=None, help="Guarda cada ejecución medida en este sink (.csv, .jsonl, .db)")
+    parser.add_argument("--baseline", default=None, help="Reporte anterior contra el que comparar los exponentes")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Aumento mínimo de un exponente")
+    parser.add_argument("--out", default=os.path.join("output", "scaling.json"))
+    args = parser.parse_args()
+
+    if not args.levels and not (args.sizes and args.colors):
+        parser.error("hace falta --levels o --sizes y --colors")
+    levels = generated_levels(args.sizes, args.colors, args.per_point, args.walls, args.seed, args.check_unique)
+    levels += [(os.path.basename(path), load(path), None) for path in args.levels]
+    described = [describe(*level) for level in levels]
+
+    sink = open_sink(args.raw) if args.raw else None
+    heuristic_sets = [heuristics.split(",") for heuristics in args.heuristics]
+    report = {"sizes": args.sizes, "colors": args.colors, "walls": args.walls, "repetitions": args.repetitions,
+              "timeout": args.timeout, "seed": args.seed, "levels": described, "cases": {}}
+    for agent, kwargs in agent_cases(args.agents, heuristic_sets):
+        key = member_label(AGENTS[agent], kwargs)
+        points = []
+        for (name, rows, _), info in zip(levels, described):
+            print(f"Ejecutando {key} en {name} ...")
+            points.append({**info, **measure(agent, kwargs, name, rows, args.repetitions, args.seed,
+                                             args.timeout, sink)})
+        report["cases"][key] = {"agent": agent, "kwargs": kwargs, "points": points, "fits": fit_case(points)}
+    if sink is not None:
+        sink.close()
+
+    flags = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            flags = compare(report, json.load(f), args.threshold)
+    print_report(report)
+
+    directory = os.path.dirname(args.out)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReporte guardado en: {args.out}")
+
+    regressions = [(key, metric, exponent) for key, metric, exponent, status in flags if status == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es):")
+        for key, metric, exponent in regressions:
+            print(f"  {key}: {metric} ({exponent})")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Suite de benchmarks con estadística: cada caso (nivel, agente, configuración)
+se ejecuta 'warmup' veces sin medir y luego 'repetitions' veces con semillas
+deterministas. Por cada métrica (tiempo, nodos expandidos y RAM máxima) se
+reportan mediana, p90, p99, rango intercuartílico e intervalo de confianza
+bootstrap de la mediana.
+
+Las ejecuciones que no resuelven el nivel antes de --timeout no se descartan:
+cuentan como fallos y, en el tiempo, valen 'timeout' segundos (una cota
+inferior de lo que habrían tardado). Así un cambio que hace que las ejecuciones
+lentas venzan el plazo no deja solo a las rápidas en la muestra.
+
+Con --baseline se compara contra un reporte anterior y se marca una regresión
+cuando la tasa de éxito baja, o cuando la mediana empeora más que el umbral y
+los intervalos de confianza no se solapan. El código de salida es 1 si hay
+regresiones.
+
+Uso:
+    python -m benchmarks.suite --levels 5x5_4C_1.txt 7x7_5C_2.txt --agents AStarPlayer DFSPlayer \\
+        --repetitions 20 --out output/suite.json
+    python -m benchmarks.suite --config benchmarks/suite.json --baseline output/suite.json
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import statistics
+import time
+
+from algorithms.results import NullSink, open_sink
+from algorithms.runner import AGENTS, run_level
+from algorithms.portfolio import member_label
+
+METRICS = {"running_time": "s", "nodes_expanded": "nodos", "max_ram_usage": "MB"}
+DEFAULT_LEVELS = ["5x5_4C_1.txt", "7x7_5C_2.txt", "7x7_6C_1.txt"]
+
+
+def percentile(values: list, q: float) -> float:
+    """Percentil 'q' (0-100) con interpolación lineal, sobre una lista ordenada."""
+    if len(values) == 1:
+        return values[0]
+    position = (len(values) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def bootstrap_ci(values: list, confidence: float = 0.95, resamples: int = 2000, seed: int = 0) -> tuple:
+    """Intervalo de confianza bootstrap (percentiles) de la mediana."""
+    rng = random.Random(seed)
+    medians = sorted(statistics.median(rng.choices(values, k=len(values))) for _ in range(resamples))
+    tail = (1 - confidence) / 2 * 100
+    return percentile(medians, tail), percentile(medians, 100 - tail)
+
+
+def summarize(values: list) -> dict:
+    ordered = sorted(values)
+    low, high = bootstrap_ci(ordered)
+    return {
+        "n": len(ordered),
+        "median": statistics.median(ordered),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "iqr": percentile(ordered, 75) - percentile(ordered, 25),
+        "ci": [low, high],
+    }
+
+
+def case_key(level: str, agent: str, kwargs: dict) -> str:
+    return f"{os.path.basename(level)} | {member_label(AGENTS[agent], kwargs)}"
+
+
+def run_case(level: str, agent: str, kwargs: dict, warmup: int, repetitions: int, seed: int,
+             timeout: float = None, sink=None) -> dict:
+    """
+    Ejecuta un caso y devuelve sus estadísticas por métrica. Una ejecución
+    fallida suma a 'failures' y, en 'running_time', vale lo que tardó en
+    rendirse y al menos 'timeout' (censurada: 'censored' cuenta cuántas).
+    """
+    seeds = random.Random(seed)
+    samples = {metric: [] for metric in METRICS}
+    failures = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup):
+            run_level(agent, level, seed=seeds.randrange(2**32), sink=NullSink(), timeout=timeout, **kwargs)
+        for _ in range(repetitions):
+            started = time.monotonic()
+            record = run_level(agent, level, seed=seeds.randrange(2**32), sink=sink or NullSink(),
+                               timeout=timeout, **kwargs)
+            if record is None:
+                failures += 1
+                samples["running_time"].append(max(time.monotonic() - started, timeout or 0.0))
+                continue
+            for metric in METRICS:
+                samples[metric].append(float(record[metric]))
+    result = {"level": level, "agent": agent, "kwargs": kwargs, "runs": repetitions,
+              "successes": repetitions - failures, "failures": failures}
+    result["metrics"] = {metric: summarize(values) for metric, values in samples.items() if values}
+    if "running_time" in result["metrics"]:
+        result["metrics"]["running_time"]["censored"] = failures
+    return result
+
+
+def success_rate(case: dict) -> float | None:
+    """
+    Fracción de ejecuciones resueltas de un caso. Los reportes anteriores a
+    'successes' solo guardaban las muestras de las exitosas (su 'n').
+    """
+    successes = case.get("successes", case["metrics"].get("nodes_expanded", {}).get("n", 0))
+    runs = successes + case["failures"]
+    return successes / runs if runs else None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Marca cada métrica de 'current' frente a 'baseline': 'regression' o
+    'improvement' si la mediana cambia más que 'threshold' (fracción) y los
+    intervalos de confianza no se solapan; si no, 'ok'. Además marca la tasa
+    de éxito de cada caso (métrica 'success_rate'): cualquier baja es una
+    regresión, aunque las medianas de las ejecuciones que sí terminaron mejoren.
+    """
+    flags = []
+    for key, case in current["cases"].items():
+        before = baseline.get("cases", {}).get(key)
+        if before is None:
+            continue
+        rate, old_rate = success_rate(case), success_rate(before)
+        if rate is not None and old_rate is not None:
+            status = "regression" if rate < old_rate else "improvement" if rate > old_rate else "ok"
+            case["success"] = {"rate": rate, "baseline_rate": old_rate, "status": status}
+            flags.append((key, "success_rate", status))
+        for metric, stats in case["metrics"].items():
+            old = before["metrics"].get(metric)
+            if old is None:
+                continue
+            change = (stats["median"] - old["median"]) / old["median"] if old["median"] else 0.0
+            if change > threshold and stats["ci"][0] > old["ci"][1]:
+                status = "regression"
+            elif change < -threshold and stats["ci"][1] < old["ci"][0]:
+                status = "improvement"
+            else:
+                status = "ok"
+            stats["baseline_median"] = old["median"]
+            stats["change"] = change
+            stats["status"] = status
+            flags.append((key, metric, status))
+    return flags
+
+
+def print_report(report: dict) -> None:
+    for key, case in report["cases"].items():
+        print(f"\n{key}  (fallos: {case['failures']})")
+        if "success" in case:
+            s = case["success"]
+            print(f"  {'success_rate':>15}: {s['rate']:.0%} vs base {s['baseline_rate']:.0%} -> "
+                  f"{s['status'].upper() if s['status'] != 'ok' else 'ok'}")
+        for metric, s in case["metrics"].items():
+            line = (f"  {metric:>15}: mediana {s['median']:12.6g} | p90 {s['p90']:12.6g} | p99 {s['p99']:12.6g} "
+                    f"| IQR {s['iqr']:10.4g} | IC95 [{s['ci'][0]:.6g}, {s['ci'][1]:.6g}] {METRICS[metric]}")
+            if "status" in s:
+                line += f" | {s['change']:+.1%} vs base -> {s['status'].upper() if s['status'] != 'ok' else 'ok'}"
+            print(line)
+
+
+def load_cases(args) -> list:
+    """Casos (nivel, agente, kwargs) desde --config o desde --levels x --agents."""
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return [(os.path.join(args.levels_dir, c["level"]), c["agent"], c.get("kwargs", {})) for c in config["cases"]]
+    return [(os.path.join(args.levels_dir, level), agent, {}) for level in args.levels for agent in args.agents]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks con calentamiento, repeticiones e intervalos de confianza.")
+    parser.add_argument("--levels", nargs="+", default=DEFAULT_LEVELS)
+    parser.add_argument("--levels-dir", default="levels")
+    parser.add_argument("--agents", nargs="+", default=["AStarPlayer"], choices=list(AGENTS.keys()))
+    parser.add_argument("--config", default=None,
+                        help='JSON con {"cases": [{"level": ..., "agent": ..., "kwargs": {...}}]}')
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=None, help="Segundos por ejecución")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--raw", default=None, help="Guarda cada ejecución medida en este sink (.csv, .jsonl, .db)")
+    parser.add_argument("--baseline", default=None, help="Reporte anterior contra el que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Cambio relativo mínimo de la mediana")
+    parser.add_argument("--out", default=None, help="Archivo JSON donde guardar el reporte")
+    args = parser.parse_args()
+
+    sink = open_sink(args.raw) if args.raw else None
+    report = {"warmup": args.warmup, "repetitions": args.repetitions, "seed": args.seed, "cases": {}}
+    for level, agent, kwargs in load_cases(args):
+        key = case_key(level, agent, kwargs)
+        print(f"Ejecutando {key} ...")
+        report["cases"][key] = run_case(level, agent, kwargs, args.warmup, args.repetitions, args.seed,
+                                        args.timeout, sink)
+    if sink is not None:
+        sink.close()
+
+    flags = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            flags = compare(report, json.load(f), args.threshold)
+    print_report(report)
+
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nReporte guardado en: {args.out}")
+
+    regressions = [(key, metric) for key, metric, status in flags if status == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regresión(es):")
+        for key, metric in regressions:
+            print(f"  {key}: {metric}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
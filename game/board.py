@@ -1,6 +1,45 @@
+import copy
+
+from game.color import Color
+from game.cargar_txt import load
+
+# Tablas por celda compartidas entre tableros con la misma forma (tamaño y paredes). Se guardan
+# las de las últimas CELL_TABLES_LIMIT formas: el generador de niveles y un servicio de larga
+# duración crean formas nuevas sin fin
+_CELL_TABLES = {}
+CELL_TABLES_LIMIT = 64
+
+
+def parse_rows(lines:list) -> list:
+    """
+    Splits the rows of a level into one token per cell. Classic levels use one character per cell
+    (`A.Y.Y`); levels with more colors than the letter palette separate the cells with spaces
+    (`12 . 3 # 12`), so any token other than `.` and `#` is a color id.
+    
+    :param lines: The `lines` parameter is the list of rows of the level, as read from its file
+    :return: A list of rows, each one a list of cell tokens
+    """
+    lines = [line.strip() for line in lines]
+    if any(len(line.split()) > 1 for line in lines):
+        return [line.split() for line in lines]
+    return [list(line) for line in lines]
+
+
+def format_rows(grid:list) -> list:
+    """
+    Inverse of `parse_rows`: joins rows of cell tokens into level rows, one character per cell when
+    every token is a single character and space separated (and aligned) columns otherwise.
+    """
+    width = max((len(token) for row in grid for token in row), default=1)
+    if width == 1:
+        return ["".join(row) for row in grid]
+    return [" ".join(token.ljust(width) for token in row).rstrip() for row in grid]
+
 # The `Board` class represents a grid with specified rows and columns, providing methods to validate
 # cell coordinates within the grid bounds.
 class Board:
+    # Atributos fijos: sin __dict__ por instancia
+    __slots__ = ("rows", "columns", "grid", "length", "cell_points", "moves", "neighbors")
     
     def __init__(self, rows:int, columns:int) -> None:
         """
@@ -22,6 +61,9 @@ class Board:
         # the specified number of rows and columns.
         self.grid = [[' ' for _ in range(columns)] for _ in range(rows)]
         self.length = rows * columns
+        self.cell_points = ()
+        self.moves = ()
+        self.neighbors = ()
     
     
     def _validate_cell(self, x:int, y:int) -> bool:
@@ -47,4 +89,473 @@ class Board:
         # class in Python.
         if not (0 <= x < self.columns) or (not 0 <= y < self.rows):
             return False
-        return True
\ No newline at end of file
+        return True
+    
+    def cell_id(self, x:int, y:int) -> int:
+        """
+        Returns the integer id of a cell (`y * columns + x`), the value type used by the solvers
+        in place of `(x, y)` tuples.
+        """
+        return y * self.columns + x
+    
+    def cell_point(self, cell:int) -> tuple[int, int]:
+        """
+        Returns the `(x, y)` tuple of a cell id, for the UI and the reports.
+        """
+        return self.cell_points[cell]
+    
+    def _build_cell_tables(self) -> None:
+        """
+        Precomputes the per-cell tables shared by every search on this board (and by its forks):
+        
+        - `cell_points[cell]`: the `(x, y)` tuple of each cell id, allocated once.
+        - `moves[cell]`: the ids of the right, left, lower and upper cells, or -1 when that cell is
+          outside the board or invalid (e.g. a wall).
+        - `neighbors[cell]`: only the valid ids of `moves[cell]`, in the same order; empty for an
+          invalid cell.
+        
+        The tables only depend on the size and the invalid cells, so boards with the same shape
+        share one copy. The cache keeps the tables of the last `CELL_TABLES_LIMIT` shapes; a board
+        keeps using its tables after they leave the cache.
+        """
+        columns = self.columns
+        points = tuple((cell % columns, cell // columns) for cell in range(self.rows * columns))
+        valid = tuple(self._validate_cell(x, y) for x, y in points)
+        key = (columns, valid)
+        tables = _CELL_TABLES.get(key)
+        if tables is None:
+            moves = []
+            for x, y in points:
+                if not self._validate_cell(x, y):
+                    moves.append((-1, -1, -1, -1))
+                    continue
+                moves.append(tuple(ny * columns + nx if self._validate_cell(nx, ny) else -1
+                                   for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))))
+            neighbors = tuple(tuple(n for n in cell_moves if n >= 0) for cell_moves in moves)
+            if len(_CELL_TABLES) >= CELL_TABLES_LIMIT:
+                del _CELL_TABLES[next(iter(_CELL_TABLES))]
+            tables = _CELL_TABLES[key] = (points, tuple(moves), neighbors)
+        self.cell_points, self.moves, self.neighbors = tables
+
+
+# The `Connection` class represents a connection between two points on a Flow Free board with methods
+# to manage the path and check completion status.
+class Connection:
+    # A: Azul, R: Rojo, V: Verde, Y: Amarillo, M: Magenta, C: Cyan, N: Naranja.
+    # Any other color id in a level gets a generated name and ANSI color
+    NAMES = {"A":"blue", "R":"red", "V":"green", "Y":"yellow",  "M":"magenta", 
+             "C":"cyan", "N":"orange", "G":"gray", "L":"lime", "P":"purple",
+             "D":"dark blue", "O":"ocre", "B":"light blue",
+             "F":"fucsia"}
+    COLORS = {"A":Color.BLUE, "R":Color.RED, "V":Color.GREEN,
+              "Y":Color.YELLOW, "M":Color.MAGENTA, "C":Color.CYAN,
+              "N":Color.ORANGE, "G":Color.GRAY, "L":Color.LIME,
+              "P":Color.PURPLE, "D":Color.DARK_BLUE, "O":Color.OCRE,
+              "B":Color.LIGHT_BLUE, "F":Color.FUCSIA}
+    __slots__ = ("name", "key", "index", "points", "cells", "road", "is_completed", "board", "_ends", "_shared")
+    
+    def __init__(self, color:str, point_1:tuple, point_2:tuple) -> None:
+        """
+        Initializes an object with a specified color, two points, a road list, and a
+        completion status flag.
+        
+        :param color: The `color` parameter in the `__init__` method is the color id used in the level
+        file: one of the `NAMES` letters or any other token (e.g. `15`) for levels with more colors
+        :type color: str
+        :param point_1: The `point_1` parameter in the `__init__` method is a tuple that represents a point
+        on a grid. The tuple should contain two values: the column and row of the point. For example, `(2,
+        3)` could represent a point at column 2 and row 3
+        :type point_1: tuple
+        :param point_2: The `point_2` parameter in the `__init__` method is a tuple that represents a point
+        in a coordinate system. It is used to define the second point of a line segment or connection in the
+        context of the code snippet you provided. The tuple likely contains two values, such as
+        :type point_2: tuple
+        """
+        if not color or color in ('.', '#'):
+            raise ValueError(f"Color '{color}' no es válido")
+        self.name = self.NAMES.get(color, f"color {color}")
+        self.key = color # Id del color en el archivo del nivel
+        self.index = None # Posición en board.connections; la asigna el tablero
+        self.points = (point_1, point_2) # Tuplas (column, row)
+        self.cells = None # Ids de celda de los extremos; los asigna el tablero
+        self.road = [] # Lista de tuplas (column, row) que representan el camino de la conexión
+        self.is_completed = False
+        # Board whose filled-cell and completed-color counters follow this road (set by the board).
+        # The road must therefore only be changed through the methods below
+        self.board = None
+        self._ends = 0 # Extremos propios presentes en el camino (0, 1 o 2)
+        # True while `road` is also referenced by a snapshot or a fork: it is copied before the
+        # next in-place change (copy-on-write)
+        self._shared = False
+    
+    @property
+    def color(self) -> str:
+        """
+        ANSI color code of the connection, only needed when drawing: the palette color of its letter,
+        or a generated one for any other color id.
+        """
+        return self.COLORS.get(self.key) or Color.generated(self.index or 0)
+    
+    def _own_road(self) -> None:
+        """
+        Copies the road before an in-place change if a snapshot or a fork still references it.
+        """
+        if self._shared:
+            self.road = list(self.road)
+            self._shared = False
+    
+    def _count_filled(self, old_length:int) -> None:
+        """
+        Updates the filled-cell counter of the board after the road changed from `old_length`
+        points to its current length (a road of n points fills n - 1 cells).
+        """
+        if self.board is not None:
+            length = len(self.road)
+            self.board.filled += (length - 1 if length else 0) - (old_length - 1 if old_length else 0)
+    
+    def _set_completed(self, value:bool) -> None:
+        """
+        Sets `is_completed` and keeps the completed-color counter of the board in sync.
+        """
+        if value != self.is_completed:
+            self.is_completed = value
+            if self.board is not None:
+                self.board.completed += 1 if value else -1
+        
+    def add_to_road(self, point:tuple) -> None:
+        """
+        Adds a point to a road list and checks for completion.
+        
+        :param point: The `add_to_road` method takes a tuple `point` as a parameter. This method adds the
+        `point` to the `road` list if it is not already present in the list. After adding the `point`, it
+        calls the `check_completion` method
+        :type point: tuple
+        """
+
+        if point not in self.road:
+            self._own_road()
+            self.road.append(point)
+            if point in self.points:
+                self._ends += 1
+            self._count_filled(len(self.road) - 1)
+            self.check_completion()
+    
+    def set_road(self, points) -> None:
+        """
+        Replaces the whole path at once, in O(len(points)) instead of one `add_to_road` call per point.
+        
+        :param points: The `points` parameter is an iterable of `(column, row)` tuples forming a
+        simple path (no repeated cells)
+        """
+        old_length = len(self.road)
+        self.road = list(points)
+        self._shared = False
+        self._ends = (self.points[0] in self.road) + (self.points[1] in self.road)
+        self._count_filled(old_length)
+        self.check_completion()
+    
+    def fork(self) -> 'Connection':
+        """
+        Returns a copy of the connection that shares the road list with this one until either of them
+        changes it (copy-on-write), so forking costs O(1). The copy is detached from the board
+        (`board` is None) until a board adopts it.
+        """
+        twin = copy.copy(self)
+        twin.board = None
+        self._shared = twin._shared = True
+        return twin
+            
+    def check_completion(self) -> None:
+        """
+        Check if the connection is complete (if the path connects both colors points). It is O(1):
+        the road methods keep count of the endpoints on the path.
+        """
+        self._set_completed(self._ends == 2)
+    
+    def pop_road(self) -> None:
+        """
+        Delete the last point of the path
+        """
+        if self.road:
+            self._own_road()
+            if self.road.pop() in self.points:
+                self._ends -= 1
+            self._count_filled(len(self.road) + 1)
+        self._set_completed(False)
+            
+    def break_road(self, point:tuple) -> None:
+        """
+        Breaks the path of the connection, removing all points from the path after that point.
+        """
+        if point in self.road:
+            old_length = len(self.road)
+            index = self.road.index(point)
+            self.road = self.road[:index]
+            self._shared = False
+            self._ends = (self.points[0] in self.road) + (self.points[1] in self.road)
+            self._count_filled(old_length)
+        self._set_completed(False)
+        
+    def clean_road(self) -> None:
+        """
+        Cleans the entire connection path.
+        """
+        old_length = len(self.road)
+        self.road = []
+        self._shared = False
+        self._ends = 0
+        self._count_filled(old_length)
+        self._set_completed(False)
+
+# The `FlowFreeBoard` class represents a board for the Flow Free game, allowing players to make
+# connections between points of the same color.
+class FlowFreeBoard(Board):
+    __slots__ = ("connections", "path", "board", "flow_free_moves", "filled", "completed")
+    
+    def __init__(self, path:str, lines:list = None) -> None:
+        """
+        Initializes an object with attributes related to a game board and
+        connections.
+        
+        :param path: The `path` parameter is expected to be a string that represents the path
+        to a file. This file is then loaded using the `load` function with the
+        `as_list` parameter set to `True`.
+        :type path: str
+        :param lines: The `lines` parameter, when given, holds the rows of the level in the same
+        format as the file. The file is then not read and `path` is only used as the level name
+        :type lines: list (optional)
+        """
+        self.connections = []
+        self.path = path
+        self.board = load(path, as_list=True) if lines is None else [line.strip() for line in lines]
+        cells = parse_rows(self.board)
+        rows = len(cells)
+        columns = len(cells[0]) if rows > 0 else 0
+        super().__init__(rows, columns)
+        self._complete_board(cells)
+        self._build_cell_tables()
+        # Contadores incrementales que actualizan los métodos de camino de cada conexión
+        self.filled = 0
+        self.completed = 0
+        for index, conn in enumerate(self.connections):
+            if conn.points[1] is None:
+                raise ValueError(f"El color '{conn.key}' tiene un solo extremo en {conn.points[0]}")
+            conn.index = index
+            conn.cells = tuple(self.cell_id(x, y) for x, y in conn.points)
+            conn.board = self
+        # The code calculates the grid length by counting the number of elements that are not equal to "#"
+        # and subtracting the length of the netlist. This is used to calculate the missing percentage.
+        self.length = sum(1 for r in range(rows) for c in range(columns) if self.grid[r][c] != "#") - len(self.connections)
+        self.flow_free_moves = 0        
+              
+    @classmethod
+    def from_lines(cls, lines:list, name:str = "<lines>") -> 'FlowFreeBoard':
+        """
+        Builds a board from the rows of a level (e.g. received over a socket) instead of a file.
+        
+        :param lines: The `lines` parameter is a list of strings, one per row, in the level file
+        format (see `parse_rows`)
+        :param name: The `name` parameter is stored as the board `path` and shows up in the reports
+        """
+        return cls(name, lines=lines)
+              
+    def _complete_board(self, cells:list) -> None:
+        """
+        Fills the grid from the level tokens (see `parse_rows`), creating one connection per color id
+        with the two cells where it appears.
+        
+        :param cells: The `cells` parameter is the level as a list of rows of cell tokens
+        """
+        by_key = {}
+        for r in range(self.rows):
+            for c in range(self.columns):
+                cell = cells[r][c]
+                if cell != '.' and cell != '#':
+                    conn = by_key.get(cell)
+                    if conn is None:
+                        # Crear una nueva conexión con el primer punto
+                        conn = by_key[cell] = Connection(cell, (c,r), None) # El segundo punto se asignará al encontrar el otro punto en el archivo
+                        self.connections.append(conn)
+                    elif conn.points[1] is None:
+                        conn.points = (conn.points[0], (c,r))
+                    else:
+                        raise ValueError(f"El color '{cell}' aparece más de dos veces; sobra el de la posición ({c},{r})")
+                    cell = conn
+                self.grid[r][c] = cell
+    
+    def _validate_cell(self, x, y) -> bool:
+        if not super()._validate_cell(x, y):
+            return False
+        if self.grid[y][x] == "#":
+            return False # Pared
+        return True
+    
+    def snapshot(self) -> tuple:
+        """
+        Captures the state of every path (and the board counters) in O(colors) without copying any
+        cell: the road lists are shared with the snapshot and copied only when a connection changes
+        its road in place (copy-on-write).
+        
+        :return: An opaque value for `restore`. It stays valid after any later change to the board
+        and can be restored any number of times
+        """
+        for conn in self.connections:
+            conn._shared = True
+        return (((self.flow_free_moves, self.filled, self.completed),)
+                + tuple((conn.road, conn.is_completed, conn._ends) for conn in self.connections))
+    
+    def restore(self, snapshot:tuple) -> None:
+        """
+        Rolls the board back to a `snapshot` of this board (or of a fork of it), in O(colors) and
+        without copying any cell.
+        
+        :param snapshot: The `snapshot` parameter is a value returned by `snapshot`
+        :type snapshot: tuple
+        """
+        self.flow_free_moves, self.filled, self.completed = snapshot[0]
+        for conn, (road, is_completed, ends) in zip(self.connections, snapshot[1:]):
+            conn.road = road
+            conn.is_completed = is_completed
+            conn._ends = ends
+            conn._shared = True
+    
+    def fork(self) -> 'FlowFreeBoard':
+        """
+        Returns an independent board in the same state without reading the level file again. The
+        level data is shared, every connection is forked (its road is copied on write) and only the
+        grid rows are copied so the endpoint cells point to the new connections.
+        """
+        twin = copy.copy(self)
+        twin.connections = [conn.fork() for conn in self.connections]
+        twin.grid = [row[:] for row in self.grid]
+        for conn in twin.connections:
+            conn.board = twin
+            for x, y in conn.points:
+                twin.grid[y][x] = conn
+        return twin
+    
+    def _get_selectable_cells(self) -> list[tuple[int, int]]:
+        points_cell = [point for conn in self.connections for point in conn.points]
+        x_cells = [conn.road[-1] for conn in self.connections if conn.road]
+        cells = points_cell + x_cells
+        cells = list(set(cells)) # Eliminar duplicados
+        cells.sort(key=lambda t: (t[1], t[0]), reverse=False)
+        return cells 
+    
+    def percentage_filled(self) -> float:
+        """
+        Devuelve el porcentaje del tablero que ha sido llenado (para mostrarlo; para
+        saber si está lleno, `is_full`).
+        """
+        return (self.filled * 100 // self.length)
+    
+    def is_full(self) -> bool:
+        """
+        True when the paths cover every free cell, read in O(1) from the filled-cell counter.
+        """
+        return self.filled == self.length
+    
+    def all_completed(self) -> bool:
+        """
+        True when every connection joins its two points, read in O(1) from the completed-color
+        counter.
+        """
+        return self.completed == len(self.connections)
+    
+    def _road_owners(self) -> dict:
+        """
+        Maps every cell that belongs to a path to the connection that owns it, so drawing and
+        state extraction look each cell up once instead of scanning every road.
+        """
+        return {point: conn for conn in self.connections for point in conn.road}
+
+    def cell_text(self, x:int, y:int, owners:dict, highlight_cell:tuple[int, int] = None) -> str:
+        """
+        Returns the text of a single cell as drawn on the console (four visible characters plus
+        its ANSI color codes).
+        
+        :param x: Column index of the cell
+        :param y: Row index of the cell
+        :param owners: The cell to connection map returned by `_road_owners`
+        :param highlight_cell: Cell highlighted by the cursor, if any
+        """
+        cell = self.grid[y][x]
+        
+        # Highlight current cell
+        if (x, y) == highlight_cell and isinstance(cell, Connection):
+            return f"|[{Color.BOLD}{cell.color}0{Color.RESET}]"
+        
+        if isinstance(cell, Connection):
+            if cell.is_completed:
+                return f"| {Color.BOLD}{cell.color}O{Color.RESET} "
+            return f"| {cell.color}O{Color.RESET} "
+        
+        conn = owners.get((x, y))
+        if conn:
+            # Celda llena que es parte de una conexión
+            if (x, y) == highlight_cell:
+                return f"|[{Color.BOLD}{conn.color}X{Color.RESET}]"
+            if conn.is_completed:
+                return f"| {Color.BOLD}{conn.color}x{Color.RESET} "
+            return f"| {conn.color}x{Color.RESET} "
+        
+        if cell == "#":
+            return "| # "
+        return "|   "
+    
+    def show(self, highlight_cell:tuple[int, int] = None) -> None:
+        """
+        Displays a game board in the console with the ability to highlight a
+        specific cell.
+        
+        :param highlight_cell: Specify the cell that should be highlighted when displaying the game
+        board in the console. This cell is represented by a tuple of integers `(x, y)` where `x`
+        is the column index and `y` is the row index
+        """
+        Color.clear_screen()
+        percentage = self.percentage_filled()
+        owners = self._road_owners()
+        separator = f"{'-'* (self.columns* 4)}-"
+        
+        lines = [f" Moves: {self.flow_free_moves} | Pipe: {percentage}%", separator]
+        for y in range(self.rows):
+            lines.append("".join(self.cell_text(x, y, owners, highlight_cell) for x in range(self.columns)) + "|")
+            lines.append(separator)
+        print("\n".join(lines))
+
+        if percentage == 100: print(f"{Color.GREEN}¡Felicidades! Has completado el nivel.{Color.RESET}") 
+    
+    def get_state(self):
+        """
+        The function `get_state` creates a board representation based on the grid and connections
+        provided.
+        :return: The `get_state` method returns a representation of the current state of the game board.
+        It creates a new board structure based on the existing grid and connections in the game. The
+        returned board contains information about the connections and their names, as well as the grid
+        elements.
+        
+        Color names in uppercase are the color endpoints (circles).
+        Lowercase names are parts of a color's path.
+        
+        ej
+        ['BLUE', 'blue', '.', '.', 'YELLOW']
+        ['GREEN', 'blue', 'YELLOW', 'GREEN', '.']
+        ['.', 'blue', '.', 'BLUE', '.']
+        ['.', '.', '.', '.', '.']
+        ['RED', '.', '.', '.', 'RED']]
+        """
+        board = [[] for _ in range(self.rows)]
+        owners = self._road_owners()
+        
+        for y in range(self.rows):
+            for x in range(self.columns):
+
+                if isinstance(self.grid[y][x], Connection):
+                    board[y].append(self.grid[y][x].name.upper())
+                elif (x, y) in owners:
+                    # Celda llena que es parte de una conexión
+                    board[y].append(owners[(x, y)].name)
+                else:
+                    board[y].append(self.grid[y][x])
+        return board
+            
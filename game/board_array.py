@@ -0,0 +1,181 @@
+import numpy as np
+
+from game.board import FlowFreeBoard
+
+WALL = -1
+EMPTY = 0
+
+
+def _shift(array:np.ndarray, dy:int, dx:int, fill) -> np.ndarray:
+    """
+    Shifts the last two axes of `array` by (dy, dx), filling the cells that come from outside the
+    grid with `fill`. `result[..., y, x] == array[..., y - dy, x - dx]`.
+    """
+    result = np.full_like(array, fill)
+    rows, columns = array.shape[-2:]
+    result[..., max(dy, 0):rows + min(dy, 0), max(dx, 0):columns + min(dx, 0)] = \
+        array[..., max(-dy, 0):rows + min(-dy, 0), max(-dx, 0):columns + min(-dx, 0)]
+    return result
+
+
+_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def color_dtype(colors:int) -> np.dtype:
+    """
+    Smallest integer type for a grid of `colors` connections: int8 while every color index fits
+    (up to 127 colors), int16 for the larger generated levels.
+    """
+    return np.dtype(np.int8) if colors <= np.iinfo(np.int8).max else np.dtype(np.int16)
+
+
+# The `BoardArray` class is a NumPy view of one or many Flow Free boards: an int8 color grid where
+# -1 is a wall, 0 an empty cell and k > 0 a cell (endpoint or path) of the k-th connection, plus a
+# boolean mask of the endpoints. Every operation works on the last two axes, so a stack of N boards
+# of shape (N, rows, columns) is evaluated in one call. Boards with more than 127 colors use int16
+# (see `color_dtype`).
+class BoardArray:
+
+    def __init__(self, colors:np.ndarray, endpoints:np.ndarray) -> None:
+        """
+        Initializes the view from its arrays.
+
+        :param colors: The `colors` parameter is an int8 (or int16, see `color_dtype`) array of shape
+        (..., rows, columns) with the color index of each cell (-1 wall, 0 empty, k > 0 connection k - 1)
+        :type colors: np.ndarray
+        :param endpoints: The `endpoints` parameter is a boolean array of the same shape marking the
+        endpoint cells
+        :type endpoints: np.ndarray
+        """
+        self.colors = colors
+        self.endpoints = endpoints
+
+    @classmethod
+    def from_board(cls, board:FlowFreeBoard) -> 'BoardArray':
+        """
+        Builds the view of the current state of a `FlowFreeBoard`, in O(cells).
+        """
+        colors = np.zeros((board.rows, board.columns), dtype=color_dtype(len(board.connections)))
+        endpoints = np.zeros((board.rows, board.columns), dtype=bool)
+        for y in range(board.rows):
+            for x in range(board.columns):
+                if board.grid[y][x] == "#":
+                    colors[y, x] = WALL
+        for index, conn in enumerate(board.connections, start=1):
+            for x, y in conn.road:
+                colors[y, x] = index
+            for x, y in conn.points:
+                colors[y, x] = index
+                endpoints[y, x] = True
+        return cls(colors, endpoints)
+
+    @classmethod
+    def stack(cls, boards:list) -> 'BoardArray':
+        """
+        Stacks N boards (`FlowFreeBoard` or `BoardArray`) into one array of shape
+        (N, max_rows, max_columns). Smaller boards are padded with walls, so padding never counts as
+        free space. The stack uses the widest color type of its boards.
+        """
+        views = [b if isinstance(b, BoardArray) else cls.from_board(b) for b in boards]
+        rows = max(v.colors.shape[-2] for v in views)
+        columns = max(v.colors.shape[-1] for v in views)
+        dtype = np.result_type(*(v.colors.dtype for v in views))
+        colors = np.full((len(views), rows, columns), WALL, dtype=dtype)
+        endpoints = np.zeros((len(views), rows, columns), dtype=bool)
+        for i, v in enumerate(views):
+            r, c = v.colors.shape[-2:]
+            colors[i, :r, :c] = v.colors
+            endpoints[i, :r, :c] = v.endpoints
+        return cls(colors, endpoints)
+
+    def __len__(self) -> int:
+        return self.colors.shape[0] if self.colors.ndim == 3 else 1
+
+    @property
+    def free_mask(self) -> np.ndarray:
+        return self.colors == EMPTY
+
+    @property
+    def wall_mask(self) -> np.ndarray:
+        return self.colors == WALL
+
+    @property
+    def filled_mask(self) -> np.ndarray:
+        return self.colors > 0
+
+    def free_cells(self) -> np.ndarray:
+        """
+        Number of empty cells of each board.
+        """
+        return self.free_mask.sum(axis=(-2, -1))
+
+    def neighbor_counts(self, mask:np.ndarray = None) -> np.ndarray:
+        """
+        Counts, for every cell, how many of its 4 neighbors are in `mask` (the empty cells by
+        default). Cells outside the grid never count.
+        """
+        mask = self.free_mask if mask is None else mask
+        counts = np.zeros(mask.shape, dtype=np.int8)
+        for dy, dx in _DIRECTIONS:
+            counts += _shift(mask, dy, dx, False)
+        return counts
+
+    def enclosure_counts(self) -> np.ndarray:
+        """
+        Counts, for every cell, its blocked neighbors: walls, board edges and filled cells (paths and
+        endpoints). It is the array counterpart of the A* `penalty_enclosure` term before
+        normalization, which only counts walls, edges and other paths.
+        """
+        return 4 - self.neighbor_counts(~self.wall_mask & ~self.filled_mask)
+
+    def distance_map(self, sources:np.ndarray, passable:np.ndarray = None) -> np.ndarray:
+        """
+        Breadth-first distance (4-neighborhood) from the `sources` cells through `passable` cells
+        (empty cells by default), computed as a vectorized wavefront. Unreachable cells get -1.
+
+        :param sources: Boolean mask of the starting cells; they are always reachable at distance 0
+        :param passable: Boolean mask of the cells the wave may cross
+        """
+        passable = self.free_mask if passable is None else passable
+        distance = np.full(sources.shape, -1, dtype=np.int32)
+        reached = sources.copy()
+        frontier = sources.copy()
+        step = 0
+        while frontier.any():
+            distance[frontier] = step
+            grown = np.zeros_like(frontier)
+            for dy, dx in _DIRECTIONS:
+                grown |= _shift(frontier, dy, dx, False)
+            frontier = grown & passable & ~reached
+            reached |= frontier
+            step += 1
+        return distance
+
+    def connected_components(self, mask:np.ndarray = None) -> np.ndarray:
+        """
+        Labels the 4-connected components of `mask` (empty cells by default). Each component is
+        labeled with 1 + the flat index of its first cell in the whole stack, so labels are unique
+        across boards; cells outside the mask get 0.
+        """
+        mask = self.free_mask if mask is None else mask
+        background = np.iinfo(np.int64).max
+        labels = np.where(mask, np.arange(1, mask.size + 1, dtype=np.int64).reshape(mask.shape), background)
+        while True:
+            smallest = labels
+            for dy, dx in _DIRECTIONS:
+                smallest = np.minimum(smallest, _shift(labels, dy, dx, background))
+            smallest = np.where(mask, smallest, background)
+            if np.array_equal(smallest, labels):
+                break
+            labels = smallest
+        return np.where(mask, labels, 0)
+
+    def component_counts(self, mask:np.ndarray = None) -> np.ndarray:
+        """
+        Number of connected components of `mask` (empty regions by default) of each board.
+        """
+        mask = self.free_mask if mask is None else mask
+        labels = self.connected_components(mask)
+        own_label = np.arange(1, mask.size + 1, dtype=np.int64).reshape(mask.shape)
+        roots = mask & (labels == own_label)
+        return roots.sum(axis=(-2, -1))
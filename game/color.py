@@ -1,4 +1,6 @@
+import colorsys
 import os
+import sys
 # The class `Color` defines various ANSI escape codes for text, background colors and clean terminal in Python.
 class Color:
     RESET = '\033[0m'
@@ -20,7 +22,54 @@ class Color:
     FUCSIA = '\033[38;5;199m'
     BACKGROUND_RED = '\033[41m'
     BACKGROUND_GRAY = '\033[100m'
-    CLEAR_SCREEN = os.system('cls')
+    CLEAR_SCREEN = '\033[2J\033[H'
+    HIDE_CURSOR = '\033[?25l'
+    SHOW_CURSOR = '\033[?25h'
+    _ansi_enabled = False
+    _generated = {}
+    
+    @classmethod
+    def generated(cls, index:int) -> str:
+        """
+        Returns a 256-color ANSI code for the `index`-th color of a level whose color id has no
+        palette color. Hues are spread with the golden ratio (alternating two brightness levels), so
+        consecutive indices look clearly different however many colors the level has.
+        """
+        code = cls._generated.get(index)
+        if code is None:
+            hue = (index * 0.618033988749895) % 1
+            value = 1.0 if index % 2 == 0 else 0.7
+            red, green, blue = (round(channel * 5) for channel in colorsys.hsv_to_rgb(hue, 0.8, value))
+            code = cls._generated[index] = f'\033[38;5;{16 + 36 * red + 6 * green + blue}m'
+        return code
+    
+    @staticmethod
+    def move_cursor(row:int, column:int) -> str:
+        """
+        Returns the ANSI sequence that moves the cursor to a 1-based `row` and `column`.
+        """
+        return f'\033[{row};{column}H'
+    
+    @classmethod
+    def enable_ansi(cls) -> None:
+        """
+        Windows consoles only interpret ANSI sequences once virtual terminal processing is on,
+        which any call to `os.system` switches on. It is done once, the first time the screen is
+        drawn, instead of at import time.
+        """
+        if not cls._ansi_enabled:
+            if os.name == 'nt':
+                os.system('')
+            cls._ansi_enabled = True
+    
+    @classmethod
+    def clear_screen(cls) -> None:
+        """
+        Clears the terminal with an ANSI sequence instead of spawning a `cls` shell.
+        """
+        cls.enable_ansi()
+        sys.stdout.write(cls.CLEAR_SCREEN)
+        sys.stdout.flush()
 
 
 
@@ -1,262 +1,18 @@
-from game.menu import Menu
-from game.color import Color
-from game.board import Board
-from game.cargar_txt import load
-from game.control import Control
-import os, time
-from game.player import HumanPlayer
+import os
+from game.board import Board, Connection, FlowFreeBoard
+from game.render import NullRenderer, AnsiRenderer
 
+# The interactive UI (`Menu`, `Control`, `HumanPlayer`) depends on the `keyboard` hook library, so it is
+# imported inside the methods that use it. Importing this module, or the core in `game.board`, has
+# no interactive dependencies and no side effects.
 
-# The `Connection` class represents a connection between two points on a Flow Free board with methods
-# to manage the path and check completion status.
-class Connection:
-    # A: Azul, R: Rojo, V: Verde, Y: Amarillo, M: Magenta, C: Cyan, N: Naranja
-    NAMES = {"A":"blue", "R":"red", "V":"green", "Y":"yellow",  "M":"magenta", 
-             "C":"cyan", "N":"orange", "G":"gray", "L":"lime", "P":"purple",
-             "D":"dark blue", "O":"ocre", "B":"light blue",
-             "F":"fucsia"}
-    COLORS = {"A":Color.BLUE, "R":Color.RED, "V":Color.GREEN,
-              "Y":Color.YELLOW, "M":Color.MAGENTA, "C":Color.CYAN,
-              "N":Color.ORANGE, "G":Color.GRAY, "L":Color.LIME,
-              "P":Color.PURPLE, "D":Color.DARK_BLUE, "O":Color.OCRE,
-              "B":Color.LIGHT_BLUE, "F":Color.FUCSIA}
-    
-    def __init__(self, color:str, point_1:tuple, point_2:tuple) -> None:
-        """
-        Initializes an object with a specified color, two points, a road list, and a
-        completion status flag.
-        
-        :param color: The `color` parameter in the `__init__` method is a string that represents the color
-        of an object. It is used to initialize the object with a specific color
-        :type color: str
-        :param point_1: The `point_1` parameter in the `__init__` method is a tuple that represents a point
-        on a grid. The tuple should contain two values: the column and row of the point. For example, `(2,
-        3)` could represent a point at column 2 and row 3
-        :type point_1: tuple
-        :param point_2: The `point_2` parameter in the `__init__` method is a tuple that represents a point
-        in a coordinate system. It is used to define the second point of a line segment or connection in the
-        context of the code snippet you provided. The tuple likely contains two values, such as
-        :type point_2: tuple
-        """
-        self.name = self.NAMES.get(color, None)
-        if not self.name:
-            raise ValueError(f"Color '{color}' no es válido. Colores válidos: {list(self.NAMES.keys())}")
-        self.color = self.COLORS.get(color)
-        self.points = (point_1, point_2) # Tuplas (column, row)
-        self.road = [] # Lista de tuplas (column, row) que representan el camino de la conexión
-        self.is_completed = False
-        
-    def add_to_road(self, point:tuple) -> None:
-        """
-        Adds a point to a road list and checks for completion.
-        
-        :param point: The `add_to_road` method takes a tuple `point` as a parameter. This method adds the
-        `point` to the `road` list if it is not already present in the list. After adding the `point`, it
-        calls the `check_completion` method
-        :type point: tuple
-        """
-
-        if point not in self.road:
-            self.road.append(point)
-            self.check_completion()
-            
-    def check_completion(self) -> None:
-        """
-        Check if the connection is complete (if the path connects both colors points).
-        """
-        if self.points[0] in self.road and self.points[1] in self.road:
-            self.is_completed = True
-        else:
-            self.is_completed = False
-    
-    def pop_road(self) -> None:
-        """
-        Delete the last point of the path
-        """
-        if self.road:
-            self.road.pop()
-        self.is_completed = False
-            
-    def break_road(self, point:tuple) -> None:
-        """
-        Breaks the path of the connection, removing all points from the path after that point.
-        """
-        if point in self.road:
-            index = self.road.index(point)
-            self.road = self.road[:index]
-        self.is_completed = False
-        
-    def clean_road(self) -> None:
-        """
-        Cleans the entire connection path.
-        """
-        self.road = []
-        self.is_completed = False
-
-# The `FlowFreeBoard` class represents a board for the Flow Free game, allowing players to make
-# connections between points of the same color.
-class FlowFreeBoard(Board):
-    
-    def __init__(self, path:str) -> None:
-        """
-        Initializes an object with attributes related to a game board and
-        connections.
-        
-        :param path: The `path` parameter is expected to be a string that represents the path
-        to a file. This file is then loaded using the `load` function with the
-        `as_list` parameter set to `True`.
-        :type path: str
-        """
-        self.connections = []
-        self.board = load(path, as_list=True)
-        rows = len(self.board)
-        columns = len(self.board[0]) if rows > 0 else 0
-        super().__init__(rows, columns)
-        self._complete_board()         
-        # The code calculates the grid length by counting the number of elements that are not equal to "#"
-        # and subtracting the length of the netlist. This is used to calculate the missing percentage.
-        self.length = sum(1 for r in range(rows) for c in range(columns) if self.grid[r][c] is not "#") - len(self.connections)
-        self.flow_free_moves = 0        
-              
-    def _complete_board(self) -> None:
-        """
-        Marca una conexión como completa y actualiza el tablero.
-        """
-        for r in range(self.rows):
-            for c in range(self.columns):
-                cell = self.board[r][c]
-                if cell != '.' and cell != '#':
-                    if cell not in Connection.NAMES.keys():
-                        raise ValueError(f"Carácter '{cell}' en la posición ({c},{r}) no es válido. Carácteres válidos: {list(Connection.NAMES.keys())} + '.' + '#'")
-                    
-                    if Connection.NAMES[cell] in [conn.name for conn in self.connections]:
-                        # Si ya existe una conexión con ese color, asignar el segundo punto
-                        for conn in self.connections:
-                            if conn.name == Connection.NAMES[cell] and conn.points[1] is None:
-                                conn.points = (conn.points[0], (c,r))
-                                cell = conn
-                                break
-                    else:
-                        # Crear una nueva conexión con el primer punto
-                        cell = Connection(cell, (c,r), None) # El segundo punto se asignará al encontrar el otro punto en el archivo
-                        self.connections.append(cell)
-                self.grid[r][c] = cell
-    
-    def _validate_cell(self, x, y) -> bool:
-        if not super()._validate_cell(x, y):
-            return False
-        if self.grid[y][x] == "#":
-            return False # Pared
-        return True
-    
-    def _get_selectable_cells(self) -> list[tuple[int, int]]:
-        points_cell = [point for conn in self.connections for point in conn.points]
-        x_cells = [conn.road[-1] for conn in self.connections if conn.road]
-        cells = points_cell + x_cells
-        cells = list(set(cells)) # Eliminar duplicados
-        cells.sort(key=lambda t: (t[1], t[0]), reverse=False)
-        return cells 
-    
-    def percentage_filled(self) -> float:
-        """
-        Devuelve el porcentaje del tablero que ha sido llenado.
-        """
-        cells_filled = sum(len(conn.road)-1 for conn in self.connections if conn.road)
-        return (cells_filled * 100 // self.length)
-    
-    def show(self, highlight_cell:tuple[int, int] = None) -> None:
-        """
-        Displays a game board in the console with the ability to highlight a
-        specific cell.
-        
-        :param highlight_cell: Specify the cell that should be highlighted when displaying the game
-        board in the console. This cell is represented by a tuple of integers `(x, y)` where `x`
-        is the column index and `y` is the row index
-        """
-        """
-        Muestra el tablero en la consola.
-        """
-        os.system('cls')
-        percentage = self.percentage_filled()
-        
-        print(f" Moves: {self.flow_free_moves}", end=' | ')
-        print(f"Pipe: {percentage}%")
-        print(f"{'-'* (self.columns* 4)}-")
-        for y in range(self.rows):
-            for x in range(self.columns):
-                
-                # Highlight current cell
-                if (x, y) == highlight_cell and isinstance(self.grid[y][x], Connection):
-                    print(f"|[{Color.BOLD}{self.grid[y][x].color}0{Color.RESET}]", end='')
-                
-                elif isinstance(self.grid[y][x], Connection):
-                    if self.grid[y][x].is_completed:
-                            print(f"| {Color.BOLD}{self.grid[y][x].color}O{Color.RESET} ", end='')
-                    else:
-                        print(f"| {self.grid[y][x].color}O{Color.RESET} ", end='')
-                    
-                elif (x, y) in [point for conn in self.connections for point in conn.road]:
-                    for conn in self.connections:
-                        if (x, y) in conn.road:
-                            # Celda llena que es parte de una conexión
-                            if (x, y) == highlight_cell:
-                                print(f"|[{Color.BOLD}{conn.color}X{Color.RESET}]", end='')
-                            elif conn.is_completed:
-                                print(f"| {Color.BOLD}{conn.color}x{Color.RESET} ", end='')    
-                            else:
-                                print(f"| {conn.color}x{Color.RESET} ", end='')
-                            break
-                
-                elif self.grid[y][x] == "#":
-                    print("| # ", end='')
-                
-                else:
-                    print("|   ", end='')
-            
-            print("|")
-            print(f"{'-'* (self.columns* 4)}-")        
-
-        if percentage == 100: print(f"{Color.GREEN}¡Felicidades! Has completado el nivel.{Color.RESET}") 
-    
-    def get_state(self):
-        """
-        The function `get_state` creates a board representation based on the grid and connections
-        provided.
-        :return: The `get_state` method returns a representation of the current state of the game board.
-        It creates a new board structure based on the existing grid and connections in the game. The
-        returned board contains information about the connections and their names, as well as the grid
-        elements.
-        
-        Color names in uppercase are the color endpoints (circles).
-        Lowercase names are parts of a color's path.
-        
-        ej
-        ['BLUE', 'blue', '.', '.', 'YELLOW']
-        ['GREEN', 'blue', 'YELLOW', 'GREEN', '.']
-        ['.', 'blue', '.', 'BLUE', '.']
-        ['.', '.', '.', '.', '.']
-        ['RED', '.', '.', '.', 'RED']]
-        """
-        board = [[] for _ in range(self.rows)]
-        
-        for y in range(self.rows):
-            for x in range(self.columns):
 
-                if isinstance(self.grid[y][x], Connection):
-                    board[y].append(self.grid[y][x].name.upper())
-                elif (x, y) in [point for conn in self.connections for point in conn.road]:
-                    for conn in self.connections:
-                        if (x, y) in conn.road:
-                            # Celda llena que es parte de una conexión
-                                board[y].append(conn.name)
-                else:
-                    board[y].append(self.grid[y][x])
-        return board
-            
 class FlowFree:
        
-    def __init__(self, board:Board=None) -> None:
+    def __init__(self, board:Board=None, renderer:NullRenderer=None) -> None:
         self.board = board
+        # Renderer used while a search agent plays; the human player draws the board itself
+        self.renderer = renderer if renderer is not None else AnsiRenderer(fps=10)
         self.last_color_position = None
         self.last_move = None
         self.load_list_levels()
@@ -318,6 +74,9 @@ class FlowFree:
         :param player: Represent the player who is currently playing the game. Human or algorithm
         :return: The `app` method is returning `None`.
         """
+        from game.control import Control
+        from game.menu import Menu
+        from game.player import HumanPlayer
         player = None
         while not self.board:
             options = ["Jugar", "Seleccionar Jugador", "Salir"]
@@ -354,14 +113,17 @@ class FlowFree:
         """
         Presents a menu to select a player type (Human or Algorithm) and returns the selected player instance.
         
-        :return: The `select_player` method is returning an instance of `HumanPlayer`, `DFSPlayer`, `BFSPlayer`, or
-        `AStarPlayer` classes, based on the user's selection from the menu. If the user selects "Volver", the method returns
+        :return: The `select_player` method is returning an instance of `HumanPlayer`, `DFSPlayer`, `BFSPlayer`,
+        `AStarPlayer` or `PortfolioPlayer` classes, based on the user's selection from the menu. If the user selects "Volver", the method returns
         `None`.
         """
+        from game.menu import Menu
+        from game.player import HumanPlayer
         from algorithms.astar import AStarPlayer as AStar
         from algorithms.bfs import BFSPlayer as BFS
         from algorithms.dfs import DFSPlayer as DFS
-        options = ["Humano", "DFS", "BFS", "A*", "Volver"]
+        from algorithms.portfolio import PortfolioPlayer as Portfolio
+        options = ["Humano", "DFS", "BFS", "A*", "Portfolio", "Volver"]
         menu = Menu(options, "Flow Free - Seleccionar jugador")
         choice = menu.select()
         
@@ -373,27 +135,26 @@ class FlowFree:
             return BFS()
         elif options[choice] == "A*":
             return AStar()
+        elif options[choice] == "Portfolio":
+            return Portfolio()
         else:
             return None
     
     
-    def create_level_name(self, player) -> None:
+    def create_level_name(self, player, level: str = None) -> str:
         """
         Creates a level name based on the board's dimensions and number of colors.
+        :param level: The `level` parameter is the level file name to use; defaults to `self.level`
         :return: The `create_level_name` method is returning a string that represents the level name.
         The level name is created by combining the number of rows, number of columns, and number of
         colors in the format "{rows}x{columns}_{colors}C.txt".
         """
         player_name = player.name
-        number = 1
-        name_files = self.level.replace(".txt", "")
+        # The test number is the run id reserved atomically by the player's result sink, so
+        # concurrent runs never probe the file system looking for a free name.
+        number = player.reserve_run_id()
+        name_files = (level or self.level or "unknown_level").replace(".txt", "")
         level_name = f"{player_name}_{name_files}-test_{number}.txt"
-        ruta = os.path.join("output", level_name)
-        
-        while os.path.exists(ruta):
-            level_name = f"{player_name}_{name_files}-test_{number}.txt"
-            ruta = os.path.join("output", level_name)
-            number += 1
         
         return level_name
     
@@ -406,6 +167,7 @@ class FlowFree:
         a file in the second menu, the function will set the board attribute of the object to a new
         FlowFreeBoard.
         """
+        from game.menu import Menu
         options =  [level.capitalize() for level, values in self.levels_files.items() if values]
         options.append("Volver")
         menu = Menu(options, "Flow Free - Seleccionar nivel")
@@ -431,6 +193,7 @@ class FlowFree:
         
         #MODIFICADO
     def play(self, player) -> None:
+        from game.player import HumanPlayer
         is_human_player = isinstance(player, HumanPlayer)
         is_search_agent = not is_human_player
 
@@ -438,17 +201,19 @@ class FlowFree:
             
             # After the human makes their move, we check if they have won.
             
-            if self.board.percentage_filled() == 100:
+            if self.board.is_full():
+                if is_search_agent:
+                    self.renderer.close()
                 self.board.show() 
                 if is_search_agent:
                     level_name = self.create_level_name(player)
                     player._generate_reports(self.board, level_name=level_name)
                 break
             
-            # Show the board before the player makes a move
+            # Show the board before the player makes a move. The renderer skips frames above its
+            # frame rate instead of sleeping, so the agent is never held up by the drawing.
             if is_search_agent:
-                self.board.show()
-                time.sleep(0.1)
+                self.renderer.draw(self.board)
 
             #Calls the play method of the player (either human or AI)
             if is_search_agent:
@@ -458,6 +223,8 @@ class FlowFree:
             
             # If the AI agent finishes, it returns None and the game ends.
             if not move:
+                if is_search_agent:
+                    self.renderer.close()
                 print("Juego terminado.")
                 break
             
@@ -523,17 +290,27 @@ class FlowFree:
             self.last_move = move
             self.board.grid[y_color][x_color].add_to_road(move)
     
-    def algorithms_test(self, player, board) -> None:
+    def algorithms_test(self, player, board, timeout:float = None) -> bool:
+        """
+        Lets a search agent solve `board` without drawing it and writes its report when it succeeds.
+        
+        :param player: The `player` parameter is a search agent (a `Metrics` subclass)
+        :param board: The `board` parameter is the `FlowFreeBoard` to solve
+        :param timeout: The `timeout` parameter limits the search to that many seconds. The agent
+        also stops when it gives up (its `play` returns None), so an unsolvable board no longer
+        loops forever
+        :return: True if the board was solved
+        """
         self.board = board
+        level = self.level or "unknown_level"
 
-        while True:
-            percentage = self.board.percentage_filled()
-            if percentage == 100:
-                level_name = self.create_level_name(player)
-                player._generate_reports(self.board, level_name=level_name)
-                break
-            
-            player.play(self.board)
+        if not player.solve(self.board, level, timeout=timeout):
+            player._finish_unsolved(self.board)
+            print(f"{player.name}: no se resolvió el nivel.")
+            return False
+        level_name = self.create_level_name(player, level)
+        player._generate_reports(self.board, level_name=level_name)
+        return True
 # --- IGNORE ---
 if __name__ == '__main__':
     board = FlowFreeBoard("levels/5x5_4C_1.txt")
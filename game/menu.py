@@ -1,5 +1,4 @@
 from game.control import Control
-import os
 from game.color import Color
 
 # This Python class represents a menu with sections that can be navigated using keyboard controls.
@@ -32,7 +31,7 @@ class Menu:
         :return: The `select` method is returning the position of the selected menu item when the user
         presses the 'ENTER' key.
         """
-        os.system('cls')
+        Color.clear_screen()
         
         position = 0
         
@@ -57,7 +56,7 @@ class Menu:
                 position += selected
                 if position < 0: position = 0
                 if position >= len(self.menu_sections): position = len(self.menu_sections)-1
-            os.system('cls')
+            Color.clear_screen()
             
 if __name__ == '__main__':
     pass
@@ -0,0 +1,112 @@
+import sys
+import time
+
+from game.color import Color
+
+
+# The `NullRenderer` class is the headless renderer: it accepts frames and draws nothing, so search
+# agents run at full speed when nobody is watching.
+class NullRenderer:
+
+    def draw(self, board, highlight_cell:tuple[int, int] = None, force:bool = False) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+# The `AnsiRenderer` class draws a board with ANSI cursor addressing. The first frame is drawn in full;
+# later frames only rewrite the cells (and the header) that changed since the last frame drawn.
+class AnsiRenderer(NullRenderer):
+
+    def __init__(self, fps:float = 10, stream = None) -> None:
+        """
+        Initializes the renderer with a maximum frame rate and an output stream.
+
+        :param fps: The `fps` parameter is the maximum number of frames drawn per second. Frames
+        requested sooner than `1 / fps` seconds after the last one are skipped instead of waiting,
+        so the solver is never held up. `None` or `0` draws every frame
+        :type fps: float
+        :param stream: The `stream` parameter is the text stream the frames are written to, defaults
+        to `sys.stdout`
+        """
+        self.interval = 1 / fps if fps else 0
+        self.stream = stream or sys.stdout
+        self._last_frame = float('-inf')
+        self._cells = None
+        self._header = None
+        self._shape = None
+
+    def _header_text(self, board) -> str:
+        return f" Moves: {board.flow_free_moves} | Pipe: {board.percentage_filled()}%"
+
+    def draw(self, board, highlight_cell:tuple[int, int] = None, force:bool = False) -> None:
+        """
+        Draws a frame of the board if the frame rate allows it.
+
+        :param board: The `FlowFreeBoard` to draw
+        :param highlight_cell: Cell highlighted by the cursor, if any
+        :param force: When `True` the frame is drawn even if it comes too soon (e.g. the final frame)
+        :type force: bool
+        """
+        now = time.monotonic()
+        if not force and now - self._last_frame < self.interval:
+            return
+        self._last_frame = now
+
+        owners = board._road_owners()
+        cells = [[board.cell_text(x, y, owners, highlight_cell) for x in range(board.columns)]
+                 for y in range(board.rows)]
+        header = self._header_text(board)
+
+        if self._shape != (board.rows, board.columns):
+            self._full_frame(board, cells, header)
+        else:
+            self._diff_frame(board, cells, header)
+
+        self._cells = cells
+        self._header = header
+        self._shape = (board.rows, board.columns)
+        self.stream.flush()
+
+    def _full_frame(self, board, cells:list, header:str) -> None:
+        Color.enable_ansi()
+        separator = f"{'-'* (board.columns* 4)}-"
+        lines = [header, separator]
+        for row in cells:
+            lines.append("".join(row) + "|")
+            lines.append(separator)
+        self.stream.write(Color.HIDE_CURSOR + Color.CLEAR_SCREEN + "\n".join(lines) + "\n")
+
+    def _diff_frame(self, board, cells:list, header:str) -> None:
+        # Row 1 is the header and row 2 the top separator, so board row y is on screen row 3 + 2y
+        # and board column x starts on screen column 1 + 4x.
+        out = []
+        if header != self._header:
+            out.append(Color.move_cursor(1, 1) + header + '\033[K')
+        for y, row in enumerate(cells):
+            previous = self._cells[y]
+            for x, text in enumerate(row):
+                if text != previous[x]:
+                    out.append(Color.move_cursor(3 + 2 * y, 1 + 4 * x) + text)
+        if out:
+            # Leave the cursor below the board so other prints do not overwrite it
+            out.append(Color.move_cursor(3 + 2 * board.rows, 1))
+            self.stream.write("".join(out))
+
+    def close(self) -> None:
+        self.stream.write(Color.SHOW_CURSOR)
+        self.stream.flush()
+        self._shape = None
+
+
+RENDERERS = {"null": NullRenderer, "ansi": AnsiRenderer}
+
+
+def get_renderer(name:str = "ansi", **kwargs) -> NullRenderer:
+    """
+    Returns a renderer by name: "null" (headless) or "ansi" (cursor addressed, frame diffing).
+    """
+    if name not in RENDERERS:
+        raise ValueError(f"Renderer '{name}' no es válido. Renderers válidos: {list(RENDERERS.keys())}")
+    return RENDERERS[name](**kwargs)
@@ -0,0 +1,55 @@
+import pytest
+
+from game.board import FlowFreeBoard
+from algorithms import solution
+from algorithms.backtracking import apply_state, parallel_search, search, split_root
+
+LEVEL = [".NA....",
+         "NRV.RY.",
+         ".......",
+         ".A.V...",
+         ".......",
+         ".Y.....",
+         "......."]
+
+
+def _verified(board: FlowFreeBoard, state: tuple) -> bool:
+    apply_state(board, state)
+    return solution.verify(solution.encode(board)) == []
+
+
+def test_search_finds_a_verified_solution():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    result, nodes = search(board, ())
+    assert result is not None and nodes > 0
+    assert _verified(board, result)
+
+
+def test_search_proves_a_level_unsolvable():
+    board = FlowFreeBoard.from_lines(["A.B", "#.#", "B.A"])
+    assert search(board, ())[0] is None
+
+
+def test_split_root_tasks_cover_the_tree():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    tasks, result, _ = split_root(board, 8)
+    assert result is None and tasks
+    solved = [state for task in tasks if (state := search(board, task)[0]) is not None]
+    assert solved and all(_verified(board, state) for state in solved)
+
+
+# En este nivel split_root() deja una sola tarea: el segundo trabajador solo
+# recibe el trabajo que le cede el primero
+@pytest.mark.parametrize("split_every", [1, 8])
+def test_parallel_search_finds_a_verified_solution(split_every):
+    board = FlowFreeBoard.from_lines(LEVEL)
+    assert len(split_root(board, 8)[0]) == 1
+    result, nodes = parallel_search(board, workers=2, split_every=split_every, timeout=60)
+    assert result is not None and nodes > 0
+    assert _verified(board, result)
+
+
+def test_split_root_returns_a_solution_it_reaches():
+    board = FlowFreeBoard.from_lines(["A.A", "B.B"])
+    tasks, result, _ = split_root(board, 16)
+    assert result is not None and _verified(board, result)
@@ -0,0 +1,86 @@
+from game.board import FlowFreeBoard
+
+LEVEL = ["A.A",
+         "B.B"]
+
+
+def _roads(board: FlowFreeBoard) -> list:
+    return [list(conn.road) for conn in board.connections]
+
+
+def test_restore_rolls_back_roads_and_counters():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    blue, red = board.connections
+    blue.set_road([(0, 0), (1, 0)])
+    snapshot = board.snapshot()
+    state = (_roads(board), board.filled, board.completed)
+
+    blue.add_to_road((2, 0))
+    red.set_road([(0, 1), (1, 1), (2, 1)])
+    assert board.is_full() and board.all_completed()
+
+    board.restore(snapshot)
+    assert (_roads(board), board.filled, board.completed) == state
+    assert not blue.is_completed and not board.is_full()
+
+
+def test_a_snapshot_can_be_restored_many_times():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    blue = board.connections[0]
+    empty = board.snapshot()
+    for _ in range(3):
+        blue.set_road([(0, 0), (1, 0), (2, 0)])
+        blue.pop_road()
+        board.restore(empty)
+        assert _roads(board) == [[], []] and board.filled == 0
+
+
+def test_in_place_changes_copy_the_shared_road():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    blue = board.connections[0]
+    blue.set_road([(0, 0), (1, 0)])
+    snapshot = board.snapshot()
+    shared = blue.road
+    blue.add_to_road((2, 0))
+    assert shared == [(0, 0), (1, 0)] and blue.road is not shared
+    board.restore(snapshot)
+    assert blue.road == [(0, 0), (1, 0)]
+
+
+def test_fork_is_independent_and_shares_roads_until_written():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    board.connections[0].set_road([(0, 0), (1, 0)])
+    twin = board.fork()
+    assert twin.connections[0].road is board.connections[0].road
+
+    twin.connections[0].add_to_road((2, 0))
+    twin.connections[1].set_road([(0, 1), (1, 1), (2, 1)])
+    assert twin.is_full() and twin.all_completed()
+    assert _roads(board) == [[(0, 0), (1, 0)], []]
+    assert board.filled == 1 and board.completed == 0
+
+    # Los extremos de la copia apuntan a sus propias conexiones
+    assert twin.grid[0][0] is twin.connections[0]
+    assert board.grid[0][0] is board.connections[0]
+    assert twin.cell_points is board.cell_points
+
+
+def test_fork_restores_a_snapshot_of_the_original():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    board.connections[1].set_road([(0, 1), (1, 1)])
+    snapshot = board.snapshot()
+    twin = board.fork()
+    twin.connections[1].clean_road()
+    twin.restore(snapshot)
+    assert _roads(twin) == _roads(board) and twin.filled == board.filled
+
+
+def test_cell_tables_cache_is_bounded():
+    from game import board as board_module
+    small = FlowFreeBoard.from_lines(LEVEL)
+    for width in range(4, 4 + board_module.CELL_TABLES_LIMIT + 10):
+        FlowFreeBoard.from_lines(["A" + "." * (width - 2) + "A"])
+    assert len(board_module._CELL_TABLES) == board_module.CELL_TABLES_LIMIT
+    # Un tablero cuya forma salió de la caché conserva sus tablas
+    assert small.neighbors[1] == (2, 0, 4)
+    assert small.fork().neighbors is small.neighbors
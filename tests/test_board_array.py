@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game.board import FlowFreeBoard, format_rows
+from game.board_array import BoardArray, WALL
+
+
+def view(rows: list) -> BoardArray:
+    return BoardArray.from_board(FlowFreeBoard.from_lines(rows))
+
+
+def test_from_board_uses_the_smallest_color_type():
+    small = view(["A.#", ".A.", "B.B"])
+    assert small.colors.dtype == np.int8
+    assert small.colors.tolist() == [[1, 0, WALL], [0, 1, 0], [2, 0, 2]]
+    assert small.endpoints.tolist() == [[True, False, False], [False, True, False], [True, False, True]]
+
+    ids = [str(i) for i in range(1, 129)]
+    large = view(format_rows([ids, ids]))
+    assert large.colors.dtype == np.int16
+    assert large.colors[:, -1].tolist() == [128, 128]
+
+
+def test_stack_pads_smaller_boards_with_walls():
+    square = view(["A.#", ".A.", "B.B"])
+    wide = view(["A..A", "B..B"])
+    stacked = BoardArray.stack([square, wide])
+    assert stacked.colors.shape == (2, 3, 4) and len(stacked) == 2
+    assert (stacked.colors[0, :, 3] == WALL).all() and (stacked.colors[1, 2] == WALL).all()
+    assert not stacked.endpoints[0, :, 3].any()
+    assert stacked.free_cells().tolist() == [4, 4]
+    int16 = view(format_rows([[str(i) for i in range(1, 129)]] * 2))
+    assert BoardArray.stack([square, int16]).colors.dtype == np.int16
+
+
+def test_neighbor_and_enclosure_counts():
+    board = view(["A.#", ".A.", "B.B"])
+    assert board.neighbor_counts().tolist() == [[2, 0, 2], [0, 4, 0], [2, 0, 2]]
+    assert board.neighbor_counts(board.wall_mask).tolist() == [[0, 1, 0], [0, 0, 1], [0, 0, 0]]
+    # Paredes, bordes y celdas ocupadas encierran
+    assert board.enclosure_counts().tolist() == [[2, 4, 2], [4, 0, 4], [2, 4, 2]]
+
+
+def test_distance_map_goes_around_walls():
+    board = view(["A#A", ".#.", "..."])
+    sources = np.zeros(board.colors.shape, dtype=bool)
+    sources[0, 0] = True
+    assert board.distance_map(sources).tolist() == [[0, -1, -1], [1, -1, 5], [2, 3, 4]]
+    passable = board.free_mask | board.endpoints
+    assert board.distance_map(sources, passable).tolist() == [[0, -1, 6], [1, -1, 5], [2, 3, 4]]
+
+
+def test_connected_components_are_labeled_by_their_first_cell():
+    board = view(["A#.", ".#.", "A#."])
+    assert board.connected_components().tolist() == [[0, 0, 3], [4, 0, 3], [0, 0, 3]]
+    assert board.component_counts() == 2
+    stacked = BoardArray.stack([board, board])
+    labels = stacked.connected_components()
+    assert labels[1].tolist() == [[0, 0, 12], [13, 0, 12], [0, 0, 12]]
+    assert stacked.component_counts().tolist() == [2, 2]
@@ -0,0 +1,14 @@
+from game.board import FlowFreeBoard
+from game.flow_free import FlowFree
+from game.render import NullRenderer
+from algorithms.results import NullSink
+from algorithms.astar import AStarPlayer
+
+
+def test_algorithms_test_without_a_loaded_level():
+    game = FlowFree(renderer=NullRenderer())
+    board = FlowFreeBoard.from_lines(["A...Y", "V.YV.", "...A.", ".....", "R...R"])
+    player = AStarPlayer(sink=NullSink())
+    assert game.level is None
+    assert game.algorithms_test(player, board, timeout=30)
+    assert game.create_level_name(player).startswith("AStar_unknown_level-test_")
@@ -0,0 +1,31 @@
+import time
+
+import pytest
+
+from algorithms.generator import generate_level, level_filename, _next_number
+
+
+def test_unverified_levels_are_tagged_in_the_filename(tmp_path):
+    assert level_filename(7, 7, 5, 3, "unique") == "7x7_5C_3.txt"
+    assert level_filename(20, 20, 14, 4, "unverified") == "20x20_14C_4-unverified.txt"
+    assert level_filename(9, 9, 6, 1, "unchecked") == "9x9_6C_1-unchecked.txt"
+    for name in ("20x20_14C_1.txt", "20x20_14C_4-unverified.txt"):
+        (tmp_path / name).write_text("")
+    assert _next_number(str(tmp_path), 20, 20, 14) == 5
+
+
+def test_generated_level_reports_its_uniqueness():
+    checked = generate_level(6, 6, 5, seed=1)
+    assert checked["unique"] == "unique" and checked["nodes"] > 0
+    assert generate_level(6, 6, 5, seed=1, check=False)["unique"] == "unchecked"
+
+
+def test_large_levels_skip_the_count_by_default():
+    started = time.monotonic()
+    level = generate_level(30, 30, 25, seed=1, allow_unverified=True)
+    assert level["unique"] == "unchecked" and level["nodes"] == 0
+    assert time.monotonic() - started < 10
+    with pytest.raises(ValueError):
+        generate_level(30, 30, 25, seed=1)
+    counted = generate_level(20, 20, 14, seed=1, allow_unverified=True, max_nodes=200)
+    assert counted["unique"] == "unverified" and counted["nodes"] == 200
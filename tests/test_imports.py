@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# numpy solo lo usan game.board_array y benchmarks.scaling: el camino de los
+# agentes tiene que funcionar sin él
+AGENT_MODULES = ("game.board", "game.flow_free", "algorithms.runner", "algorithms.service", "algorithms.generator")
+
+
+def test_agents_do_not_import_numpy():
+    statement = (f"import sys, {', '.join(AGENT_MODULES)}; "
+                 "print(' '.join(m for m in ('numpy', 'game.board_array') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, check=True,
+                            cwd=ROOT)
+    assert result.stdout.strip() == ""
+
+
+def test_requirements_pin_numpy():
+    with open(os.path.join(ROOT, "requirements.txt"), encoding="utf-8") as f:
+        pins = dict(line.strip().split("==") for line in f if "==" in line)
+    assert pins.get("numpy")
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+from algorithms.memory import DeadEndMemory, ENTRY_OVERHEAD, fingerprint
+
+BLOOM_BYTES = len(DeadEndMemory()._bloom)
+
+
+def _memory_for(entries: int, key_length: int = 4) -> DeadEndMemory:
+    return DeadEndMemory(BLOOM_BYTES + entries * (key_length + ENTRY_OVERHEAD))
+
+
+def test_holds_states_exactly():
+    memory = DeadEndMemory()
+    states = [((i, i + 1), ((0, 0), (0, 1))) for i in range(200)]
+    for state in states:
+        memory.add(state)
+    assert len(memory) == 200
+    assert all(state in memory for state in states)
+    assert not any(((i, i + 1), ((0, 1),)) in memory for i in range(200))
+    assert memory.stats()["evictions"] == 0
+
+
+def test_stays_within_its_byte_budget():
+    memory = _memory_for(50)
+    for i in range(1000):
+        memory.add(b"%04d" % i)
+    assert len(memory) == 50
+    assert memory.bytes + len(memory._bloom) <= memory.capacity
+    assert memory.stats()["evictions"] == 950
+    # Los últimos estados siguen; los primeros se desalojaron
+    assert b"0999" in memory and b"0000" not in memory
+
+
+def test_clock_gives_referenced_entries_a_second_chance():
+    memory = _memory_for(4)
+    for i in range(4):
+        memory.add(b"%04d" % i)
+    assert b"0000" in memory  # la marca
+    memory.add(b"0004")
+    assert b"0000" in memory and b"0001" not in memory
+    assert len(memory) == 4
+
+
+def test_bloom_grows_with_the_entries():
+    memory = DeadEndMemory()
+    for i in range(5000):
+        memory.add(("estado", i))
+    assert memory.bits >= 5000 * memory.bits_per_entry
+    assert all(("estado", i) in memory for i in range(5000))
+
+
+def test_clear_empties_the_memory():
+    memory = DeadEndMemory()
+    memory.add(("a",))
+    memory.clear()
+    assert len(memory) == 0 and ("a",) not in memory and memory.bytes == 0
+
+
+def test_fingerprints_do_not_depend_on_the_hash_seed():
+    statement = "from algorithms.memory import fingerprint; print(fingerprint(('A', ((0, 1), (1, 1)))))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = {subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, check=True,
+                              cwd=root, env={**os.environ, "PYTHONHASHSEED": seed}).stdout.strip()
+               for seed in ("1", "2")}
+    assert outputs == {str(fingerprint(("A", ((0, 1), (1, 1)))))}
@@ -0,0 +1,45 @@
+from game.board import FlowFreeBoard
+from algorithms.bfs import BFSPlayer
+from algorithms.results import NullSink
+
+LEVEL = ["A..B",
+         "....",
+         "....",
+         ".A.B"]
+# Por la columna 1 hasta abajo: deja la columna 0 sin ningún extremo
+SEALING = [(0, 0), (1, 0), (1, 1), (1, 2), (1, 3)]
+DETOUR = [(0, 0), (1, 0), (2, 0), (2, 1), (1, 1), (1, 2), (1, 3)]
+
+
+def _player() -> BFSPlayer:
+    player = BFSPlayer(sink=NullSink())
+    player.enable_profiling()
+    return player
+
+
+def test_learned_pattern_rejects_other_paths_that_seal_the_same_region():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    player, blue = _player(), board.connections[0]
+    assert player._is_nogood(board, blue, SEALING)
+    (blocking, region), = player.nogoods[(tuple(board.board), blue.index)]
+    assert region == {(0, 1), (0, 2), (0, 3)} and blocking == {(0, 0), (1, 1), (1, 2), (1, 3)}
+    # Otro camino y otro estado del tablero: lo rechaza el patrón, sin recorrer el tablero
+    board.connections[1].set_road([(3, 0), (3, 1)])
+    assert player._is_nogood(board, blue, DETOUR)
+    assert player.profiler.counters["nogood_hits"] == 1
+    assert player.profiler.counters["sealed_checks"] == 1
+
+
+def test_paths_away_from_walls_skip_the_region_check():
+    board = FlowFreeBoard.from_lines([".....", ".A.A.", ".....", "B...B"])
+    player = _player()
+    assert not player._is_nogood(board, board.connections[0], [(1, 1), (2, 1), (3, 1)])
+    assert "sealed_checks" not in player.profiler.counters
+
+
+def test_deterministic_agent_tries_alternatives_to_a_rejected_path():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    player = _player()
+    path = player._choose_path(board, board.connections[0], SEALING)
+    assert path is not None and path != SEALING
+    assert not player._is_nogood(board, board.connections[0], path)
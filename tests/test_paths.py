@@ -0,0 +1,62 @@
+import time
+
+from game.board import FlowFreeBoard
+from algorithms.paths import enumerate_paths, count_paths
+
+LEVEL = ["A...Y",
+         "V.YV.",
+         "...A.",
+         ".....",
+         "R...R"]
+
+
+def _drain(generator) -> tuple:
+    """Devuelve (caminos generados, valor de retorno del generador)."""
+    paths = []
+    while True:
+        try:
+            paths.append(next(generator))
+        except StopIteration as stop:
+            return paths, stop.value
+
+
+def test_paths_join_the_endpoints_in_cost_order():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    red = board.connections[-1]
+    paths, cut = _drain(enumerate_paths(board, red))
+    assert paths and not cut
+    assert all(path[0] == red.points[0] and path[-1] == red.points[1] for path in paths)
+    assert [len(path) for path in paths] == sorted(len(path) for path in paths)
+    assert len({tuple(path) for path in paths}) == len(paths)
+
+
+def test_expansion_budget_cuts_the_enumeration():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    paths, cut = _drain(enumerate_paths(board, board.connections[0], max_expansions=1))
+    assert paths == [] and cut is True
+
+
+def test_past_deadline_cuts_the_enumeration():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    paths, cut = _drain(enumerate_paths(board, board.connections[0], deadline=time.monotonic() - 1))
+    assert paths == [] and cut is True
+
+
+def test_count_is_exact_without_budgets():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    red = board.connections[-1]
+    assert count_paths(board, red) == len(list(enumerate_paths(board, red)))
+    assert count_paths(board, red, limit=2) == 2
+
+
+def test_count_is_zero_only_for_a_connection_without_paths():
+    board = FlowFreeBoard.from_lines(["A#A"])
+    assert count_paths(board, board.connections[0]) == 0
+
+
+def test_cut_count_is_never_zero():
+    board = FlowFreeBoard.from_lines(LEVEL)
+    blue = board.connections[0]
+    assert count_paths(board, blue, max_expansions=1) == 1
+    assert count_paths(board, blue, limit=4, max_expansions=1) == 4
+    assert count_paths(board, blue, deadline=time.monotonic() - 1) == 1
@@ -0,0 +1,15 @@
+import os
+import time
+
+from game.board import FlowFreeBoard
+from algorithms.results import NullSink
+from algorithms.portfolio import PortfolioPlayer
+
+LEVEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels", "15x15_13C_23.txt")
+
+
+def test_race_stops_at_the_solve_deadline():
+    board = FlowFreeBoard(LEVEL)
+    started = time.monotonic()
+    assert not PortfolioPlayer(sink=NullSink()).solve(board, "15x15_13C_23", timeout=1.0)
+    assert time.monotonic() - started < 5
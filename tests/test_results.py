@@ -0,0 +1,66 @@
+import multiprocessing
+
+import pytest
+
+from algorithms import results
+from algorithms.results import ResultSink, open_sink
+
+EXTENSIONS = [".csv", ".jsonl", ".db"]
+
+
+def _reserve(path: str, count: int, ids) -> None:
+    sink = open_sink(path)
+    for _ in range(count):
+        ids.put(sink.next_run_id())
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_run_ids_are_unique_across_processes(tmp_path, extension):
+    path = str(tmp_path / f"results{extension}")
+    ids = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_reserve, args=(path, 25, ids)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    reserved = [ids.get(timeout=30) for _ in range(100)]
+    for process in processes:
+        process.join()
+    assert sorted(reserved) == list(range(1, 101))
+
+
+@pytest.mark.parametrize("extension", EXTENSIONS)
+def test_records_are_written_in_batches_and_read_back(tmp_path, extension):
+    path = str(tmp_path / f"results{extension}")
+    with open_sink(path, batch_size=2) as sink:
+        for _ in range(3):
+            sink.write({"run_id": sink.next_run_id(), "agent": "DFSPlayer", "path_to_goal": [["A"]]})
+        assert len(open_sink(path).read()) == 2  # el tercero sigue en el lote
+    records = open_sink(path).read()
+    assert [str(record["run_id"]) for record in records] == ["1", "2", "3"]
+    assert all(record["agent"] == "DFSPlayer" for record in records)
+
+
+def test_csv_widens_its_header_for_new_columns(tmp_path):
+    path = str(tmp_path / "results.csv")
+    with open_sink(path) as sink:
+        sink.write({"run_id": 1})
+    with open_sink(path) as sink:
+        sink.write({"run_id": 2, "seed": 7})
+    records = open_sink(path).read()
+    assert records == [{"run_id": "1", "seed": ""}, {"run_id": "2", "seed": "7"}]
+
+
+def test_result_sink_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        ResultSink(str(tmp_path / "results.csv"))
+
+
+def test_agents_without_a_sink_write_each_record_at_once(tmp_path, monkeypatch):
+    from game.board import FlowFreeBoard
+    from algorithms.astar import AStarPlayer
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(results, "_default_sink", None)
+    board = FlowFreeBoard.from_lines(["A...Y", "V.YV.", "...A.", ".....", "R...R"])
+    player = AStarPlayer()
+    assert player.solve(board, "5x5", timeout=30)
+    player._generate_reports(board, "5x5")
+    assert len(open_sink(str(tmp_path / "output" / "benchmark.csv")).read()) == 1
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+from algorithms.results import NullSink, open_sink
+from algorithms.astar import AStarPlayer
+from algorithms.runner import agent_kwargs, main, reproduce, run_batch, _from_json
+
+LEVEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels", "5x5_4C_1.txt")
+
+
+def test_record_keeps_every_constructor_argument():
+    kwargs = agent_kwargs(AStarPlayer, {"heuristics": ["manhattan"], "memory_bytes": 100_000})
+    assert kwargs == {"heuristics": ["manhattan"], "batched": True, "memory_bytes": 100_000,
+                      "commit_alternatives": 0}
+
+
+def test_agent_classes_are_recorded_by_name():
+    from algorithms.parallel_restarts import ParallelRestartPlayer
+    kwargs = agent_kwargs(ParallelRestartPlayer, {"factory": AStarPlayer, "workers": 2})
+    assert kwargs["factory"] == "AStarPlayer"
+    assert _from_json(kwargs)["factory"] is AStarPlayer
+
+
+def test_reproduce_replays_the_recorded_arguments():
+    agents = [("AStarPlayer", {"heuristics": ["exploration_bonus"], "batched": False, "memory_bytes": 4096})]
+    original, = run_batch([LEVEL], agents, seed=3, sink=NullSink())
+    assert original["kwargs"]["memory_bytes"] == 4096 and original["kwargs"]["batched"] is False
+    again = reproduce(original, sink=NullSink())
+    assert again["kwargs"] == original["kwargs"]
+    assert again["nodes_expanded"] == original["nodes_expanded"]
+    assert again["solution"] == original["solution"]
+
+
+@pytest.mark.parametrize("command", [["many", "--agent", "AStarPlayer", "--workers", "1"],
+                                     ["batch", "--agents", "AStarPlayer"]])
+def test_cli_passes_agent_kwargs(tmp_path, monkeypatch, command):
+    path = str(tmp_path / "results.jsonl")
+    kwargs = '{"heuristics": ["manhattan"], "memory_bytes": 4096}'
+    monkeypatch.setattr(sys, "argv", ["runner", command[0], LEVEL, *command[1:], "--seed", "1", "--sink", path, "--kwargs", kwargs])
+    main()
+    record, = open_sink(path).read()
+    assert record["kwargs"]["heuristics"] == ["manhattan"] and record["kwargs"]["memory_bytes"] == 4096
+
+
+def test_cli_rejects_kwargs_the_agent_does_not_take(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["runner", "many", LEVEL, "--agent", "DFSPlayer", "--kwargs", '{"heuristics": []}'])
+    with pytest.raises(SystemExit):
+        main()
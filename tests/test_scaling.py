@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks.scaling import compare, fit_axis, fit_case, fit_joint
+
+SIDES = [5, 6, 7, 8, 9, 10]
+COLORS = [3, 4, 5]
+
+
+def point(side: int, colors: int, seconds: float, failures: int = 0, runs: int = 3) -> dict:
+    stats = {"n": runs, "median": seconds, "censored": failures}
+    return {"side": side, "colors": colors, "failures": failures,
+            "metrics": {"running_time": stats, "nodes_expanded": {"n": runs - failures, "median": 10 * seconds}}}
+
+
+def report(points: list, repetitions: int = 3) -> dict:
+    return {"repetitions": repetitions, "cases": {"AStar": {"points": points, "fits": fit_case(points)}}}
+
+
+def test_fit_axis_recovers_a_power_law():
+    fit = fit_axis(SIDES, [0.5 * side ** 3 for side in SIDES])
+    assert fit["best"] == "power"
+    assert fit["power"]["b"] == pytest.approx(3)
+    assert fit["power"]["a"] == pytest.approx(0.5)
+    assert fit["power"]["r2"] == pytest.approx(1)
+    assert fit_axis([5, 5], [1.0, 2.0]) is None
+
+
+def test_fit_joint_separates_side_and_colors():
+    pairs = [(side, colors) for side in SIDES for colors in COLORS]
+    fit = fit_joint([s for s, _ in pairs], [k for _, k in pairs], [2 * s ** 2.5 * k ** 1.5 for s, k in pairs])
+    assert fit["side_exponent"] == pytest.approx(2.5)
+    assert fit["colors_exponent"] == pytest.approx(1.5)
+    assert fit["a"] == pytest.approx(2)
+
+
+def test_compare_flags_a_steeper_exponent_and_more_failures():
+    pairs = [(side, colors) for side in SIDES for colors in COLORS]
+    baseline = report([point(s, k, 0.01 * s ** 2 * k) for s, k in pairs])
+    current = report([point(s, k, 0.01 * s ** 3 * k, failures=int(s == 10)) for s, k in pairs])
+    flags = compare(current, baseline, threshold=0.25)
+    assert ("AStar", "failures", "rate", "regression") in flags
+    assert ("AStar", "running_time", "side_exponent", "regression") in flags
+    assert ("AStar", "running_time", "colors_exponent", "ok") in flags
+    same = compare(report(baseline["cases"]["AStar"]["points"]), baseline, threshold=0.25)
+    assert same and all(status == "ok" for *_, status in same)
+
+
+def test_fully_censored_times_have_no_exponent():
+    pairs = [(side, colors) for side in SIDES for colors in COLORS]
+    fits = fit_case([point(s, k, 30.0, failures=3) for s, k in pairs])
+    assert fits["running_time"] == {"side": None, "colors": None, "joint": None, "censored": len(pairs)}
+    partly = fit_case([point(s, k, 30.0 if s == 10 else 0.01 * s ** 2, failures=3 * (s == 10)) for s, k in pairs])
+    assert partly["running_time"]["censored"] == len(COLORS)
+    assert partly["running_time"]["joint"] is not None
@@ -0,0 +1,103 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+
+from algorithms.service import SolveService
+
+LEVELS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels")
+ROWS = ["A...Y", "V.YV.", "...A.", ".....", "R...R"]
+
+
+def validate(request: dict) -> str | None:
+    return SolveService(workers=1, levels_dir=LEVELS)._validate(request)
+
+
+def test_accepts_whitelisted_kwargs():
+    assert validate({"rows": ROWS, "kwargs": {"heuristics": ["manhattan"], "batched": False,
+                                              "memory_bytes": 4096}}) is None
+    assert validate({"rows": ROWS, "agent": "BacktrackingPlayer", "kwargs": {"max_expansions": None}}) is None
+
+
+def test_rejects_kwargs_outside_the_whitelist():
+    for name, value in [("trace", "/tmp/trace.jsonl"), ("telemetry", {"interval": 1}), ("profile", True),
+                        ("sink", None), ("seed", 1)]:
+        assert f"'{name}' no se acepta" in validate({"rows": ROWS, "kwargs": {name: value}})
+    assert "'workers' no se acepta" in validate({"rows": ROWS, "agent": "BacktrackingPlayer",
+                                                 "kwargs": {"workers": 512}})
+    assert "no se acepta" in validate({"rows": ROWS, "agent": "PortfolioPlayer", "kwargs": {"members": []}})
+
+
+def test_rejects_invalid_kwarg_values():
+    assert "memory_bytes" in validate({"rows": ROWS, "kwargs": {"memory_bytes": 2**40}})
+    assert "memory_bytes" in validate({"rows": ROWS, "kwargs": {"memory_bytes": True}})
+    assert "heuristics" in validate({"rows": ROWS, "kwargs": {"heuristics": ["__import__"]}})
+
+
+def test_level_must_be_inside_the_levels_directory():
+    assert validate({"level": "5x5_4C_1.txt"}) is None
+    assert validate({"level": os.path.join(LEVELS, "5x5_4C_1.txt")}) is None
+    for level in ["../requests.jsonl", os.path.join(LEVELS, "..", "README.md"), "/etc/passwd", "missing.txt"]:
+        assert "directorio de niveles" in validate({"level": level})
+    assert "'level'" in validate({"level": ["5x5_4C_1.txt"]})
+
+
+def test_serves_requests_and_recycles_workers():
+    async def run():
+        service = SolveService(workers=1, timeout=30, levels_dir=LEVELS)
+        await service.start()
+        responses = []
+
+        async def reply(response: dict) -> None:
+            responses.append(response)
+
+        await service.submit({"id": 1, "rows": ROWS}, reply)
+        await service.submit({"id": 2, "level": "5x5_4C_1.txt", "agent": "DFSPlayer"}, reply)
+        await service.submit({"id": 3, "rows": ROWS, "kwargs": {"trace": "trace.jsonl"}}, reply)
+        await service.queue.join()
+        old = service.pids[0]
+        await service._recycle(0)
+        assert service.pids[0] != old and service.stats["recycled"] == 1
+        await service.submit({"id": 4, "rows": ROWS}, reply)
+        await service.close()
+        return {response["id"]: response for response in responses}
+
+    responses = asyncio.run(run())
+    assert [responses[i]["status"] for i in (1, 2, 3, 4)] == ["solved", "solved", "error", "solved"]
+
+
+def _start_sleeper() -> int:
+    """Tarea del pool: crea un proceso hijo, como los miembros de Portfolio, y devuelve su pid."""
+    child = multiprocessing.get_context("fork").Process(target=time.sleep, args=(60,), daemon=True)
+    child.start()
+    return child.pid
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="sin grupos de procesos")
+def test_recycle_also_stops_the_worker_children():
+    async def run():
+        service = SolveService(workers=1, levels_dir=LEVELS)
+        await service.start()
+        child = await asyncio.get_running_loop().run_in_executor(service.pools[0], _start_sleeper)
+        assert _alive(child)
+        await service._recycle(0)
+        await service.close()
+        return child
+
+    child = asyncio.run(run())
+    for _ in range(100):
+        if not _alive(child):
+            break
+        time.sleep(0.05)
+    assert not _alive(child)
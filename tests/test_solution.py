@@ -0,0 +1,57 @@
+import pytest
+
+from game.board import FlowFreeBoard
+from algorithms import solution
+
+LEVEL = ["A.A",
+         "B.B"]
+ROADS = {"A": [(0, 0), (1, 0), (2, 0)], "B": [(0, 1), (1, 1), (2, 1)]}
+
+
+def _solved_board() -> FlowFreeBoard:
+    board = FlowFreeBoard.from_lines(LEVEL)
+    for conn in board.connections:
+        conn.set_road(ROADS[conn.key])
+    return board
+
+
+def test_round_trip_of_a_valid_solution():
+    encoded = solution.encode(_solved_board())
+    assert encoded["paths"] == {"A": [0, 1, 2], "B": [3, 4, 5]}
+    loaded = solution.loads(solution.dumps(encoded))
+    assert solution.verify(loaded) == []
+    assert solution.decode(loaded) == ROADS
+
+
+def test_round_trip_of_a_wide_color_level():
+    board = FlowFreeBoard.from_lines(["12 . 12", "3 . 3"])
+    for conn, road in zip(board.connections, ROADS.values()):
+        conn.set_road(road)
+    encoded = solution.loads(solution.dumps(solution.encode(board)))
+    assert solution.verify(encoded) == []
+    assert solution.decode(encoded) == {"12": ROADS["A"], "3": ROADS["B"]}
+
+
+def test_verify_reports_broken_solutions():
+    encoded = solution.encode(_solved_board())
+    cases = {
+        "no une": {"A": [0, 1], "B": [3, 4, 5]},
+        "salta": {"A": [0, 2], "B": [3, 4, 5]},
+        "Solapamiento": {"A": [0, 1, 4, 1, 2], "B": [3, 4, 5]},
+        "pisa el extremo": {"A": [0, 3, 4, 1, 2], "B": [3, 4, 5]},
+        "Falta el camino": {"A": [0, 1, 2]},
+        "Cobertura incompleta": {"A": [0, 1, 2], "B": [3, 5]},
+    }
+    for message, paths in cases.items():
+        errors = solution.verify({**encoded, "paths": paths})
+        assert any(message in error for error in errors), (message, errors)
+
+
+def test_verify_rejects_paths_through_walls():
+    errors = solution.verify({"level": ["A#A", "..."], "paths": {"A": [0, 1, 2]}})
+    assert any("pared" in error for error in errors)
+
+
+def test_loads_rejects_other_formats():
+    with pytest.raises(ValueError):
+        solution.loads('{"format": "otro"}')
@@ -0,0 +1,26 @@
+from benchmarks.suite import compare, success_rate, summarize
+
+
+def _case(times: list, failures: int, nodes: list) -> dict:
+    return {"failures": failures, "runs": len(times), "successes": len(times) - failures,
+            "metrics": {"running_time": summarize(times), "nodes_expanded": summarize(nodes)}}
+
+
+def test_a_drop_in_success_rate_is_a_regression():
+    baseline = {"cases": {"k": _case([2.0] * 10, 0, [50] * 10)}}
+    # Las que terminan son más rápidas, pero cuatro vencen el plazo
+    current = {"cases": {"k": _case([0.5] * 6 + [2.5] * 4, 4, [10] * 6)}}
+    flags = compare(current, baseline, 0.10)
+    assert ("k", "success_rate", "regression") in flags
+    assert current["cases"]["k"]["success"]["rate"] == 0.6
+
+
+def test_same_success_rate_is_ok():
+    baseline = {"cases": {"k": _case([1.0] * 5, 1, [5] * 4)}}
+    current = {"cases": {"k": _case([1.0] * 5, 1, [5] * 4)}}
+    assert ("k", "success_rate", "ok") in compare(current, baseline, 0.10)
+
+
+def test_success_rate_of_reports_without_successes():
+    old = {"failures": 2, "metrics": {"nodes_expanded": summarize([1, 2, 3, 4, 5, 6])}}
+    assert success_rate(old) == 0.75
@@ -0,0 +1,25 @@
+import json
+import os
+
+import pytest
+
+from game.board import FlowFreeBoard
+from algorithms.results import NullSink
+from algorithms.astar import AStarPlayer
+from algorithms.bfs import BFSPlayer
+from algorithms.dfs import DFSPlayer
+
+LEVEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels", "10x10_8C_5.txt")
+
+
+@pytest.mark.parametrize("factory", [AStarPlayer, BFSPlayer, DFSPlayer])
+def test_stuck_events_name_their_connection(tmp_path, factory):
+    path = str(tmp_path / "trace.jsonl")
+    player = factory(sink=NullSink(), seed=1)
+    player.enable_tracing(path)
+    player.solve(FlowFreeBoard(LEVEL), "10x10_8C_5", timeout=1)
+    player.tracer.close()
+    with open(path, encoding="utf-8") as f:
+        stuck = [event for event in map(json.loads, f) if event["e"] == "stuck"]
+    keys = {conn.key for conn in FlowFreeBoard(LEVEL).connections}
+    assert all(event.get("k") in keys for event in stuck)